@@ -0,0 +1,77 @@
+"""スケジュールの定員（席数）と予約のスケジュール紐付けを追加
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+database/initdb/init.sql で作成済みの新規データベースでも再実行できるよう、
+すべての変更は IF NOT EXISTS 等で冪等にしている
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE lecture_schedules ADD COLUMN IF NOT EXISTS capacity INTEGER NOT NULL DEFAULT 1")
+    op.execute("ALTER TABLE lecture_schedules ADD COLUMN IF NOT EXISTS booked_count INTEGER NOT NULL DEFAULT 0")
+    op.execute(
+        "ALTER TABLE lecture_bookings ADD COLUMN IF NOT EXISTS schedule_id INTEGER "
+        "REFERENCES lecture_schedules(id) ON DELETE SET NULL"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_lecture_bookings_schedule_id ON lecture_bookings(schedule_id)")
+
+    # 既存の予約を対応するスケジュールに紐付ける
+    op.execute("""
+        UPDATE lecture_bookings b
+        SET schedule_id = s.id
+        FROM lecture_schedules s
+        WHERE b.schedule_id IS NULL
+          AND s.lecture_id = b.lecture_id
+          AND s.teacher_id = b.teacher_id
+          AND s.booking_date = b.booking_date
+          AND s.start_time <= b.start_time
+          AND s.end_time >= b.end_time
+    """)
+
+    # 予約済み席数を再計算（既存の予約数が定員を超える場合は定員を引き上げる）
+    op.execute("""
+        UPDATE lecture_schedules s
+        SET booked_count = COALESCE(c.booked, 0),
+            capacity = GREATEST(s.capacity, COALESCE(c.booked, 0))
+        FROM lecture_schedules s2
+        LEFT JOIN (
+            SELECT schedule_id, COUNT(*) AS booked
+            FROM lecture_bookings
+            WHERE status IN ('pending', 'confirmed') AND schedule_id IS NOT NULL
+            GROUP BY schedule_id
+        ) c ON c.schedule_id = s2.id
+        WHERE s2.id = s.id
+    """)
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'lecture_schedules_capacity_check') THEN
+                ALTER TABLE lecture_schedules
+                    ADD CONSTRAINT lecture_schedules_capacity_check CHECK (capacity > 0);
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'lecture_schedules_booked_count_check') THEN
+                ALTER TABLE lecture_schedules
+                    ADD CONSTRAINT lecture_schedules_booked_count_check
+                    CHECK (booked_count >= 0 AND booked_count <= capacity);
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE lecture_schedules DROP CONSTRAINT IF EXISTS lecture_schedules_booked_count_check")
+    op.execute("ALTER TABLE lecture_schedules DROP CONSTRAINT IF EXISTS lecture_schedules_capacity_check")
+    op.execute("DROP INDEX IF EXISTS idx_lecture_bookings_schedule_id")
+    op.execute("ALTER TABLE lecture_bookings DROP COLUMN IF EXISTS schedule_id")
+    op.execute("ALTER TABLE lecture_schedules DROP COLUMN IF EXISTS booked_count")
+    op.execute("ALTER TABLE lecture_schedules DROP COLUMN IF EXISTS capacity")
@@ -0,0 +1,71 @@
+"""スケジュール・予約の時間帯重複を排他制約で禁止
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+tsrange の生成列と GiST 排他制約を追加し、重複チェックをデータベース側で行う。
+既存データに重複がある場合は制約の追加に失敗するため、事前に解消しておくこと。
+排他制約が期限切れスケジュールを除外して重複を防ぐため、
+削除（期限切れ）済みの時間帯の再登録を妨げていた UNIQUE 制約は削除する
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TIME_RANGE_COLUMN = (
+    "ADD COLUMN IF NOT EXISTS time_range TSRANGE "
+    "GENERATED ALWAYS AS (tsrange(booking_date + start_time, booking_date + end_time)) STORED"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(f"ALTER TABLE lecture_schedules {TIME_RANGE_COLUMN}")
+    op.execute(f"ALTER TABLE lecture_bookings {TIME_RANGE_COLUMN}")
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'lecture_schedules_no_overlap') THEN
+                ALTER TABLE lecture_schedules
+                    ADD CONSTRAINT lecture_schedules_no_overlap EXCLUDE USING gist (
+                        lecture_id WITH =, time_range WITH &&
+                    ) WHERE (NOT is_expired);
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'lecture_bookings_no_overlap') THEN
+                ALTER TABLE lecture_bookings
+                    ADD CONSTRAINT lecture_bookings_no_overlap EXCLUDE USING gist (
+                        user_id WITH =, lecture_id WITH =, time_range WITH &&
+                    ) WHERE (status IN ('pending', 'confirmed'));
+            END IF;
+        END $$;
+    """)
+
+    op.execute(
+        "ALTER TABLE lecture_schedules "
+        "DROP CONSTRAINT IF EXISTS lecture_schedules_lecture_id_booking_date_start_time_end_ti_key"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE lecture_bookings DROP CONSTRAINT IF EXISTS lecture_bookings_no_overlap")
+    op.execute("ALTER TABLE lecture_schedules DROP CONSTRAINT IF EXISTS lecture_schedules_no_overlap")
+    op.execute("ALTER TABLE lecture_bookings DROP COLUMN IF EXISTS time_range")
+    op.execute("ALTER TABLE lecture_schedules DROP COLUMN IF EXISTS time_range")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'lecture_schedules_lecture_id_booking_date_start_time_end_ti_key'
+            ) THEN
+                ALTER TABLE lecture_schedules
+                    ADD CONSTRAINT lecture_schedules_lecture_id_booking_date_start_time_end_ti_key
+                    UNIQUE (lecture_id, booking_date, start_time, end_time);
+            END IF;
+        END $$;
+    """)
@@ -0,0 +1,80 @@
+"""ETag 生成用のテーブル変更カウンターを追加
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+公開 API が参照するテーブルに文単位のトリガーを追加し、
+変更のたびに table_versions の（テーブル名, バックエンドプロセスID）の行を加算する。
+バージョン番号は該当テーブルの行の合計値で、トランザクションと一緒にコミットされる
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = (
+    "user_infos",
+    "teacher_profiles",
+    "lectures",
+    "lecture_schedules",
+    "lecture_bookings",
+    "carousel",
+)
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT NOT NULL,
+            backend_pid INTEGER NOT NULL,
+            version BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, backend_pid)
+        )
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_table_version()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, backend_pid, version)
+            VALUES (TG_TABLE_NAME, pg_backend_pid(), 1)
+            ON CONFLICT (table_name, backend_pid)
+            DO UPDATE SET version = table_versions.version + 1;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql'
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION compact_table_versions()
+        RETURNS VOID AS $$
+            WITH finished AS (
+                DELETE FROM table_versions v
+                WHERE v.backend_pid <> 0
+                  AND NOT EXISTS (SELECT 1 FROM pg_stat_activity a WHERE a.pid = v.backend_pid)
+                RETURNING v.table_name, v.version
+            )
+            INSERT INTO table_versions (table_name, backend_pid, version)
+            SELECT table_name, 0, sum(version) FROM finished GROUP BY table_name
+            ON CONFLICT (table_name, backend_pid)
+            DO UPDATE SET version = table_versions.version + EXCLUDED.version;
+        $$ language 'sql'
+    """)
+
+    for table in VERSIONED_TABLES:
+        op.execute(f"""
+            CREATE OR REPLACE TRIGGER bump_{table}_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """)
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS bump_{table}_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS compact_table_versions()")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.execute("DROP TABLE IF EXISTS table_versions")
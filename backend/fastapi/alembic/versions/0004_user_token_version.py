@@ -0,0 +1,23 @@
+"""ユーザーのトークンバージョンを追加
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+アクセストークンに発行時のトークンバージョン（ver クレーム）を含め、
+ユーザー削除・役割変更・パスワード変更時に加算して既存のトークンを即時に無効化する
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE user_infos ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE user_infos DROP COLUMN IF EXISTS token_version")
@@ -0,0 +1,39 @@
+"""ログインセッション（リフレッシュトークン）テーブルを追加
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+アクセストークンの期限切れのたびにパスワードで再ログインさせず、
+リフレッシュトークン（ハッシュのみ保存・使用のたびにローテーション）で再発行できるようにする
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            family_id VARCHAR(32) NOT NULL,
+            token_hash VARCHAR(64) NOT NULL UNIQUE,
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            rotated_at TIMESTAMP WITH TIME ZONE,
+            revoked_at TIMESTAMP WITH TIME ZONE,
+
+            FOREIGN KEY (user_id) REFERENCES user_infos(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_user_id ON user_sessions(user_id) WHERE revoked_at IS NULL")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_family_id ON user_sessions(family_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS user_sessions")
@@ -0,0 +1,66 @@
+"""繰り返しスケジュールテンプレートを追加
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+
+曜日・隔週の規則と期間を schedule_templates に保存し、
+予約可能時間はサーバー側で generate_series により一括生成する（lecture_schedules.template_id に生成元を記録）
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS schedule_templates (
+            id SERIAL PRIMARY KEY,
+            lecture_id INTEGER NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            weekdays SMALLINT[] NOT NULL,
+            interval_weeks SMALLINT NOT NULL DEFAULT 1,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            capacity INTEGER NOT NULL DEFAULT 1,
+            excluded_dates DATE[] NOT NULL DEFAULT '{}',
+            materialized_until DATE,
+            is_active BOOLEAN NOT NULL DEFAULT TRUE,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+            CHECK (start_time < end_time),
+            CHECK (start_date <= end_date),
+            CONSTRAINT schedule_templates_interval_weeks_check CHECK (interval_weeks IN (1, 2)),
+            CONSTRAINT schedule_templates_capacity_check CHECK (capacity > 0),
+
+            FOREIGN KEY (lecture_id) REFERENCES lectures(id) ON DELETE CASCADE,
+            FOREIGN KEY (teacher_id) REFERENCES teacher_profiles(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_schedule_templates_lecture_id ON schedule_templates(lecture_id)")
+    op.execute("""
+        CREATE OR REPLACE TRIGGER update_schedule_templates_updated_at
+            BEFORE UPDATE ON schedule_templates
+            FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()
+    """)
+
+    op.execute("""
+        ALTER TABLE lecture_schedules
+            ADD COLUMN IF NOT EXISTS template_id INTEGER REFERENCES schedule_templates(id) ON DELETE SET NULL
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lecture_schedules_template_id "
+        "ON lecture_schedules(template_id) WHERE template_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_lecture_schedules_template_id")
+    op.execute("ALTER TABLE lecture_schedules DROP COLUMN IF EXISTS template_id")
+    op.execute("DROP TABLE IF EXISTS schedule_templates")
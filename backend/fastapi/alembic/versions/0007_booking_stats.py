@@ -0,0 +1,45 @@
+"""予約統計のマテリアライズドビューを追加
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+
+/bookings/stats は lecture_booking_stats（講座ごとの予約件数と lecture_id = 0 の合計行）を読むだけにし、
+集計はバックエンドの定期処理が REFRESH MATERIALIZED VIEW CONCURRENTLY で更新する
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS lecture_booking_stats AS
+        SELECT
+            COALESCE(l.id, 0) AS lecture_id,
+            l.lecture_title,
+            COUNT(b.id) AS total_bookings,
+            COUNT(b.id) FILTER (WHERE b.status = 'confirmed') AS confirmed_bookings,
+            COUNT(b.id) FILTER (WHERE b.status = 'cancelled') AS cancelled_bookings,
+            COUNT(b.id) FILTER (WHERE b.status = 'pending') AS pending_bookings,
+            CASE WHEN GROUPING(l.id) = 1 THEN now() END AS refreshed_at
+        FROM lectures l
+        JOIN lecture_bookings b ON b.lecture_id = l.id
+        WHERE NOT l.is_deleted
+        GROUP BY GROUPING SETS ((l.id, l.lecture_title), ())
+    """)
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_lecture_booking_stats_lecture_id "
+        "ON lecture_booking_stats(lecture_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lecture_booking_stats_total "
+        "ON lecture_booking_stats(total_bookings DESC, lecture_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS lecture_booking_stats")
@@ -0,0 +1,181 @@
+"""講座別日次集計テーブルを追加
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+
+lecture_daily_stats（日付・講座・講師ごとの予約件数と予約可能時間の席数）を
+lecture_bookings / lecture_schedules の行トリガーで同じトランザクション内に差分更新し、
+期間集計 API（/bookings/analytics）は元テーブルではなく日次集計のみを読む
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TRIGGERS = (
+    ("rollup_lecture_bookings", "lecture_bookings"),
+    ("rollup_lecture_bookings_update", "lecture_bookings"),
+    ("rollup_lecture_schedules", "lecture_schedules"),
+    ("rollup_lecture_schedules_update", "lecture_schedules"),
+)
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS lecture_daily_stats (
+            stat_date DATE NOT NULL,
+            lecture_id INTEGER NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            pending_bookings INTEGER NOT NULL DEFAULT 0,
+            confirmed_bookings INTEGER NOT NULL DEFAULT 0,
+            cancelled_bookings INTEGER NOT NULL DEFAULT 0,
+            slots INTEGER NOT NULL DEFAULT 0,
+            capacity INTEGER NOT NULL DEFAULT 0,
+            booked_seats INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (stat_date, lecture_id, teacher_id)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lecture_daily_stats_lecture_id "
+        "ON lecture_daily_stats(lecture_id, stat_date)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lecture_daily_stats_teacher_id "
+        "ON lecture_daily_stats(teacher_id, stat_date)"
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION add_lecture_daily_stats(
+            p_date DATE, p_lecture_id INTEGER, p_teacher_id INTEGER,
+            p_bookings INTEGER, p_pending INTEGER, p_confirmed INTEGER, p_cancelled INTEGER,
+            p_slots INTEGER, p_capacity INTEGER, p_booked INTEGER
+        ) RETURNS VOID AS $$
+            INSERT INTO lecture_daily_stats AS s (
+                stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings,
+                slots, capacity, booked_seats
+            )
+            VALUES (p_date, p_lecture_id, p_teacher_id, p_bookings, p_pending, p_confirmed, p_cancelled, p_slots, p_capacity, p_booked)
+            ON CONFLICT (stat_date, lecture_id, teacher_id) DO UPDATE SET
+                bookings = s.bookings + EXCLUDED.bookings,
+                pending_bookings = s.pending_bookings + EXCLUDED.pending_bookings,
+                confirmed_bookings = s.confirmed_bookings + EXCLUDED.confirmed_bookings,
+                cancelled_bookings = s.cancelled_bookings + EXCLUDED.cancelled_bookings,
+                slots = s.slots + EXCLUDED.slots,
+                capacity = s.capacity + EXCLUDED.capacity,
+                booked_seats = s.booked_seats + EXCLUDED.booked_seats;
+        $$ LANGUAGE sql;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_lecture_booking()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM add_lecture_daily_stats(
+                    OLD.booking_date, OLD.lecture_id, OLD.teacher_id, -1,
+                    -(OLD.status IS NOT DISTINCT FROM 'pending')::int,
+                    -(OLD.status IS NOT DISTINCT FROM 'confirmed')::int,
+                    -(OLD.status IS NOT DISTINCT FROM 'cancelled')::int,
+                    0, 0, 0);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM add_lecture_daily_stats(
+                    NEW.booking_date, NEW.lecture_id, NEW.teacher_id, 1,
+                    (NEW.status IS NOT DISTINCT FROM 'pending')::int,
+                    (NEW.status IS NOT DISTINCT FROM 'confirmed')::int,
+                    (NEW.status IS NOT DISTINCT FROM 'cancelled')::int,
+                    0, 0, 0);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_lecture_schedule()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND NOT COALESCE(OLD.is_expired, FALSE) THEN
+                PERFORM add_lecture_daily_stats(
+                    OLD.booking_date, OLD.lecture_id, OLD.teacher_id, 0, 0, 0, 0,
+                    -1, -OLD.capacity, -OLD.booked_count);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NOT COALESCE(NEW.is_expired, FALSE) THEN
+                PERFORM add_lecture_daily_stats(
+                    NEW.booking_date, NEW.lecture_id, NEW.teacher_id, 0, 0, 0, 0,
+                    1, NEW.capacity, NEW.booked_count);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # CREATE TRIGGER のテーブルロックはコミットまで保持されるため、集計の再作成中に予約・スケジュールは更新されない
+    for trigger, table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute("""
+        CREATE TRIGGER rollup_lecture_bookings
+            AFTER INSERT OR DELETE ON lecture_bookings
+            FOR EACH ROW EXECUTE FUNCTION rollup_lecture_booking()
+    """)
+    op.execute("""
+        CREATE TRIGGER rollup_lecture_bookings_update
+            AFTER UPDATE OF status, booking_date, lecture_id, teacher_id ON lecture_bookings
+            FOR EACH ROW
+            WHEN (OLD.status IS DISTINCT FROM NEW.status
+                  OR OLD.booking_date <> NEW.booking_date
+                  OR OLD.lecture_id <> NEW.lecture_id
+                  OR OLD.teacher_id <> NEW.teacher_id)
+            EXECUTE FUNCTION rollup_lecture_booking()
+    """)
+    op.execute("""
+        CREATE TRIGGER rollup_lecture_schedules
+            AFTER INSERT OR DELETE ON lecture_schedules
+            FOR EACH ROW EXECUTE FUNCTION rollup_lecture_schedule()
+    """)
+    op.execute("""
+        CREATE TRIGGER rollup_lecture_schedules_update
+            AFTER UPDATE OF is_expired, capacity, booked_count, booking_date, lecture_id, teacher_id ON lecture_schedules
+            FOR EACH ROW
+            WHEN (OLD.is_expired IS DISTINCT FROM NEW.is_expired
+                  OR OLD.capacity <> NEW.capacity
+                  OR OLD.booked_count <> NEW.booked_count
+                  OR OLD.booking_date <> NEW.booking_date
+                  OR OLD.lecture_id <> NEW.lecture_id
+                  OR OLD.teacher_id <> NEW.teacher_id)
+            EXECUTE FUNCTION rollup_lecture_schedule()
+    """)
+    op.execute("TRUNCATE lecture_daily_stats")
+    op.execute("""
+        INSERT INTO lecture_daily_stats (
+            stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings
+        )
+        SELECT
+            booking_date, lecture_id, teacher_id, COUNT(*),
+            COUNT(*) FILTER (WHERE status = 'pending'),
+            COUNT(*) FILTER (WHERE status = 'confirmed'),
+            COUNT(*) FILTER (WHERE status = 'cancelled')
+        FROM lecture_bookings
+        GROUP BY booking_date, lecture_id, teacher_id
+    """)
+    op.execute("""
+        INSERT INTO lecture_daily_stats AS s (stat_date, lecture_id, teacher_id, slots, capacity, booked_seats)
+        SELECT booking_date, lecture_id, teacher_id, COUNT(*), SUM(capacity), SUM(booked_count)
+        FROM lecture_schedules
+        WHERE NOT COALESCE(is_expired, FALSE)
+        GROUP BY booking_date, lecture_id, teacher_id
+        ON CONFLICT (stat_date, lecture_id, teacher_id) DO UPDATE SET
+            slots = EXCLUDED.slots, capacity = EXCLUDED.capacity, booked_seats = EXCLUDED.booked_seats
+    """)
+
+
+def downgrade() -> None:
+    for trigger, table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS rollup_lecture_schedule()")
+    op.execute("DROP FUNCTION IF EXISTS rollup_lecture_booking()")
+    op.execute(
+        "DROP FUNCTION IF EXISTS add_lecture_daily_stats("
+        "DATE, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER)"
+    )
+    op.execute("DROP TABLE IF EXISTS lecture_daily_stats")
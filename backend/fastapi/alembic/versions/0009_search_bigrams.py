@@ -0,0 +1,86 @@
+"""講座・講師名の部分一致検索用の関数とインデックスを追加
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+
+データベースは lc_ctype=C で作成されるため pg_trgm は日本語の文字から trigram を抽出しない。
+NFKC 正規化した文字列の 2 文字の組の配列（search_bigrams）を生成列として保存して GIN インデックスに登録し、
+講座名・講座説明・講師名の部分一致検索（/lectures/search）に使用する。
+生成列の追加で lectures / user_infos は書き換えられる（実行中は両テーブルへのアクセスが待たされる）
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION search_normalize(t TEXT) RETURNS TEXT AS $$
+            SELECT lower(normalize(t, NFKC))
+        $$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION search_bigrams(t TEXT) RETURNS TEXT[] AS $$
+            SELECT coalesce(array_agg(DISTINCT g), '{}')
+            FROM (
+                SELECT substr(s, i, 2) AS g
+                FROM (SELECT public.search_normalize(t) AS s) n, generate_series(1, length(s) - 1) AS i
+            ) grams
+            WHERE g !~ '\\s'
+        $$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bigram_similarity(a TEXT[], b TEXT[]) RETURNS REAL AS $$
+        DECLARE
+            common INTEGER := 0;
+            gram TEXT;
+        BEGIN
+            FOREACH gram IN ARRAY a LOOP
+                IF gram = ANY(b) THEN
+                    common := common + 1;
+                END IF;
+            END LOOP;
+            IF cardinality(a) + cardinality(b) = common THEN
+                RETURN 0;
+            END IF;
+            RETURN common::real / (cardinality(a) + cardinality(b) - common);
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE
+    """)
+    op.execute(
+        "ALTER TABLE user_infos ADD COLUMN IF NOT EXISTS name_bigrams TEXT[] "
+        "GENERATED ALWAYS AS (search_bigrams(name)) STORED"
+    )
+    op.execute("""
+        ALTER TABLE lectures
+            ADD COLUMN IF NOT EXISTS title_bigrams TEXT[]
+                GENERATED ALWAYS AS (search_bigrams(lecture_title)) STORED,
+            ADD COLUMN IF NOT EXISTS description_bigrams TEXT[]
+                GENERATED ALWAYS AS (search_bigrams(lecture_description)) STORED
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lectures_title_bigrams "
+        "ON lectures USING gin (title_bigrams) WHERE NOT is_deleted"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lectures_description_bigrams "
+        "ON lectures USING gin (description_bigrams) WHERE NOT is_deleted"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_infos_name_bigrams "
+        "ON user_infos USING gin (name_bigrams)"
+    )
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_user_infos_name_bigrams")
+    op.execute("DROP INDEX IF EXISTS idx_lectures_description_bigrams")
+    op.execute("DROP INDEX IF EXISTS idx_lectures_title_bigrams")
+    op.execute("ALTER TABLE lectures DROP COLUMN IF EXISTS description_bigrams, DROP COLUMN IF EXISTS title_bigrams")
+    op.execute("ALTER TABLE user_infos DROP COLUMN IF EXISTS name_bigrams")
+    op.execute("DROP FUNCTION IF EXISTS bigram_similarity(TEXT[], TEXT[])")
+    op.execute("DROP FUNCTION IF EXISTS search_bigrams(TEXT)")
+    op.execute("DROP FUNCTION IF EXISTS search_normalize(TEXT)")
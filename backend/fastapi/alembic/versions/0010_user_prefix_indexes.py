@@ -0,0 +1,32 @@
+"""ユーザー名・メールアドレスの前方一致（自動補全）用のインデックスを追加
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+
+/users/autocomplete の前方一致を search_normalize(列) COLLATE "C" の範囲条件で検索する。
+text_pattern_ops は LIKE 'xxx%' の定数パターンにしか使われず、既定の照合順序での並べ替えにも使えないため、
+C 照合順序の式インデックスにして範囲検索と候補の並べ替え（+ id）を同じインデックスで行う
+"""
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_infos_name_prefix "
+        "ON user_infos ((search_normalize(name) COLLATE \"C\"), id) WHERE NOT is_deleted"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_infos_email_prefix "
+        "ON user_infos ((search_normalize(email) COLLATE \"C\"), id) WHERE NOT is_deleted"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_user_infos_email_prefix")
+    op.execute("DROP INDEX IF EXISTS idx_user_infos_name_prefix")
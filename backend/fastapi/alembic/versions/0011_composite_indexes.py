@@ -0,0 +1,82 @@
+"""一覧・検索の条件に合わせた複合・部分インデックスに置き換える
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+
+単一列のインデックス（is_deleted / is_expired / is_active / status などの値の種類が少ない列を含む）を、
+各エンドポイントの検索条件と並び順に合わせた複合インデックス・部分インデックスに置き換える。
+稼働中のテーブルへの書き込みを止めないよう CREATE / DROP INDEX CONCURRENTLY で実行する
+（トランザクション内では実行できないため autocommit_block を使用）。
+中断された CONCURRENTLY の作成は無効なインデックスを残すため、作成前に無効なインデックスを削除して作り直す
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# 追加するインデックス（名前, 定義）
+NEW_INDEXES = [
+    ("idx_user_infos_active_role", "user_infos (role, id) WHERE NOT is_deleted"),
+    ("idx_lectures_active_created", "lectures (created_at DESC, id DESC) WHERE NOT is_deleted"),
+    ("idx_lecture_schedules_lecture_slot", "lecture_schedules (lecture_id, booking_date, start_time)"),
+    ("idx_lecture_schedules_active_slot", "lecture_schedules (booking_date, start_time, id) WHERE NOT is_expired"),
+    ("idx_lecture_bookings_user_slot", "lecture_bookings (user_id, booking_date DESC, start_time)"),
+    ("idx_lecture_bookings_lecture_slot", "lecture_bookings (lecture_id, booking_date, start_time)"),
+    ("idx_lecture_bookings_date_slot", "lecture_bookings (booking_date DESC, start_time, id)"),
+    ("idx_carousel_active_order", "carousel (display_order) WHERE is_active"),
+]
+
+# 置き換え・重複により削除するインデックス（名前, 定義）
+OLD_INDEXES = [
+    # email の UNIQUE 制約のインデックスと重複
+    ("idx_user_infos_email", "user_infos (email)"),
+    ("idx_user_infos_role", "user_infos (role)"),
+    ("idx_user_infos_is_deleted", "user_infos (is_deleted)"),
+    ("idx_lectures_is_deleted", "lectures (is_deleted)"),
+    ("idx_lecture_schedules_lecture_id", "lecture_schedules (lecture_id)"),
+    ("idx_lecture_schedules_booking_date", "lecture_schedules (booking_date)"),
+    ("idx_lecture_schedules_is_expired", "lecture_schedules (is_expired)"),
+    ("idx_lecture_bookings_user_id", "lecture_bookings (user_id)"),
+    ("idx_lecture_bookings_lecture_id", "lecture_bookings (lecture_id)"),
+    ("idx_lecture_bookings_booking_date", "lecture_bookings (booking_date)"),
+    ("idx_lecture_bookings_status", "lecture_bookings (status)"),
+    ("idx_lecture_bookings_is_expired", "lecture_bookings (is_expired)"),
+    # 主キー (lecture_id, teacher_id) と重複
+    ("idx_lecture_teachers_lecture_id", "lecture_teachers (lecture_id)"),
+    ("idx_carousel_display_order", "carousel (display_order)"),
+    ("idx_carousel_is_active", "carousel (is_active)"),
+]
+
+
+def _create_indexes(indexes) -> None:
+    bind = op.get_bind()
+    for name, definition in indexes:
+        invalid = bind.scalar(
+            text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": name}
+        )
+        if invalid:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def _drop_indexes(indexes) -> None:
+    for name, _ in indexes:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # 新しいインデックスを作成してから古いインデックスを削除する（途中で検索がインデックスを失わないように）
+        _create_indexes(NEW_INDEXES)
+        _drop_indexes(OLD_INDEXES)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_indexes(OLD_INDEXES)
+        _drop_indexes(NEW_INDEXES)
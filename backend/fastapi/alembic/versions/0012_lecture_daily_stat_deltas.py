@@ -0,0 +1,107 @@
+"""講座別日次集計の差分を追記専用テーブルに書き込み、定期処理で集約する
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17
+
+これまでは予約・スケジュールのトリガーが同じトランザクション内で lecture_daily_stats の共有行を更新していたため、
+同じ日付・講座の予約作成とキャンセルが行ロックを逆順に取得してデッドロックすることがあった。
+トリガーは差分を lecture_daily_stat_deltas に追記するだけにし（一意制約がないため行ロックで競合しない）、
+バックエンドの定期処理が fold_lecture_daily_stat_deltas() で lecture_daily_stats に集約する
+"""
+from alembic import op
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+# 差分を日次集計に加算する関数（downgrade で元に戻す）
+UPSERT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION add_lecture_daily_stats(
+        p_date DATE, p_lecture_id INTEGER, p_teacher_id INTEGER,
+        p_bookings INTEGER, p_pending INTEGER, p_confirmed INTEGER, p_cancelled INTEGER,
+        p_slots INTEGER, p_capacity INTEGER, p_booked INTEGER
+    ) RETURNS VOID AS $$
+        INSERT INTO lecture_daily_stats AS s (
+            stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings,
+            slots, capacity, booked_seats
+        )
+        VALUES (p_date, p_lecture_id, p_teacher_id, p_bookings, p_pending, p_confirmed, p_cancelled, p_slots, p_capacity, p_booked)
+        ON CONFLICT (stat_date, lecture_id, teacher_id) DO UPDATE SET
+            bookings = s.bookings + EXCLUDED.bookings,
+            pending_bookings = s.pending_bookings + EXCLUDED.pending_bookings,
+            confirmed_bookings = s.confirmed_bookings + EXCLUDED.confirmed_bookings,
+            cancelled_bookings = s.cancelled_bookings + EXCLUDED.cancelled_bookings,
+            slots = s.slots + EXCLUDED.slots,
+            capacity = s.capacity + EXCLUDED.capacity,
+            booked_seats = s.booked_seats + EXCLUDED.booked_seats;
+    $$ LANGUAGE sql;
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS lecture_daily_stat_deltas (
+            id BIGSERIAL PRIMARY KEY,
+            stat_date DATE NOT NULL,
+            lecture_id INTEGER NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            pending_bookings INTEGER NOT NULL DEFAULT 0,
+            confirmed_bookings INTEGER NOT NULL DEFAULT 0,
+            cancelled_bookings INTEGER NOT NULL DEFAULT 0,
+            slots INTEGER NOT NULL DEFAULT 0,
+            capacity INTEGER NOT NULL DEFAULT 0,
+            booked_seats INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION add_lecture_daily_stats(
+            p_date DATE, p_lecture_id INTEGER, p_teacher_id INTEGER,
+            p_bookings INTEGER, p_pending INTEGER, p_confirmed INTEGER, p_cancelled INTEGER,
+            p_slots INTEGER, p_capacity INTEGER, p_booked INTEGER
+        ) RETURNS VOID AS $$
+            INSERT INTO lecture_daily_stat_deltas (
+                stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings,
+                slots, capacity, booked_seats
+            )
+            VALUES (p_date, p_lecture_id, p_teacher_id, p_bookings, p_pending, p_confirmed, p_cancelled, p_slots, p_capacity, p_booked);
+        $$ LANGUAGE sql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fold_lecture_daily_stat_deltas(p_limit INTEGER)
+        RETURNS INTEGER AS $$
+            WITH batch AS (
+                DELETE FROM lecture_daily_stat_deltas
+                WHERE id IN (SELECT id FROM lecture_daily_stat_deltas ORDER BY id LIMIT p_limit)
+                RETURNING *
+            ), folded AS (
+                INSERT INTO lecture_daily_stats AS s (
+                    stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings,
+                    slots, capacity, booked_seats
+                )
+                SELECT stat_date, lecture_id, teacher_id, sum(bookings), sum(pending_bookings), sum(confirmed_bookings),
+                       sum(cancelled_bookings), sum(slots), sum(capacity), sum(booked_seats)
+                FROM batch
+                GROUP BY stat_date, lecture_id, teacher_id
+                ON CONFLICT (stat_date, lecture_id, teacher_id) DO UPDATE SET
+                    bookings = s.bookings + EXCLUDED.bookings,
+                    pending_bookings = s.pending_bookings + EXCLUDED.pending_bookings,
+                    confirmed_bookings = s.confirmed_bookings + EXCLUDED.confirmed_bookings,
+                    cancelled_bookings = s.cancelled_bookings + EXCLUDED.cancelled_bookings,
+                    slots = s.slots + EXCLUDED.slots,
+                    capacity = s.capacity + EXCLUDED.capacity,
+                    booked_seats = s.booked_seats + EXCLUDED.booked_seats
+            )
+            SELECT count(*)::int FROM batch;
+        $$ LANGUAGE sql
+    """)
+
+
+def downgrade() -> None:
+    # 未集約の差分を日次集計に反映してから、トリガーが日次集計を直接更新する関数に戻す
+    op.execute("SELECT fold_lecture_daily_stat_deltas(2147483647)")
+    op.execute(UPSERT_FUNCTION)
+    op.execute("DROP FUNCTION IF EXISTS fold_lecture_daily_stat_deltas(INTEGER)")
+    op.execute("DROP TABLE IF EXISTS lecture_daily_stat_deltas")
@@ -21,6 +21,9 @@ from .endpoints import bookings
 # スケジュールルーターをインポート
 from .endpoints import schedules
 
+# 診断ルーターをインポート
+from .endpoints import diagnostics
+
 # ユーザールーターを登録
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 
@@ -35,3 +38,6 @@ api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"]
 
 # スケジュールルーターを登録
 api_router.include_router(schedules.router, prefix="/schedules", tags=["schedules"])
+
+# 診断ルーターを登録
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
@@ -1,51 +1,75 @@
 """
 講座予約関連 API エンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, case, cast, String
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, or_, func, case, cast, union_all, String, Date, DateTime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from typing import AsyncIterator, List, Optional, Tuple
+import csv
+import io
+import json
 import logging
 import traceback
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 
 from app.models.user import User
 from app.models.lecture import Lecture
-from app.models.booking import LectureBooking
+from app.models.booking import LectureBooking, LectureSchedule, LectureDailyStat, LectureDailyStatDelta
 from app.schemas.booking import BookingListOut, BookingItemCreate, BookingCreateResponse, BookingCancelResponse
 from app.utils.jwt import get_current_user, get_current_admin
-from app.db.database import get_db
+from app.core.server_timing import TimedRoute
+from app.db.database import get_async_db, AsyncSessionLocal
+from app.db.booking_stats import get_booking_stats as get_materialized_booking_stats
+from app.db.errors import is_exclusion_violation
+from app.utils.etag import conditional_get
+from app.utils.pagination import KeysetPage, MAX_PAGE_LIMIT
 from app.schemas.booking import UserBookingsResponse, UserBookingRecord
+from app.schemas.booking import BookingAnalyticsResponse, BookingAnalyticsBucket
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
+# 同一用户在同一讲座的有效预约之间禁止时间重叠的排他约束名
+BOOKING_OVERLAP_CONSTRAINT = "lecture_bookings_no_overlap"
 
-def _build_booking_query(db: Session, lecture_id: Optional[int] = None):
+# 预约列表的排序键（与 _build_booking_query 的排序一致，以ID保证顺序唯一）
+BOOKING_SORT_KEYS = [
+    (LectureBooking.booking_date, True),
+    (LectureBooking.start_time, False),
+    (LectureBooking.id, False)
+]
+
+# 已预约时间段的内容所依赖的表（用于计算 ETag）
+BOOKED_TIMES_TABLES = ("lecture_bookings", "lectures")
+
+
+def _build_booking_query(lecture_id: Optional[int] = None):
     """
     构建预约查询的基础查询对象
     
     Args:
-        db: 数据库会话
         lecture_id: 可选的讲座ID，如果提供则只查询特定讲座
     
     Returns:
         查询对象
     """
+    # 预约的讲师（以别名连接用户表，与预约者的用户表区分）
+    teacher = aliased(User)
+    
     # 基础查询：使用JOIN优化，避免N+1查询问题
-    query = db.query(
+    query = select(
         LectureBooking.id.label('id'),
         LectureBooking.user_id.label('user_id'),
         User.name.label('user_name'),
         LectureBooking.lecture_id.label('lecture_id'),
         Lecture.lecture_title.label('lecture_title'),
         func.coalesce(
-            db.query(User.name)
-            .filter(User.id == Lecture.teacher_id)
-            .limit(1)
-            .scalar(),
+            teacher.name,
             'Unknown'
         ).label('teacher_name'),
         case(
@@ -61,7 +85,9 @@ def _build_booking_query(db: Session, lecture_id: Optional[int] = None):
         LectureBooking, LectureBooking.lecture_id == Lecture.id
     ).join(
         User, LectureBooking.user_id == User.id
-    ).filter(
+    ).outerjoin(
+        teacher, LectureBooking.teacher_id == teacher.id
+    ).where(
         and_(
             Lecture.is_deleted == False,
             User.is_deleted == False,
@@ -71,7 +97,7 @@ def _build_booking_query(db: Session, lecture_id: Optional[int] = None):
     
     # 如果指定了讲座ID，添加过滤条件
     if lecture_id is not None:
-        query = query.filter(LectureBooking.lecture_id == lecture_id)
+        query = query.where(LectureBooking.lecture_id == lecture_id)
     
     # 排序
     query = query.order_by(
@@ -112,7 +138,7 @@ def _convert_to_response_model(bookings: List) -> List[BookingListOut]:
     return booking_list
 
 
-def _check_teacher_permission(db: Session, current_user: User, lecture_id: int) -> bool:
+async def _check_teacher_permission(db: AsyncSession, current_user: User, lecture_id: int) -> bool:
     """
     检查讲师是否有权限访问指定讲座的预约信息
     
@@ -128,10 +154,12 @@ def _check_teacher_permission(db: Session, current_user: User, lecture_id: int)
         HTTPException: 权限不足时抛出异常
     """
     # 检查讲座是否存在
-    lecture = db.query(Lecture).filter(
-        Lecture.id == lecture_id,
-        Lecture.is_deleted == False
-    ).first()
+    lecture = await db.scalar(
+        select(Lecture).where(
+            Lecture.id == lecture_id,
+            Lecture.is_deleted == False
+        )
+    )
     
     if not lecture:
         raise HTTPException(
@@ -145,10 +173,12 @@ def _check_teacher_permission(db: Session, current_user: User, lecture_id: int)
     
     # 检查是否为多讲师讲座的追加讲师
     from app.models.lecture import LectureTeacher
-    is_additional_teacher = db.query(LectureTeacher).filter(
-        LectureTeacher.lecture_id == lecture_id,
-        LectureTeacher.teacher_id == current_user.id
-    ).first()
+    is_additional_teacher = await db.scalar(
+        select(LectureTeacher).where(
+            LectureTeacher.lecture_id == lecture_id,
+            LectureTeacher.teacher_id == current_user.id
+        )
+    )
     
     if not is_additional_teacher:
         raise HTTPException(
@@ -159,142 +189,202 @@ def _check_teacher_permission(db: Session, current_user: User, lecture_id: int)
     return True
 
 
-def _validate_booking_data(db: Session, booking_item: BookingItemCreate, current_user: User) -> List[str]:
+def _parse_booking_times(booking_item: BookingItemCreate) -> Tuple[date, time, time]:
+    """
+    解析预约的日期和时间字符串
+    
+    Args:
+        booking_item: 预约项目
+    
+    Returns:
+        (预约日期, 开始时间, 结束时间)
+    
+    Raises:
+        ValueError: 格式错误时
+    """
+    return (
+        datetime.strptime(booking_item.reserved_date, "%Y-%m-%d").date(),
+        datetime.strptime(booking_item.start_time, "%H:%M").time(),
+        datetime.strptime(booking_item.end_time, "%H:%M").time()
+    )
+
+
+async def _validate_booking_data(
+    db: AsyncSession,
+    booking_item: BookingItemCreate,
+    current_user: User
+) -> Tuple[List[str], Optional[Tuple[date, time, time]]]:
     """
     验证预约数据的有效性
     
+    讲座、讲师及可预约时间的检查合并为一条查询（各项以 EXISTS 子查询返回标志），
+    每次预约只需一次数据库往返；时间冲突由排他约束在插入时检测
+    
     Args:
         db: 数据库会话
         booking_item: 预约项目
         current_user: 当前用户
     
     Returns:
-        错误信息列表
+        (错误信息列表, 解析后的 (预约日期, 开始时间, 结束时间)；格式错误时为 None)
     """
+    from app.models.lecture import LectureTeacher
+    
     errors = []
     
     # 1. 检查用户权限：只能预约自己的信息
     if booking_item.user_id != current_user.id:
         errors.append(f"ユーザーID {booking_item.user_id} は自分のIDと一致する必要があります")
     
-    # 2. 检查讲座是否存在
-    lecture = db.query(Lecture).filter(
+    # 解析日期和时间（仅解析一次）
+    try:
+        parsed_times = _parse_booking_times(booking_item)
+    except ValueError as e:
+        parsed_times = None
+        time_error = f"時間形式エラー: {str(e)}"
+    
+    # 2. 讲座是否存在
+    lecture_exists = select(Lecture.id).where(
         Lecture.id == booking_item.lecture_id,
         Lecture.is_deleted == False
-    ).first()
+    ).exists()
     
-    if not lecture:
-        errors.append(f"講座ID {booking_item.lecture_id} が見つかりません")
-    else:
-        # 3. 检查讲师ID是否与讲座匹配（考虑多讲师讲座）
-        is_valid_teacher = False
-        
-        # 检查是否为主讲讲师
-        if lecture.teacher_id == booking_item.teacher_id:
-            is_valid_teacher = True
+    # 3. 讲师ID是否与讲座匹配（主讲讲师或多讲师讲座的追加讲师）
+    teacher_matches = or_(
+        select(Lecture.id).where(
+            Lecture.id == booking_item.lecture_id,
+            Lecture.is_deleted == False,
+            Lecture.teacher_id == booking_item.teacher_id
+        ).exists(),
+        select(LectureTeacher.lecture_id).where(
+            LectureTeacher.lecture_id == booking_item.lecture_id,
+            LectureTeacher.teacher_id == booking_item.teacher_id
+        ).exists()
+    )
+    
+    flags = [lecture_exists.label("lecture_exists"), teacher_matches.label("teacher_matches")]
+    
+    if parsed_times is not None:
+        reserved_date, start_time, end_time = parsed_times
         
-        # 如果不是主讲讲师，检查是否为多讲师讲座的追加讲师
-        if not is_valid_teacher:
-            from app.models.lecture import LectureTeacher
-            additional_teacher = db.query(LectureTeacher).filter(
-                and_(
-                    LectureTeacher.lecture_id == booking_item.lecture_id,
-                    LectureTeacher.teacher_id == booking_item.teacher_id
-                )
-            ).first()
-            
-            if additional_teacher:
-                is_valid_teacher = True
+        # 5. 预约的时间段是否在可预约时间表中存在
+        schedule_available = select(LectureSchedule.id).where(
+            LectureSchedule.lecture_id == booking_item.lecture_id,
+            LectureSchedule.teacher_id == booking_item.teacher_id,
+            LectureSchedule.booking_date == reserved_date,
+            LectureSchedule.start_time <= start_time,
+            LectureSchedule.end_time >= end_time,
+            LectureSchedule.is_expired == False
+        ).exists()
         
-        if not is_valid_teacher:
-            errors.append(f"講師ID {booking_item.teacher_id} は講座ID {booking_item.lecture_id} の講師と一致しません")
+        flags.append(schedule_available.label("schedule_available"))
+    
+    result = (await db.execute(select(*flags))).one()
+    
+    if not result.lecture_exists:
+        errors.append(f"講座ID {booking_item.lecture_id} が見つかりません")
+    elif not result.teacher_matches:
+        errors.append(f"講師ID {booking_item.teacher_id} は講座ID {booking_item.lecture_id} の講師と一致しません")
     
     # 4. 检查时间格式和逻辑
-    try:
-        reserved_date = datetime.strptime(booking_item.reserved_date, "%Y-%m-%d").date()
-        start_time = datetime.strptime(booking_item.start_time, "%H:%M").time()
-        end_time = datetime.strptime(booking_item.end_time, "%H:%M").time()
-        
-        # 检查开始时间是否早于结束时间
-        if start_time >= end_time:
-            errors.append("開始時間は終了時間より早い必要があります")
-        
-        # 检查预约日期是否为过去
-        if reserved_date < date.today():
-            errors.append("過去の日付に予約することはできません")
-            
-    except ValueError as e:
-        errors.append(f"時間形式エラー: {str(e)}")
+    if parsed_times is None:
+        errors.append(time_error)
+        return errors, None
     
-    # 5. 检查预约时间是否在可预约时间表中存在
-    try:
-        reserved_date = datetime.strptime(booking_item.reserved_date, "%Y-%m-%d").date()
-        start_time = datetime.strptime(booking_item.start_time, "%H:%M").time()
-        end_time = datetime.strptime(booking_item.end_time, "%H:%M").time()
-        
-        # 检查预约的时间段是否在可预约时间表中存在
-        from app.models.booking import LectureSchedule
-        available_schedule = db.query(LectureSchedule).filter(
-            and_(
-                LectureSchedule.lecture_id == booking_item.lecture_id,
-                LectureSchedule.teacher_id == booking_item.teacher_id,  # 新增：检查讲师ID
-                LectureSchedule.booking_date == reserved_date,
-                LectureSchedule.start_time <= start_time,
-                LectureSchedule.end_time >= end_time,
-                LectureSchedule.is_expired == False
-            )
-        ).first()
-        
-        if not available_schedule:
-            errors.append(f"日付 {booking_item.reserved_date} の時間帯 {booking_item.start_time}-{booking_item.end_time} は予約可能な時間ではありません")
-            
-    except Exception as e:
-        errors.append(f"可予約時間チェックエラー: {str(e)}")
+    if start_time >= end_time:
+        errors.append("開始時間は終了時間より早い必要があります")
     
-    # 6. 检查时间冲突（同一用户在同一讲座的同一时间段）
-    try:
-        reserved_date = datetime.strptime(booking_item.reserved_date, "%Y-%m-%d").date()
-        start_time = datetime.strptime(booking_item.start_time, "%H:%M").time()
-        end_time = datetime.strptime(booking_item.end_time, "%H:%M").time()
-        
-        # 检查是否存在时间冲突的预约
-        conflicting_booking = db.query(LectureBooking).filter(
-            and_(
+    if reserved_date < date.today():
+        errors.append("過去の日付に予約することはできません")
+    
+    if not result.schedule_available:
+        errors.append(f"日付 {booking_item.reserved_date} の時間帯 {booking_item.start_time}-{booking_item.end_time} は予約可能な時間ではありません")
+    
+    # 6. 时间冲突（同一用户在同一讲座的同一时间段）由排他约束 lecture_bookings_no_overlap 在插入时检查
+    
+    return errors, parsed_times
+
+
+async def _reserve_schedule_seat(
+    db: AsyncSession,
+    booking_item: BookingItemCreate,
+    reserved_date: date,
+    start_time: time,
+    end_time: time
+) -> Optional[int]:
+    """
+    原子地占用可预约时间表中的一个席位
+    
+    以条件 UPDATE（booked_count < capacity）增加已预约数，并发请求在同一行的行锁上串行化，
+    因此不会超出定员
+    
+    Args:
+        db: 数据库会话
+        booking_item: 预约项目
+        reserved_date: 预约日期
+        start_time: 开始时间
+        end_time: 结束时间
+    
+    Returns:
+        占用席位的时间表ID；没有空余席位时为 None
+    """
+    has_vacancy = LectureSchedule.booked_count < LectureSchedule.capacity
+    
+    target_schedule = select(LectureSchedule.id).where(
+        LectureSchedule.lecture_id == booking_item.lecture_id,
+        LectureSchedule.teacher_id == booking_item.teacher_id,
+        LectureSchedule.booking_date == reserved_date,
+        LectureSchedule.start_time <= start_time,
+        LectureSchedule.end_time >= end_time,
+        LectureSchedule.is_expired == False,
+        has_vacancy
+    ).order_by(
+        LectureSchedule.start_time.asc()
+    ).limit(1).with_for_update().scalar_subquery()
+    
+    return await db.scalar(
+        update(LectureSchedule)
+        .where(LectureSchedule.id == target_schedule, has_vacancy)
+        .values(booked_count=LectureSchedule.booked_count + 1)
+        .returning(LectureSchedule.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _has_conflicting_booking(
+    db: AsyncSession,
+    booking_item: BookingItemCreate,
+    reserved_date: date,
+    start_time: time,
+    end_time: time
+) -> bool:
+    """
+    检查同一用户在同一讲座是否已有时间重叠的有效预约
+    
+    重叠的防止由排他约束负责，此函数仅用于在占用席位失败时区分「重复预约」与「满席」
+    """
+    time_range = func.tsrange(
+        datetime.combine(reserved_date, start_time),
+        datetime.combine(reserved_date, end_time)
+    )
+    
+    return await db.scalar(
+        select(
+            select(LectureBooking.id).where(
                 LectureBooking.user_id == booking_item.user_id,
                 LectureBooking.lecture_id == booking_item.lecture_id,
-                LectureBooking.booking_date == reserved_date,
                 LectureBooking.status.in_(['pending', 'confirmed']),
-                or_(
-                    and_(
-                        LectureBooking.start_time <= start_time,
-                        LectureBooking.end_time > start_time
-                    ),
-                    and_(
-                        LectureBooking.start_time < end_time,
-                        LectureBooking.end_time >= end_time
-                    ),
-                    and_(
-                        LectureBooking.start_time >= start_time,
-                        LectureBooking.end_time <= end_time
-                    )
-                )
-            )
-        ).first()
-        
-        if conflicting_booking:
-            errors.append(f"時間帯 {booking_item.start_time}-{booking_item.end_time} に既に予約が存在します")
-            
-    except Exception as e:
-        errors.append(f"時間衝突チェックエラー: {str(e)}")
-    
-    return errors
+                LectureBooking.time_range.op("&&")(time_range)
+            ).exists()
+        )
+    )
 
 
 @router.post("/register", response_model=BookingCreateResponse)
 async def create_booking(
     booking_data: BookingItemCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     予約情報登録API（本人）
@@ -314,7 +404,7 @@ async def create_booking(
     
     try:
         # 验证数据
-        errors = _validate_booking_data(db, booking_data, current_user)
+        errors, parsed_times = await _validate_booking_data(db, booking_data, current_user)
         
         if errors:
             # 验证失败，返回第一个错误
@@ -323,20 +413,48 @@ async def create_booking(
                 detail=errors[0]  # 返回第一个错误信息
             )
         
+        reserved_date, start_time, end_time = parsed_times
+        
+        # 占用席位（定員に達している場合は予約不可）
+        schedule_id = await _reserve_schedule_seat(db, booking_data, reserved_date, start_time, end_time)
+        
+        if schedule_id is None:
+            await db.rollback()
+            if await _has_conflicting_booking(db, booking_data, reserved_date, start_time, end_time):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"時間帯 {booking_data.start_time}-{booking_data.end_time} に既に予約が存在します"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"日付 {booking_data.reserved_date} の時間帯 {booking_data.start_time}-{booking_data.end_time} は満席です"
+            )
+        
         # 创建预约记录
         new_booking = LectureBooking(
             user_id=booking_data.user_id,
             lecture_id=booking_data.lecture_id,
             teacher_id=booking_data.teacher_id,  # 新增：讲师ID
+            schedule_id=schedule_id,
             status="pending",  # 默认状态为pending
-            booking_date=datetime.strptime(booking_data.reserved_date, "%Y-%m-%d").date(),
-            start_time=datetime.strptime(booking_data.start_time, "%H:%M").time(),
-            end_time=datetime.strptime(booking_data.end_time, "%H:%M").time(),
+            booking_date=reserved_date,
+            start_time=start_time,
+            end_time=end_time,
             is_expired=False
         )
         
+        # 时间冲突由排他约束检测
         db.add(new_booking)
-        db.commit()
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            if not is_exclusion_violation(e, BOOKING_OVERLAP_CONSTRAINT):
+                raise
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"時間帯 {booking_data.start_time}-{booking_data.end_time} に既に予約が存在します"
+            )
         
         logger.info(f"予約登録完了: 预约ID {new_booking.id}")
         
@@ -345,7 +463,7 @@ async def create_booking(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"予約登録エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -359,7 +477,7 @@ async def create_booking(
 async def cancel_booking(
     booking_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     予約取消API（本人）
@@ -379,9 +497,11 @@ async def cancel_booking(
     
     try:
         # 查找预约记录
-        booking = db.query(LectureBooking).filter(
-            LectureBooking.id == booking_id
-        ).first()
+        booking = await db.scalar(
+            select(LectureBooking).where(
+                LectureBooking.id == booking_id
+            )
+        )
         
         if not booking:
             raise HTTPException(
@@ -409,9 +529,32 @@ async def cancel_booking(
                     detail=f"現在の予約状態 '{booking.status}' ではキャンセルできません"
                 )
         
-        # 更新预约状态为cancelled
-        booking.status = 'cancelled'
-        db.commit()
+        # 先释放占用的席位再更新预约状态：与预约创建（先锁定时间段行，再插入预约行）的加锁顺序一致，避免死锁
+        if booking.schedule_id is not None:
+            await db.execute(
+                update(LectureSchedule)
+                .where(LectureSchedule.id == booking.schedule_id, LectureSchedule.booked_count > 0)
+                .values(booked_count=LectureSchedule.booked_count - 1)
+                .execution_options(synchronize_session=False)
+            )
+        
+        # 更新预约状态为cancelled（以状态为条件；并发取消已生效时回滚，席位不会被重复释放）
+        cancelled = await db.scalar(
+            update(LectureBooking)
+            .where(LectureBooking.id == booking_id, LectureBooking.status == 'pending')
+            .values(status='cancelled')
+            .returning(LectureBooking.id)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if cancelled is None:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="予約状態が変更されたためキャンセルできません"
+            )
+        
+        await db.commit()
         
         logger.info(f"予約取消完了: 预约ID {booking_id}")
         
@@ -420,7 +563,7 @@ async def cancel_booking(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"予約取消エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -434,7 +577,7 @@ async def cancel_booking(
 async def get_lecture_bookings(
     lecture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     予約一覧取得API（講師・管理者）
@@ -454,10 +597,12 @@ async def get_lecture_bookings(
     
     try:
         # 检查讲座是否存在
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -466,10 +611,10 @@ async def get_lecture_bookings(
             )
         
         # 构建查询
-        query = _build_booking_query(db, lecture_id)
+        query = _build_booking_query(lecture_id)
         
         # 执行查询
-        bookings = query.all()
+        bookings = (await db.execute(query)).all()
         
         logger.info(f"予約一覧取得成功: 講座ID {lecture_id}, {len(bookings)}件")
         
@@ -490,13 +635,19 @@ async def get_lecture_bookings(
 
 @router.get("/all", response_model=List[BookingListOut])
 async def get_all_bookings(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの件数（指定時はカーソル方式のページネーション）"),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     全講座予約一覧取得API（管理者のみ）
     
     Args:
+        response: レスポンス（次ページのカーソルを X-Next-Cursor ヘッダーに設定）
+        limit: 1ページの件数（未指定かつ cursor 未指定の場合は全件）
+        cursor: 次ページ取得用カーソル
         current_user: 現在のユーザー（管理者権限が必要）
         db: データベースセッション
     
@@ -508,12 +659,18 @@ async def get_all_bookings(
     """
     logger.info(f"全講座予約一覧取得リクエスト by {current_user.email}")
     
+    page = KeysetPage(BOOKING_SORT_KEYS, limit, cursor)
+    
     try:
         # 构建查询（不指定讲座ID，查询所有）
-        query = _build_booking_query(db)
+        query = page.apply(_build_booking_query())
         
         # 执行查询
-        bookings = query.all()
+        bookings = page.finish(
+            (await db.execute(query)).all(),
+            lambda b: (b.booking_date, b.start_time, b.id),
+            response
+        )
         
         logger.info(f"全講座予約一覧取得成功: {len(bookings)}件")
         
@@ -532,10 +689,173 @@ async def get_all_bookings(
         )
 
 
+# 导出时每次从服务器端游标读取的行数
+EXPORT_BATCH_SIZE = 1000
+
+# 导出列（顺序即 CSV 的列顺序）
+EXPORT_COLUMNS = [
+    "id", "user_id", "user_name", "lecture_id", "lecture_title", "teacher_id", "teacher_name",
+    "status", "booking_date", "start_time", "end_time", "created_at"
+]
+
+
+def _build_export_query(
+    date_from: Optional[date],
+    date_to: Optional[date],
+    lecture_id: Optional[int],
+    booking_status: Optional[str]
+):
+    """
+    构建预约导出查询
+    
+    Args:
+        date_from: 预约日期下限（含）
+        date_to: 预约日期上限（含）
+        lecture_id: 讲座ID
+        booking_status: 预约状态
+    
+    Returns:
+        查询对象
+    """
+    teacher = aliased(User)
+    
+    query = select(
+        LectureBooking.id.label('id'),
+        LectureBooking.user_id.label('user_id'),
+        User.name.label('user_name'),
+        LectureBooking.lecture_id.label('lecture_id'),
+        Lecture.lecture_title.label('lecture_title'),
+        LectureBooking.teacher_id.label('teacher_id'),
+        func.coalesce(teacher.name, 'Unknown').label('teacher_name'),
+        LectureBooking.status.label('status'),
+        LectureBooking.booking_date.label('booking_date'),
+        LectureBooking.start_time.label('start_time'),
+        LectureBooking.end_time.label('end_time'),
+        LectureBooking.created_at.label('created_at')
+    ).join(
+        Lecture, LectureBooking.lecture_id == Lecture.id
+    ).join(
+        User, LectureBooking.user_id == User.id
+    ).outerjoin(
+        teacher, LectureBooking.teacher_id == teacher.id
+    ).where(
+        Lecture.is_deleted == False,
+        User.is_deleted == False
+    )
+    
+    if date_from is not None:
+        query = query.where(LectureBooking.booking_date >= date_from)
+    if date_to is not None:
+        query = query.where(LectureBooking.booking_date <= date_to)
+    if lecture_id is not None:
+        query = query.where(LectureBooking.lecture_id == lecture_id)
+    if booking_status is not None:
+        query = query.where(LectureBooking.status == booking_status)
+    
+    return query.order_by(
+        LectureBooking.booking_date.desc(),
+        LectureBooking.start_time.asc(),
+        LectureBooking.id.asc()
+    )
+
+
+def _export_value(value):
+    """导出用的值转换（日期时间转为 ISO 8601 字符串）"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+async def _stream_export_rows(query, export_format: str) -> AsyncIterator[str]:
+    """
+    以服务器端游标逐批读取预约并输出 CSV / NDJSON
+    
+    为了不依赖请求作用域的会话生命周期，在生成器内部创建独立的会话；
+    每批只保留 EXPORT_BATCH_SIZE 行，内存占用与总行数无关
+    """
+    if export_format == "csv":
+        # 带 BOM，方便在 Excel 中正确显示日文
+        yield "\ufeff" + ",".join(EXPORT_COLUMNS) + "\r\n"
+    
+    exported = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                buffer = io.StringIO()
+                if export_format == "csv":
+                    writer = csv.writer(buffer, lineterminator="\r\n")
+                    writer.writerows([_export_value(v) for v in row] for row in rows)
+                else:
+                    for row in rows:
+                        buffer.write(json.dumps(
+                            dict(zip(EXPORT_COLUMNS, map(_export_value, row))),
+                            ensure_ascii=False
+                        ))
+                        buffer.write("\n")
+                exported += len(rows)
+                yield buffer.getvalue()
+    except Exception as e:
+        # 响应头已发送，无法再返回错误状态码，只记录日志并中断输出
+        logger.error(f"予約エクスポートエラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise
+    
+    logger.info(f"予約エクスポート完了: {exported}件")
+
+
+@router.get("/export")
+async def export_bookings(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="出力形式（csv / ndjson）"),
+    date_from: Optional[date] = Query(None, description="予約日（開始、この日を含む）"),
+    date_to: Optional[date] = Query(None, description="予約日（終了、この日を含む）"),
+    lecture_id: Optional[int] = Query(None, description="講座ID"),
+    booking_status: Optional[str] = Query(None, alias="status", pattern="^(pending|confirmed|cancelled)$", description="予約状態"),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    予約一覧エクスポートAPI（管理者のみ）
+    
+    サーバーサイドカーソルで一定件数ずつ読み出し、CSV または NDJSON として逐次ストリーミングする
+    
+    Args:
+        export_format: 出力形式（csv / ndjson）
+        date_from: 予約日の下限
+        date_to: 予約日の上限
+        lecture_id: 講座ID
+        booking_status: 予約状態（pending / confirmed / cancelled）
+        current_user: 現在のユーザー（管理者権限が必要）
+    
+    Returns:
+        StreamingResponse: CSV または NDJSON
+    
+    Raises:
+        HTTPException: 権限不足、パラメータ不正時
+    """
+    logger.info(f"予約エクスポートリクエスト: 形式 {export_format}, 期間 {date_from}〜{date_to}, 講座ID {lecture_id}, 状態 {booking_status} by {current_user.email}")
+    
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日は終了日以前である必要があります"
+        )
+    
+    query = _build_export_query(date_from, date_to, lecture_id, booking_status)
+    filename = f"bookings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    media_type = "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson"
+    
+    return StreamingResponse(
+        _stream_export_rows(query, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/stats", response_model=dict)
 async def get_booking_stats(
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     予約統計情報取得API（管理者のみ）
@@ -545,52 +865,15 @@ async def get_booking_stats(
         db: データベースセッション
     
     Returns:
-        dict: 予約統計情報
+        dict: 予約統計情報（refreshed_at: 集計日時、stale_seconds: 集計からの経過秒数）
     """
     logger.info(f"予約統計情報取得リクエスト by {current_user.email}")
     
     try:
-        # 统计查询
-        stats = db.query(
-                    func.count(LectureBooking.id).label('total_bookings'),
-        func.count(case([(LectureBooking.status == 'confirmed', 1)])).label('confirmed_bookings'),
-        func.count(case([(LectureBooking.status == 'cancelled', 1)])).label('cancelled_bookings'),
-        func.count(case([(LectureBooking.status == 'pending', 1)])).label('pending_bookings')
-    ).join(
-        Lecture, LectureBooking.lecture_id == Lecture.id
-        ).filter(
-            Lecture.is_deleted == False
-        ).first()
-        
-        # 热门讲座统计
-        popular_lectures = db.query(
-            Lecture.lecture_title,
-            func.count(LectureBooking.id).label('booking_count')
-        ).join(
-            LectureBooking, LectureBooking.lecture_id == Lecture.id
-        ).filter(
-            Lecture.is_deleted == False
-        ).group_by(
-            Lecture.id, Lecture.lecture_title
-        ).order_by(
-            func.count(LectureBooking.id).desc()
-        ).limit(5).all()
-        
-        result = {
-            "total_bookings": stats.total_bookings or 0,
-            "confirmed_bookings": stats.confirmed_bookings or 0,
-            "cancelled_bookings": stats.cancelled_bookings or 0,
-            "pending_bookings": stats.pending_bookings or 0,
-            "popular_lectures": [
-                {
-                    "lecture_title": lecture.lecture_title,
-                    "booking_count": lecture.booking_count
-                }
-                for lecture in popular_lectures
-            ]
-        }
+        # 物化视图（定期刷新）中的合计行与人气讲座，stale_seconds 为距上次刷新的秒数
+        result = await get_materialized_booking_stats(db)
         
-        logger.info(f"予約統計情報取得成功")
+        logger.info(f"予約統計情報取得成功: {result['stale_seconds']}秒前の集計")
         return result
         
     except Exception as e:
@@ -601,16 +884,184 @@ async def get_booking_stats(
         )
 
 
+# 予約分析で指定できる期間の上限日数と、期間省略時の日数
+ANALYTICS_MAX_DAYS = 3660
+ANALYTICS_DEFAULT_DAYS = 30
+
+# 日次集計と差分で共通の列
+_DAILY_STAT_COLUMNS = (
+    "stat_date", "lecture_id", "teacher_id", "bookings", "pending_bookings", "confirmed_bookings",
+    "cancelled_bookings", "slots", "capacity", "booked_seats"
+)
+
+
+def _build_analytics_query(
+    date_from: date,
+    date_to: date,
+    granularity: str,
+    group_by: str,
+    lecture_id: Optional[int],
+    teacher_id: Optional[int]
+):
+    """
+    日次集計（lecture_daily_stats）と未集約の差分（lecture_daily_stat_deltas）から期間・講座・講師ごとの合計を求めるクエリを構築
+    
+    元の予約・スケジュールは読まないため、コストは期間内の日数 × 講座数（と集約間隔内の変更件数）に比例する
+    """
+    stat = union_all(
+        *(
+            select(*(getattr(model, column) for column in _DAILY_STAT_COLUMNS))
+            for model in (LectureDailyStat, LectureDailyStatDelta)
+        )
+    ).subquery("stat").c
+    if granularity == "day":
+        period = stat.stat_date
+    else:
+        period = cast(func.date_trunc(granularity, cast(stat.stat_date, DateTime)), Date)
+    keys = [period.label("period")]
+    if group_by == "lecture":
+        keys.append(stat.lecture_id)
+    elif group_by == "teacher":
+        keys.append(stat.teacher_id)
+    
+    conditions = [stat.stat_date >= date_from, stat.stat_date <= date_to]
+    if lecture_id is not None:
+        conditions.append(stat.lecture_id == lecture_id)
+    if teacher_id is not None:
+        conditions.append(stat.teacher_id == teacher_id)
+    
+    totals = select(
+        *keys,
+        func.sum(stat.bookings).label("bookings"),
+        func.sum(stat.pending_bookings).label("pending_bookings"),
+        func.sum(stat.confirmed_bookings).label("confirmed_bookings"),
+        func.sum(stat.cancelled_bookings).label("cancelled_bookings"),
+        func.sum(stat.slots).label("slots"),
+        func.sum(stat.capacity).label("capacity"),
+        func.sum(stat.booked_seats).label("booked_seats")
+    ).where(
+        *conditions
+    ).group_by(
+        *keys
+    ).having(
+        # 予約・スケジュールがすべて取り消された日（差分の合計が 0 の行）は返さない
+        or_(func.sum(stat.bookings) != 0, func.sum(stat.slots) != 0)
+    ).subquery()
+    
+    # 名称は集計後の行にのみ結合する
+    if group_by == "lecture":
+        return select(totals, Lecture.lecture_title).outerjoin(
+            Lecture, Lecture.id == totals.c.lecture_id
+        ).order_by(totals.c.period, totals.c.lecture_id)
+    if group_by == "teacher":
+        return select(totals, User.name.label("teacher_name")).outerjoin(
+            User, User.id == totals.c.teacher_id
+        ).order_by(totals.c.period, totals.c.teacher_id)
+    return select(totals).order_by(totals.c.period)
+
+
+@router.get("/analytics", response_model=BookingAnalyticsResponse)
+async def get_booking_analytics(
+    date_from: Optional[date] = Query(None, description="予約日（開始、この日を含む。省略時は終了日の 29 日前）"),
+    date_to: Optional[date] = Query(None, description="予約日（終了、この日を含む。省略時は今日）"),
+    granularity: str = Query("day", pattern="^(day|week|month)$", description="集計単位（day / week / month）"),
+    group_by: str = Query("none", pattern="^(none|lecture|teacher)$", description="内訳（none / lecture / teacher）"),
+    lecture_id: Optional[int] = Query(None, description="講座ID"),
+    teacher_id: Optional[int] = Query(None, description="講師ID"),
+    current_user: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    予約分析API（管理者のみ）
+    
+    日・週・月ごとの予約件数、キャンセル率、予約可能時間の席の利用率を返す。
+    予約・スケジュールの変更時にトリガーが追記する差分を集約した日次集計（と未集約の差分）を期間で合計するため、数年分の期間でも元テーブルは走査しない。
+    予約もスケジュールもない期間の行は返さない
+    
+    Args:
+        date_from: 予約日の下限
+        date_to: 予約日の上限
+        granularity: 集計単位（day / week / month）
+        group_by: 内訳（none / lecture / teacher）
+        lecture_id: 講座ID
+        teacher_id: 講師ID
+        current_user: 現在のユーザー（管理者権限が必要）
+        db: データベースセッション
+    
+    Returns:
+        BookingAnalyticsResponse: 期間ごとの集計
+    
+    Raises:
+        HTTPException: 権限不足、パラメータ不正時
+    """
+    logger.info(f"予約分析リクエスト: 期間 {date_from}〜{date_to}, 単位 {granularity}, 内訳 {group_by}, 講座ID {lecture_id}, 講師ID {teacher_id} by {current_user.email}")
+    
+    try:
+        if date_to is None:
+            date_to = date.today()
+        if date_from is None:
+            date_from = date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+        if date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="開始日は終了日以前である必要があります"
+            )
+        if (date_to - date_from).days >= ANALYTICS_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"集計期間は{ANALYTICS_MAX_DAYS}日以内で指定してください"
+            )
+        
+        rows = (await db.execute(
+            _build_analytics_query(date_from, date_to, granularity, group_by, lecture_id, teacher_id)
+        )).mappings().all()
+        
+        buckets = [
+            BookingAnalyticsBucket(
+                **row,
+                cancellation_rate=round(row["cancelled_bookings"] / row["bookings"], 4) if row["bookings"] else None,
+                utilization=round(row["booked_seats"] / row["capacity"], 4) if row["capacity"] else None
+            )
+            for row in rows
+        ]
+        
+        logger.info(f"予約分析成功: {len(buckets)}件")
+        return BookingAnalyticsResponse(
+            date_from=date_from,
+            date_to=date_to,
+            granularity=granularity,
+            group_by=group_by,
+            buckets=buckets
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"予約分析エラー: {str(e)}")
+        logger.error(f"エラータイプ: {type(e).__name__}")
+        logger.error(f"エラー詳細: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
 @router.get("/lecture/{lecture_id}/booked-times", response_model=List[dict])
 async def get_lecture_booked_times(
     lecture_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取指定课程的已预约时间段API（无需认证）
     
+    返回 ETag，If-None-Match 一致时不查询预约记录，直接返回 304（课程不存在时返回 404）
+    
     Args:
         lecture_id: 课程ID
+        request: 请求（读取 If-None-Match 头）
+        response: 响应（设置 ETag・Cache-Control 头）
         db: 数据库会话
     
     Returns:
@@ -622,33 +1073,44 @@ async def get_lecture_booked_times(
 
     
     try:
-        # 检查课程是否存在
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        # 检查课程是否存在（在判定 304 之前，已删除或不存在的课程始终返回 404）
+        lecture_exists = await db.scalar(
+            select(
+                select(Lecture.id).where(
+                    Lecture.id == lecture_id,
+                    Lecture.is_deleted == False
+                ).exists()
+            )
+        )
         
-        if not lecture:
+        if not lecture_exists:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="指定された講座が見つかりません"
             )
         
+        # 数据未变更时直接返回 304
+        _, unchanged = await conditional_get(request, response, db, BOOKED_TIMES_TABLES)
+        if unchanged is not None:
+            return unchanged
+        
         # 查询该课程的所有已预约记录（排除已取消的）
-        booked_times = db.query(
-            LectureBooking.booking_date,
-            LectureBooking.start_time,
-            LectureBooking.end_time
-        ).filter(
-            and_(
-                LectureBooking.lecture_id == lecture_id,
-                LectureBooking.status.in_(['pending', 'confirmed']),  # 只包含待确认和已确认的预约
-                LectureBooking.is_expired == False
+        booked_times = (await db.execute(
+            select(
+                LectureBooking.booking_date,
+                LectureBooking.start_time,
+                LectureBooking.end_time
+            ).where(
+                and_(
+                    LectureBooking.lecture_id == lecture_id,
+                    LectureBooking.status.in_(['pending', 'confirmed']),  # 只包含待确认和已确认的预约
+                    LectureBooking.is_expired == False
+                )
+            ).order_by(
+                LectureBooking.booking_date.asc(),
+                LectureBooking.start_time.asc()
             )
-        ).order_by(
-            LectureBooking.booking_date.asc(),
-            LectureBooking.start_time.asc()
-        ).all()
+        )).all()
         
         # 转换为前端需要的格式
         result = []
@@ -675,38 +1137,42 @@ async def get_lecture_booked_times(
 @router.get("/my-bookings", response_model=UserBookingsResponse)
 async def get_my_bookings(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取当前用户的所有预约记录"""
     try:
-        user_bookings = db.query(
-            LectureBooking.id,
-            LectureBooking.lecture_id,
-            Lecture.lecture_title,
-            func.coalesce(
-                db.query(User.name)
-                .filter(User.id == Lecture.teacher_id)
-                .limit(1)
-                .scalar(),
-                'Unknown'
-            ).label('teacher_name'),
-            LectureBooking.status,
-            LectureBooking.booking_date,
-            LectureBooking.start_time,
-            LectureBooking.end_time,
-            LectureBooking.created_at
-        ).join(
-            Lecture, LectureBooking.lecture_id == Lecture.id
-        ).filter(
-            and_(
-                LectureBooking.user_id == current_user.id,
-                Lecture.is_deleted == False,
-                LectureBooking.is_expired == False
+        # 预约的讲师（以别名连接用户表）
+        teacher = aliased(User)
+        
+        user_bookings = (await db.execute(
+            select(
+                LectureBooking.id,
+                LectureBooking.lecture_id,
+                Lecture.lecture_title,
+                func.coalesce(
+                    teacher.name,
+                    'Unknown'
+                ).label('teacher_name'),
+                LectureBooking.status,
+                LectureBooking.booking_date,
+                LectureBooking.start_time,
+                LectureBooking.end_time,
+                LectureBooking.created_at
+            ).join(
+                Lecture, LectureBooking.lecture_id == Lecture.id
+            ).outerjoin(
+                teacher, LectureBooking.teacher_id == teacher.id
+            ).where(
+                and_(
+                    LectureBooking.user_id == current_user.id,
+                    Lecture.is_deleted == False,
+                    LectureBooking.is_expired == False
+                )
+            ).order_by(
+                LectureBooking.booking_date.desc(),
+                LectureBooking.start_time.asc()
             )
-        ).order_by(
-            LectureBooking.booking_date.desc(),
-            LectureBooking.start_time.asc()
-        ).all()
+        )).all()
         
         booking_records = [
             UserBookingRecord(
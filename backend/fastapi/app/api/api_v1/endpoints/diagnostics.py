@@ -0,0 +1,192 @@
+"""
+診断関連 API エンドポイント
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+import traceback
+
+from app.core.cache import CACHES, token_cache
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.security import hashing_stats
+from app.core.server_timing import TimedRoute
+from app.db.database import async_engine
+from app.db.listener import invalidation_listener
+from app.db.pool import get_pool_status
+from app.models.user import User
+from app.utils.jwt import get_current_admin
+
+# ログ設定
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/db-pool")
+async def get_db_pool_status(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    データベース接続プール状態取得API（管理者のみ）
+    
+    現在のワーカープロセスにおける接続プールの使用状況と、
+    接続取得の待ち時間・タイムアウト回数などの累計値を返す
+    
+    Args:
+        current_user: 現在のユーザー（管理者）
+    
+    Returns:
+        dict: 接続プールの設定値と状態
+    
+    Raises:
+        HTTPException: サーバーエラー時
+    """
+    logger.info(f"接続プール状態取得リクエスト - 管理者ID: {current_user.id}")
+    
+    try:
+        return {
+            "config": {
+                "web_concurrency": settings.WEB_CONCURRENCY,
+                "max_connections": settings.DB_MAX_CONNECTIONS,
+                "pool_size": settings.DB_POOL_SIZE_EFFECTIVE,
+                "max_overflow": settings.DB_MAX_OVERFLOW_EFFECTIVE,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": settings.DB_POOL_PRE_PING
+            },
+            "status": get_pool_status(async_engine.sync_engine.pool)
+        }
+        
+    except Exception as e:
+        logger.error(f"接続プール状態取得エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.get("/cache")
+async def get_cache_status(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    プロセス内キャッシュ状態取得API（管理者のみ）
+    
+    現在のワーカープロセスにおけるキャッシュのヒット・ミス回数などの累計値と、
+    無効化通知（LISTEN/NOTIFY）の接続状態を返す
+    
+    Args:
+        current_user: 現在のユーザー（管理者）
+    
+    Returns:
+        dict: キャッシュ統計と無効化通知の監視状態
+    
+    Raises:
+        HTTPException: サーバーエラー時
+    """
+    logger.info(f"キャッシュ状態取得リクエスト - 管理者ID: {current_user.id}")
+    
+    try:
+        return {
+            "caches": [cache.stats() for cache in (*CACHES.values(), token_cache)],
+            "listener": {
+                "connected": invalidation_listener.connected,
+                "reconnects": invalidation_listener.reconnects
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"キャッシュ状態取得エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.get("/password-hashing")
+async def get_password_hashing_status(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    パスワードハッシュ処理状態取得API（管理者のみ）
+    
+    現在のワーカープロセスにおけるハッシュ処理用スレッドプールの実行中・待機中の件数と、
+    待ち時間・処理時間の分布、上限超過による拒否回数などの累計値を返す
+    
+    Args:
+        current_user: 現在のユーザー（管理者）
+    
+    Returns:
+        dict: ハッシュ処理の設定値と状態
+    
+    Raises:
+        HTTPException: サーバーエラー時
+    """
+    logger.info(f"パスワードハッシュ処理状態取得リクエスト - 管理者ID: {current_user.id}")
+    
+    try:
+        return {
+            "config": {
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "max_queue": settings.PASSWORD_HASH_MAX_QUEUE
+            },
+            "status": hashing_stats.snapshot()
+        }
+        
+    except Exception as e:
+        logger.error(f"パスワードハッシュ処理状態取得エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.get("/event-loop")
+async def get_event_loop_status(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    イベントループ監視状態取得API（管理者のみ）
+    
+    現在のワーカープロセスにおけるイベントループの遅延の分布と、
+    しきい値を超えて停止した回数・ルート別の集計・最近の停止イベント（採取したスタック付き）を返す。
+    監視は LOOP_MONITOR_ENABLED=true の場合のみ動作する
+    
+    Args:
+        current_user: 現在のユーザー（管理者）
+    
+    Returns:
+        dict: 監視の設定値と状態
+    
+    Raises:
+        HTTPException: サーバーエラー時
+    """
+    logger.info(f"イベントループ監視状態取得リクエスト - 管理者ID: {current_user.id}")
+    
+    try:
+        return {
+            "config": {
+                "enabled": settings.LOOP_MONITOR_ENABLED,
+                "interval_ms": settings.LOOP_MONITOR_INTERVAL_MS,
+                "threshold_ms": settings.LOOP_MONITOR_THRESHOLD_MS,
+                "stack_depth": settings.LOOP_MONITOR_STACK_DEPTH,
+                "max_events": settings.LOOP_MONITOR_MAX_EVENTS
+            },
+            "status": loop_monitor.snapshot()
+        }
+        
+    except Exception as e:
+        logger.error(f"イベントループ監視状態取得エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
@@ -1,10 +1,10 @@
 """
 講座関連 API エンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, and_, or_, func, any_
+from typing import List, Optional
 import logging
 import traceback
 
@@ -18,22 +18,39 @@ from app.schemas.lecture import (
     LectureTeacherOut, LectureApprovalUpdate, LectureApprovalUpdateResponse,
     LectureUpdate, LectureUpdateResponse, LectureDeleteResponse,
     CarouselOut, CarouselBatchUpdate, CarouselBatchUpdateResponse,
-    CarouselManagementOut, TeacherLecturesResponse, TeacherLectureItem
+    CarouselManagementOut, TeacherLecturesResponse, TeacherLectureItem,
+    LectureSearchItem, LectureSearchResponse
 )
 from app.utils.jwt import get_current_user, get_current_admin, get_current_teacher
-from app.db.database import get_db
+from app.core.cache import catalogue_cache
+from app.core.server_timing import TimedRoute
+from app.db.database import get_async_db
+from app.db.listener import publish_invalidation
+from app.utils.etag import cached_conditional_get, conditional_get
+from app.utils.pagination import KeysetPage, MAX_PAGE_LIMIT, NEXT_CURSOR_HEADER
+from app.utils.search import search_terms, text_contains, text_similarity
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+# 講座カタログの内容が依存するテーブル（ETag の算出に使用）
+LECTURE_CATALOGUE_TABLES = ("lectures", "user_infos", "teacher_profiles")
+CAROUSEL_TABLES = ("carousel",) + LECTURE_CATALOGUE_TABLES
+
+# 講座検索の 1 ページあたりの件数（デフォルト値と上限）
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+# 検索順位における講師名の類似度の重み（講座名の類似度は 1）
+SEARCH_TEACHER_NAME_WEIGHT = 0.5
 
 
 @router.post("/", response_model=LectureCreateResponse)
 async def create_lecture(
     lecture_data: LectureCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座作成API（講師・管理者）
@@ -69,9 +86,11 @@ async def create_lecture(
         
         # 講師の場合、講師プロフィールが存在するかチェック
         if current_user.role == "teacher":
-            teacher_profile = db.query(TeacherProfile).filter(
-                TeacherProfile.id == current_user.id
-            ).first()
+            teacher_profile = await db.scalar(
+                select(TeacherProfile).where(
+                    TeacherProfile.id == current_user.id
+                )
+            )
             
             if not teacher_profile:
                 raise HTTPException(
@@ -109,11 +128,13 @@ async def create_lecture(
                 )
             
             # 指定された講師が存在し、講師ロールを持っているかチェック
-            target_teacher = db.query(User).filter(
-                User.id == lecture_data.teacher_id,
-                User.role == "teacher",
-                User.is_deleted == False
-            ).first()
+            target_teacher = await db.scalar(
+                select(User).where(
+                    User.id == lecture_data.teacher_id,
+                    User.role == "teacher",
+                    User.is_deleted == False
+                )
+            )
             
             if not target_teacher:
                 raise HTTPException(
@@ -122,9 +143,11 @@ async def create_lecture(
                 )
             
             # 验证讲师是否有讲师档案
-            target_teacher_profile = db.query(TeacherProfile).filter(
-                TeacherProfile.id == lecture_data.teacher_id
-            ).first()
+            target_teacher_profile = await db.scalar(
+                select(TeacherProfile).where(
+                    TeacherProfile.id == lecture_data.teacher_id
+                )
+            )
             
             if not target_teacher_profile:
                 raise HTTPException(
@@ -146,8 +169,10 @@ async def create_lecture(
         
         # データベースに保存
         db.add(new_lecture)
-        db.commit()
-        db.refresh(new_lecture)
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
+        await db.refresh(new_lecture)
         
         logger.info(f"講座作成完了: 講座ID {new_lecture.id}, タイトル: {new_lecture.lecture_title}, 主讲讲师: {final_teacher_id}, 多讲师: {new_lecture.is_multi_teacher}")
         
@@ -159,10 +184,10 @@ async def create_lecture(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"講座作成エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -174,12 +199,22 @@ async def create_lecture(
 
 @router.get("/", response_model=List[LectureListOut])
 async def get_all_lectures(
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの件数（指定時はカーソル方式のページネーション）"),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座一覧取得API（認証不要）
     
+    ETag を返し、If-None-Match が一致する場合は一覧を取得せずに 304 を返す
+    
     Args:
+        request: リクエスト（If-None-Match ヘッダーを参照）
+        response: レスポンス（次ページのカーソルを X-Next-Cursor ヘッダーに設定）
+        limit: 1ページの件数（未指定かつ cursor 未指定の場合は全件）
+        cursor: 次ページ取得用カーソル
         db: データベースセッション
     
     Returns:
@@ -190,20 +225,40 @@ async def get_all_lectures(
     """
     logger.info("講座一覧取得リクエスト")
     
+    page = KeysetPage([(Lecture.created_at, True), (Lecture.id, True)], limit, cursor)
+    
+    # キャッシュ済みの場合はそのまま返却（講座の更新時に全ワーカーで無効化される）
+    cache_key = ("lectures", limit, cursor)
+    cached = catalogue_cache.get(cache_key)
+    if cached is not None:
+        lecture_list, etag, headers = cached
+        unchanged = cached_conditional_get(request, response, etag, headers)
+        return unchanged if unchanged is not None else lecture_list
+    cache_generation = catalogue_cache.generation
+    
     try:
+        # 変更がなければ一覧を取得せずに 304 を返す
+        etag, unchanged = await conditional_get(request, response, db, LECTURE_CATALOGUE_TABLES, limit, cursor)
+        if unchanged is not None:
+            return unchanged
+        
         # 削除されていない講座を全て取得
-        query = db.query(
+        query = select(
             Lecture, User, TeacherProfile
         ).join(
             TeacherProfile, Lecture.teacher_id == TeacherProfile.id
         ).join(
             User, TeacherProfile.id == User.id
-        ).filter(
+        ).where(
             Lecture.is_deleted == False,
             User.is_deleted == False
         ).order_by(Lecture.created_at.desc())
         
-        lectures = query.all()
+        lectures = page.finish(
+            (await db.execute(page.apply(query))).all(),
+            lambda row: (row.Lecture.created_at, row.Lecture.id),
+            response
+        )
         
         logger.info(f"講座一覧取得成功: {len(lectures)}件")
         
@@ -223,6 +278,13 @@ async def get_all_lectures(
             }
             lecture_list.append(LectureListOut(**lecture_data))
         
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        catalogue_cache.set(
+            cache_key,
+            (lecture_list, etag, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None),
+            cache_generation
+        )
+        
         return lecture_list
         
     except Exception as e:
@@ -235,13 +297,117 @@ async def get_all_lectures(
         )
 
 
+@router.get("/search", response_model=LectureSearchResponse)
+async def search_lectures(
+    q: str = Query(..., min_length=1, max_length=100, description="検索文字列（空白区切りで AND 検索）"),
+    approval_status: Optional[str] = Query(None, pattern="^(pending|approved|rejected)$", description="承認状態"),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT, description="取得件数"),
+    offset: int = Query(0, ge=0, description="取得開始位置"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    講座検索API（認証不要）
+    
+    講座名・講座説明・講師名の部分一致で検索し、検索文字列と講座名・講師名の類似度が高い順に返す。
+    全角・半角などの表記ゆれは NFKC 正規化で吸収し、大文字・小文字は区別しない。
+    空白で区切った検索語はすべて（いずれかの項目に）含まれる講座のみを返す（2 文字以上の検索語が 1 つ以上必要）
+    
+    Args:
+        q: 検索文字列
+        approval_status: 承認状態（pending / approved / rejected）
+        limit: 取得件数
+        offset: 取得開始位置
+        db: データベースセッション
+    
+    Returns:
+        LectureSearchResponse: 該当件数と講座のリスト
+    
+    Raises:
+        HTTPException: 検索語がない・すべて 1 文字の場合、サーバーエラー時
+    """
+    logger.info(f"講座検索リクエスト: '{q}', 承認状態 {approval_status}, limit {limit}, offset {offset}")
+    
+    terms = search_terms(q)
+    
+    try:
+        conditions = [Lecture.is_deleted == False, User.is_deleted == False]
+        if approval_status is not None:
+            conditions.append(Lecture.approval_status == approval_status)
+        for term in terms:
+            # 講師名で一致する講師IDは配列として先に求め、講座名・説明のインデックスと OR で組み合わせる
+            matching_teachers = select(User.id).where(
+                User.is_deleted == False,
+                text_contains(User.name, User.name_bigrams, term)
+            ).scalar_subquery()
+            conditions.append(or_(
+                text_contains(Lecture.lecture_title, Lecture.title_bigrams, term),
+                text_contains(Lecture.lecture_description, Lecture.description_bigrams, term),
+                Lecture.teacher_id == any_(func.array(matching_teachers))
+            ))
+        
+        query_text = " ".join(terms)
+        score = (
+            text_similarity(Lecture.title_bigrams, query_text)
+            + SEARCH_TEACHER_NAME_WEIGHT * text_similarity(User.name_bigrams, query_text)
+        ) / (1 + SEARCH_TEACHER_NAME_WEIGHT)
+        
+        base = select(Lecture.id).join(
+            TeacherProfile, Lecture.teacher_id == TeacherProfile.id
+        ).join(
+            User, TeacherProfile.id == User.id
+        ).where(*conditions)
+        
+        rows = (await db.execute(
+            base.with_only_columns(
+                Lecture, User.name, score.label("score"), func.count().over().label("total_count")
+            ).order_by(
+                score.desc(), Lecture.created_at.desc(), Lecture.id.desc()
+            ).limit(limit).offset(offset)
+        )).all()
+        
+        lectures = [
+            LectureSearchItem(
+                id=lecture.id,
+                lecture_title=lecture.lecture_title,
+                lecture_description=lecture.lecture_description,
+                approval_status=lecture.approval_status,
+                teacher_name=teacher_name,
+                teacher_id=lecture.teacher_id,
+                is_multi_teacher=lecture.is_multi_teacher,
+                created_at=lecture.created_at,
+                updated_at=lecture.updated_at,
+                score=round(float(row_score), 4)
+            )
+            for lecture, teacher_name, row_score, _ in rows
+        ]
+        if rows:
+            total_count = rows[0].total_count
+        elif offset > 0:
+            # 該当件数を超える offset の場合のみ件数を別途取得
+            total_count = await db.scalar(select(func.count()).select_from(base.subquery()))
+        else:
+            total_count = 0
+        
+        logger.info(f"講座検索成功: {total_count}件中 {len(lectures)}件")
+        return LectureSearchResponse(total_count=total_count, lectures=lectures)
+        
+    except Exception as e:
+        logger.error(f"講座検索エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
 # ==================== カルーセル（トップページ掲載）管理API ====================
 
 @router.put("/carousel/batch", response_model=CarouselBatchUpdateResponse)
-def batch_update_carousel(
+async def batch_update_carousel(
     carousel_data: CarouselBatchUpdate,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     カルーセル一括更新API（管理者のみ）
@@ -264,7 +430,7 @@ def batch_update_carousel(
     try:
         # 既存のカルーセルを削除（空のリストの場合も含む）
         try:
-            db.query(Carousel).delete()
+            await db.execute(delete(Carousel))
             logger.info("既存のカルーセルレコードを削除しました")
         except Exception as e:
             logger.error(f"既存のカルーセル削除エラー: {str(e)}")
@@ -275,7 +441,9 @@ def batch_update_carousel(
         
         # 空のリストの場合は削除のみで終了
         if not carousel_data.carousel_list:
-            db.commit()
+            # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+            await publish_invalidation(db)
+            await db.commit()
             logger.info("カルーセルを空にしました")
             return CarouselBatchUpdateResponse()
         
@@ -315,10 +483,12 @@ def batch_update_carousel(
             )
         
         # 講座IDの存在性チェック（シンプル版）
-        existing_lectures = db.query(Lecture).filter(
-            Lecture.id.in_(lecture_ids),
-            Lecture.is_deleted == False
-        ).all()
+        existing_lectures = (await db.scalars(
+            select(Lecture).where(
+                Lecture.id.in_(lecture_ids),
+                Lecture.is_deleted == False
+            )
+        )).all()
         
         existing_lecture_ids = {lecture.id for lecture in existing_lectures}
         missing_lecture_ids = set(lecture_ids) - existing_lecture_ids
@@ -343,10 +513,12 @@ def batch_update_carousel(
         # データベースに保存
         try:
             db.add_all(carousel_records)
-            db.commit()
+            # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+            await publish_invalidation(db)
+            await db.commit()
             logger.info(f"カルーセル更新完了: {len(carousel_records)}件")
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"データベース保存エラー: {str(e)}")
             
             # 具体的なエラーメッセージを提供
@@ -380,13 +552,19 @@ def batch_update_carousel(
 
 
 @router.get("/carousel", response_model=List[CarouselOut])
-def get_carousel_lectures(
-    db: Session = Depends(get_db)
+async def get_carousel_lectures(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     カルーセル掲載講座一覧取得API（フロントエンド表示用、認証不要）
     
+    ETag を返し、If-None-Match が一致する場合は一覧を取得せずに 304 を返す
+    
     Args:
+        request: リクエスト（If-None-Match ヘッダーを参照）
+        response: レスポンス（ETag・Cache-Control ヘッダーを設定）
         db: データベースセッション
     
     Returns:
@@ -397,24 +575,37 @@ def get_carousel_lectures(
     """
     logger.info("カルーセル掲載講座一覧取得リクエスト（フロントエンド表示用）")
     
+    cached = catalogue_cache.get(("carousel",))
+    if cached is not None:
+        carousel_list, etag = cached
+        unchanged = cached_conditional_get(request, response, etag)
+        return unchanged if unchanged is not None else carousel_list
+    cache_generation = catalogue_cache.generation
+    
     try:
+        etag, unchanged = await conditional_get(request, response, db, CAROUSEL_TABLES)
+        if unchanged is not None:
+            return unchanged
+        
         # アクティブなカルーセル掲載講座を表示順序順に取得
-        carousel_lectures = db.query(
-            Carousel, Lecture, User, TeacherProfile
-        ).join(
-            Lecture, Carousel.lecture_id == Lecture.id
-        ).join(
-            User, Lecture.teacher_id == User.id
-        ).outerjoin(
-            TeacherProfile, User.id == TeacherProfile.id
-        ).filter(
-            Carousel.is_active == True,
-            Lecture.is_deleted == False,
-            Lecture.approval_status == "approved",
-            User.is_deleted == False
-        ).order_by(
-            Carousel.display_order
-        ).all()
+        carousel_lectures = (await db.execute(
+            select(
+                Carousel, Lecture, User, TeacherProfile
+            ).join(
+                Lecture, Carousel.lecture_id == Lecture.id
+            ).join(
+                User, Lecture.teacher_id == User.id
+            ).outerjoin(
+                TeacherProfile, User.id == TeacherProfile.id
+            ).where(
+                Carousel.is_active == True,
+                Lecture.is_deleted == False,
+                Lecture.approval_status == "approved",
+                User.is_deleted == False
+            ).order_by(
+                Carousel.display_order
+            )
+        )).all()
         
         # 結果をCarouselOutモデルに変換
         carousel_list = []
@@ -435,6 +626,8 @@ def get_carousel_lectures(
         
         logger.info(f"カルーセル掲載講座一覧取得成功: {len(carousel_list)}件")
         
+        catalogue_cache.set(("carousel",), (carousel_list, etag), cache_generation)
+        
         return carousel_list
         
     except Exception as e:
@@ -446,9 +639,9 @@ def get_carousel_lectures(
 
 
 @router.get("/carousel/management", response_model=List[CarouselManagementOut])
-def get_carousel_management_list(
+async def get_carousel_management_list(
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     カルーセル管理用一覧取得API（管理者のみ）
@@ -467,14 +660,16 @@ def get_carousel_management_list(
     
     try:
         # カルーセル掲載講座を表示順序順に取得（管理用）
-        carousel_list = db.query(Carousel, Lecture).join(
-            Lecture, Carousel.lecture_id == Lecture.id
-        ).filter(
-            Carousel.is_active == True,
-            Lecture.is_deleted == False
-        ).order_by(
-            Carousel.display_order
-        ).all()
+        carousel_list = (await db.execute(
+            select(Carousel, Lecture).join(
+                Lecture, Carousel.lecture_id == Lecture.id
+            ).where(
+                Carousel.is_active == True,
+                Lecture.is_deleted == False
+            ).order_by(
+                Carousel.display_order
+            )
+        )).all()
         
         # 結果をCarouselManagementOutモデルに変換
         management_list = []
@@ -502,7 +697,7 @@ def get_carousel_management_list(
 @router.get("/my-lectures", response_model=TeacherLecturesResponse)
 async def get_my_lectures(
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     讲师获取自己的全部讲座API
@@ -521,15 +716,17 @@ async def get_my_lectures(
     
     try:
         # 查询当前讲师的所有讲座（包括已删除的，因为讲师需要看到所有自己创建的讲座）
-        lectures = db.query(
-            Lecture, User
-        ).join(
-            User, Lecture.teacher_id == User.id
-        ).filter(
-            Lecture.teacher_id == current_user.id
-        ).order_by(
-            Lecture.created_at.desc()
-        ).all()
+        lectures = (await db.execute(
+            select(
+                Lecture, User
+            ).join(
+                User, Lecture.teacher_id == User.id
+            ).where(
+                Lecture.teacher_id == current_user.id
+            ).order_by(
+                Lecture.created_at.desc()
+            )
+        )).all()
         
         # 转换为响应模型
         lecture_list = []
@@ -567,13 +764,19 @@ async def get_my_lectures(
 @router.get("/{lecture_id}", response_model=LectureDetailOut)
 async def get_lecture_by_id(
     lecture_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     特定講座詳細取得API（認証不要）
     
+    ETag を返し、If-None-Match が一致する場合は詳細を取得せずに 304 を返す
+    
     Args:
         lecture_id: 講座ID
+        request: リクエスト（If-None-Match ヘッダーを参照）
+        response: レスポンス（ETag・Cache-Control ヘッダーを設定）
         db: データベースセッション
     
     Returns:
@@ -584,21 +787,35 @@ async def get_lecture_by_id(
     """
     logger.info(f"特定講座詳細取得リクエスト: 講座ID {lecture_id}")
     
+    cache_key = ("lecture", lecture_id)
+    cached = catalogue_cache.get(cache_key)
+    if cached is not None:
+        lecture_detail_out, etag = cached
+        unchanged = cached_conditional_get(request, response, etag)
+        return unchanged if unchanged is not None else lecture_detail_out
+    cache_generation = catalogue_cache.generation
+    
     try:
+        etag, unchanged = await conditional_get(request, response, db, LECTURE_CATALOGUE_TABLES)
+        if unchanged is not None:
+            return unchanged
+        
         # 指定されたIDの講座とその講師情報を取得
-        lecture_data = db.query(
-            Lecture, User, TeacherProfile
-        ).join(
-            TeacherProfile, Lecture.teacher_id == TeacherProfile.id
-        ).join(
-            User, TeacherProfile.id == User.id
-        ).filter(
-            and_(
-                Lecture.id == lecture_id,
-                Lecture.is_deleted == False,
-                User.is_deleted == False
+        lecture_data = (await db.execute(
+            select(
+                Lecture, User, TeacherProfile
+            ).join(
+                TeacherProfile, Lecture.teacher_id == TeacherProfile.id
+            ).join(
+                User, TeacherProfile.id == User.id
+            ).where(
+                and_(
+                    Lecture.id == lecture_id,
+                    Lecture.is_deleted == False,
+                    User.is_deleted == False
+                )
             )
-        ).first()
+        )).first()
         
         if not lecture_data:
             raise HTTPException(
@@ -617,13 +834,20 @@ async def get_lecture_by_id(
             "lecture_description": lecture.lecture_description,
             "teacher_id": lecture.teacher_id,
             "teacher_name": user.name,
+            "teacher_email": user.email,
+            "teacher_phone": profile.phone,
+            "teacher_bio": profile.bio,
+            "teacher_profile_image": profile.profile_image,
             "approval_status": lecture.approval_status,
             "is_multi_teacher": lecture.is_multi_teacher,
             "created_at": lecture.created_at,
             "updated_at": lecture.updated_at
         }
         
-        return LectureDetailOut(**lecture_detail)
+        lecture_detail_out = LectureDetailOut(**lecture_detail)
+        catalogue_cache.set(cache_key, (lecture_detail_out, etag), cache_generation)
+        
+        return lecture_detail_out
         
     except HTTPException:
         raise
@@ -644,7 +868,7 @@ async def add_teacher_to_lecture(
     lecture_id: int,
     request: AddTeacherToLectureRequest,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     多讲师講座に講師を追加API（管理者のみ）
@@ -665,10 +889,12 @@ async def add_teacher_to_lecture(
     
     try:
         # 講座の存在性と多讲师講座かどうかをチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -683,11 +909,13 @@ async def add_teacher_to_lecture(
             )
         
         # 追加する講師の存在性と講師ロールをチェック
-        teacher = db.query(User).filter(
-            User.id == request.teacher_id,
-            User.role == "teacher",
-            User.is_deleted == False
-        ).first()
+        teacher = await db.scalar(
+            select(User).where(
+                User.id == request.teacher_id,
+                User.role == "teacher",
+                User.is_deleted == False
+            )
+        )
         
         if not teacher:
             raise HTTPException(
@@ -696,9 +924,11 @@ async def add_teacher_to_lecture(
             )
         
         # 講師プロフィールの存在性をチェック
-        teacher_profile = db.query(TeacherProfile).filter(
-            TeacherProfile.id == request.teacher_id
-        ).first()
+        teacher_profile = await db.scalar(
+            select(TeacherProfile).where(
+                TeacherProfile.id == request.teacher_id
+            )
+        )
         
         if not teacher_profile:
             raise HTTPException(
@@ -707,10 +937,12 @@ async def add_teacher_to_lecture(
             )
         
         # 既にこの講座に参加しているかチェック
-        existing_teacher = db.query(LectureTeacher).filter(
-            LectureTeacher.lecture_id == lecture_id,
-            LectureTeacher.teacher_id == request.teacher_id
-        ).first()
+        existing_teacher = await db.scalar(
+            select(LectureTeacher).where(
+                LectureTeacher.lecture_id == lecture_id,
+                LectureTeacher.teacher_id == request.teacher_id
+            )
+        )
         
         if existing_teacher:
             raise HTTPException(
@@ -725,7 +957,9 @@ async def add_teacher_to_lecture(
         )
         
         db.add(new_lecture_teacher)
-        db.commit()
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
         
         logger.info(f"多讲师講座に講師追加完了: 講座ID {lecture_id}, 講師ID {request.teacher_id}")
         
@@ -736,10 +970,10 @@ async def add_teacher_to_lecture(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"多讲师講座に講師追加エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -752,7 +986,7 @@ async def remove_teacher_from_lecture(
     lecture_id: int,
     teacher_id: int,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     多讲师講座から講師を削除API（管理者のみ）
@@ -773,10 +1007,12 @@ async def remove_teacher_from_lecture(
     
     try:
         # 講座の存在性と多讲师講座かどうかをチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -798,10 +1034,12 @@ async def remove_teacher_from_lecture(
             )
         
         # 講師がこの講座に参加しているかチェック
-        lecture_teacher = db.query(LectureTeacher).filter(
-            LectureTeacher.lecture_id == lecture_id,
-            LectureTeacher.teacher_id == teacher_id
-        ).first()
+        lecture_teacher = await db.scalar(
+            select(LectureTeacher).where(
+                LectureTeacher.lecture_id == lecture_id,
+                LectureTeacher.teacher_id == teacher_id
+            )
+        )
         
         if not lecture_teacher:
             raise HTTPException(
@@ -810,8 +1048,10 @@ async def remove_teacher_from_lecture(
             )
         
         # 講師を講座から削除
-        db.delete(lecture_teacher)
-        db.commit()
+        await db.delete(lecture_teacher)
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
         
         logger.info(f"多讲师講座から講師削除完了: 講座ID {lecture_id}, 講師ID {teacher_id}")
         
@@ -822,10 +1062,10 @@ async def remove_teacher_from_lecture(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"多讲师講座から講師削除エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -836,7 +1076,7 @@ async def remove_teacher_from_lecture(
 @router.get("/{lecture_id}/teachers", response_model=List[LectureTeacherOut])
 async def get_lecture_teachers(
     lecture_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     多讲师講座の講師一覧取得API（認証不要）
@@ -855,10 +1095,12 @@ async def get_lecture_teachers(
     
     try:
         # 講座の存在性と多讲师講座かどうかをチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -876,10 +1118,12 @@ async def get_lecture_teachers(
         teachers = []
         
         # 主讲讲师を取得
-        main_teacher = db.query(User).filter(
-            User.id == lecture.teacher_id,
-            User.is_deleted == False
-        ).first()
+        main_teacher = await db.scalar(
+            select(User).where(
+                User.id == lecture.teacher_id,
+                User.is_deleted == False
+            )
+        )
         
         if main_teacher:
             teachers.append(LectureTeacherOut(
@@ -888,12 +1132,14 @@ async def get_lecture_teachers(
             ))
         
         # 追加講師を取得
-        additional_teachers = db.query(LectureTeacher, User).join(
-            User, LectureTeacher.teacher_id == User.id
-        ).filter(
-            LectureTeacher.lecture_id == lecture_id,
-            User.is_deleted == False
-        ).all()
+        additional_teachers = (await db.execute(
+            select(LectureTeacher, User).join(
+                User, LectureTeacher.teacher_id == User.id
+            ).where(
+                LectureTeacher.lecture_id == lecture_id,
+                User.is_deleted == False
+            )
+        )).all()
         
         for lecture_teacher, user in additional_teachers:
             teachers.append(LectureTeacherOut(
@@ -920,7 +1166,7 @@ async def change_lecture_teacher(
     lecture_id: int,
     request: LectureTeacherChange,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座の主讲讲师変更API（管理者のみ）
@@ -941,10 +1187,12 @@ async def change_lecture_teacher(
     
     try:
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -960,11 +1208,13 @@ async def change_lecture_teacher(
             )
         
         # 新しい講師の存在性と講師ロールをチェック
-        new_teacher = db.query(User).filter(
-            User.id == request.teacher_id,
-            User.role == "teacher",
-            User.is_deleted == False
-        ).first()
+        new_teacher = await db.scalar(
+            select(User).where(
+                User.id == request.teacher_id,
+                User.role == "teacher",
+                User.is_deleted == False
+            )
+        )
         
         if not new_teacher:
             raise HTTPException(
@@ -973,9 +1223,11 @@ async def change_lecture_teacher(
             )
         
         # 講師プロフィールの存在性をチェック
-        teacher_profile = db.query(TeacherProfile).filter(
-            TeacherProfile.id == request.teacher_id
-        ).first()
+        teacher_profile = await db.scalar(
+            select(TeacherProfile).where(
+                TeacherProfile.id == request.teacher_id
+            )
+        )
         
         if not teacher_profile:
             raise HTTPException(
@@ -992,13 +1244,15 @@ async def change_lecture_teacher(
         
         # 旧講師を追加講師リストから削除（多讲师講座の場合）
         if lecture.is_multi_teacher:
-            old_lecture_teacher = db.query(LectureTeacher).filter(
-                LectureTeacher.lecture_id == lecture_id,
-                LectureTeacher.teacher_id == lecture.teacher_id
-            ).first()
+            old_lecture_teacher = await db.scalar(
+                select(LectureTeacher).where(
+                    LectureTeacher.lecture_id == lecture_id,
+                    LectureTeacher.teacher_id == lecture.teacher_id
+                )
+            )
             
             if old_lecture_teacher:
-                db.delete(old_lecture_teacher)
+                await db.delete(old_lecture_teacher)
         
         # 新講師を追加講師リストに追加（多讲师講座の場合）
         if lecture.is_multi_teacher:
@@ -1010,7 +1264,9 @@ async def change_lecture_teacher(
         
         # 主讲讲师を更新
         lecture.teacher_id = request.teacher_id
-        db.commit()
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
         
         logger.info(f"講座の主讲讲师変更完了: 講座ID {lecture_id}, 新しい講師ID {request.teacher_id}")
         
@@ -1022,10 +1278,10 @@ async def change_lecture_teacher(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"講座の主讲讲师変更エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1040,7 +1296,7 @@ async def update_lecture_approval_status(
     lecture_id: int,
     approval_data: LectureApprovalUpdate,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座審査状態更新API（管理者のみ）
@@ -1061,10 +1317,12 @@ async def update_lecture_approval_status(
     
     try:
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -1082,17 +1340,19 @@ async def update_lecture_approval_status(
         
         # 審査状態を更新
         lecture.approval_status = approval_data.approval_status
-        db.commit()
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
         
         logger.info(f"講座審査状態更新完了: 講座ID {lecture_id}, 新しい状態 {approval_data.approval_status}")
         
         return LectureApprovalUpdateResponse()
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"講座審査状態更新エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1105,7 +1365,7 @@ async def update_lecture(
     lecture_id: int,
     update_data: LectureUpdate,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座更新API（管理者のみ）
@@ -1126,10 +1386,12 @@ async def update_lecture(
     
     try:
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -1144,17 +1406,19 @@ async def update_lecture(
         if update_data.lecture_description is not None:
             lecture.lecture_description = update_data.lecture_description
         
-        db.commit()
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
         
         logger.info(f"講座更新完了: 講座ID {lecture_id}")
         
         return LectureUpdateResponse()
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"講座更新エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1166,7 +1430,7 @@ async def update_lecture(
 async def delete_lecture(
     lecture_id: int,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座削除API（管理者のみ、ソフト削除）
@@ -1186,10 +1450,12 @@ async def delete_lecture(
     
     try:
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -1200,7 +1466,9 @@ async def delete_lecture(
         # ソフト削除を実行
         lecture.is_deleted = True
         lecture.deleted_at = func.now()
-        db.commit()
+        # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await db.commit()
         
         logger.info(f"講座削除完了: 講座ID {lecture_id}")
         
@@ -1210,10 +1478,10 @@ async def delete_lecture(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"講座削除エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
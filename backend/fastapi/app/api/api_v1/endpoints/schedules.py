@@ -1,33 +1,59 @@
 """
 講座スケジュール管理 API エンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_, func, insert, update, bindparam, column, Integer, Date, Time
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, List, Optional
 import logging
 import traceback
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 
 from app.models.lecture import Lecture
-from app.models.booking import LectureSchedule
+from app.models.booking import LectureSchedule, ScheduleTemplate
 from app.models.user import User
 from app.models.teacher import TeacherProfile
 from app.schemas.booking import (
-    ScheduleCreate, ScheduleCreateResponse, ScheduleOut, ScheduleListOut
+    ScheduleCreate, ScheduleCreateResponse, ScheduleOut, ScheduleListOut,
+    ScheduleBatchCreate, ScheduleBatchCreateResponse,
+    ScheduleTemplateCreate, ScheduleTemplateCreateResponse, ScheduleTemplateOut
 )
 from app.utils.jwt import get_current_user, get_current_admin
-from app.db.database import get_db
+from app.core.server_timing import TimedRoute
+from app.db.database import get_async_db
+from app.db.errors import is_exclusion_violation
+from app.db.schedule_templates import materialize_schedule_templates
+from app.utils.etag import conditional_get
+from app.utils.pagination import KeysetPage, MAX_PAGE_LIMIT
 from app.models.booking import LectureBooking
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
-def check_time_conflicts(
-    db: Session, 
+# 有効なスケジュール同士の時間帯重複を禁止する排他制約名
+SCHEDULE_OVERLAP_CONSTRAINT = "lecture_schedules_no_overlap"
+
+# スケジュール一覧のソートキー（日付・開始時間の昇順、IDで順序を一意にする）
+SCHEDULE_SORT_KEYS = [
+    (LectureSchedule.booking_date, False),
+    (LectureSchedule.start_time, False),
+    (LectureSchedule.id, False)
+]
+
+# 繰り返しテンプレートの最長期間（日数）
+SCHEDULE_TEMPLATE_MAX_DAYS = 366
+
+# スケジュール一覧の内容が依存するテーブル（ETag の算出に使用）
+SCHEDULE_LIST_TABLES = ("lecture_schedules", "lectures", "user_infos")
+
+
+async def check_time_conflicts(
+    db: AsyncSession, 
     lecture_id: int, 
     booking_date: date, 
     start_time: time, 
@@ -36,32 +62,275 @@ def check_time_conflicts(
 ) -> tuple[bool, LectureSchedule | None]:
     """
     時間重複チェック関数
+    
+    重複の防止自体は排他制約（lecture_schedules_no_overlap）が行うため、
+    主に制約違反時に重複相手のスケジュールを特定する用途で使用する
     """
-    query = db.query(LectureSchedule).filter(
-        and_(
-            LectureSchedule.lecture_id == lecture_id,
-            LectureSchedule.booking_date == booking_date,
-            LectureSchedule.is_expired == False
-        )
+    time_range = func.tsrange(
+        datetime.combine(booking_date, start_time),
+        datetime.combine(booking_date, end_time)
     )
     
-    if exclude_id:
-        query = query.filter(LectureSchedule.id != exclude_id)
+    query = select(LectureSchedule).where(
+        LectureSchedule.lecture_id == lecture_id,
+        LectureSchedule.time_range.op("&&")(time_range),
+        LectureSchedule.is_expired == False
+    )
     
-    conflicting_schedules = query.all()
+    if exclude_id:
+        query = query.where(LectureSchedule.id != exclude_id)
     
-    for schedule in conflicting_schedules:
-        if (start_time < schedule.end_time and end_time > schedule.start_time):
-            return True, schedule
+    conflicting_schedule = await db.scalar(query.limit(1))
     
-    return False, None
+    return conflicting_schedule is not None, conflicting_schedule
+
+
+def _schedule_rows(schedules: List[Dict]):
+    """
+    登録するスケジュールを unnest で行集合に展開
+
+    列ごとの配列としてバインドするため、件数に関わらずパラメータ数は一定
+    """
+    columns = ("lecture_id", "teacher_id", "booking_date", "start_time", "end_time", "capacity")
+    types = (Integer, Integer, Date, Time, Time, Integer)
+    return func.unnest(*[
+        bindparam(f"batch_{name}", [schedule[name] for schedule in schedules], type_=ARRAY(type_))
+        for name, type_ in zip(columns, types)
+    ]).table_valued(
+        *[column(name, type_) for name, type_ in zip(columns, types)],
+        with_ordinality="idx"
+    ).render_derived(name="new_schedules")
+
+
+async def validate_schedule_owners(
+    db: AsyncSession,
+    current_user: User,
+    schedules: List[Dict]
+) -> None:
+    """
+    スケジュールの講座・講師を一括で検証（件数に関わらず講座・講師それぞれ 1 回のクエリ）
+
+    講師は自分が担当する講座・自分自身の ID のみ、管理者は講師ロールとプロフィールを持つ講師のみ指定できる
+
+    Args:
+        db: データベースセッション
+        current_user: 現在のユーザー（講師・管理者）
+        schedules: lecture_id, teacher_id を持つ辞書のリスト
+
+    Raises:
+        HTTPException: 講座・講師が存在しない、権限がない場合
+    """
+    # 講座の存在性と担当講師を一括で取得
+    lecture_ids = {schedule["lecture_id"] for schedule in schedules}
+    lecture_teachers = dict((await db.execute(
+        select(Lecture.id, Lecture.teacher_id).where(
+            Lecture.id.in_(lecture_ids),
+            Lecture.is_deleted == False
+        )
+    )).all())
+
+    for schedule in schedules:
+        if schedule["lecture_id"] not in lecture_teachers:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"講座ID {schedule['lecture_id']} が見つかりません"
+            )
+        if current_user.role == "teacher":
+            if lecture_teachers[schedule["lecture_id"]] != current_user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="講師は自分が担当する講座のスケジュールのみ登録できます"
+                )
+            if schedule["teacher_id"] != current_user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="講師は自分自身のIDのみ指定できます"
+                )
+
+    # 管理者の場合、指定された講師（講師ロール・プロフィールあり）の存在性を一括でチェック
+    if current_user.role == "admin":
+        teacher_ids = {schedule["teacher_id"] for schedule in schedules}
+        valid_teacher_ids = set((await db.scalars(
+            select(TeacherProfile.id)
+            .join(User, User.id == TeacherProfile.id)
+            .where(
+                TeacherProfile.id.in_(teacher_ids),
+                User.role == "teacher",
+                User.is_deleted == False
+            )
+        )).all())
+        missing_teacher_ids = teacher_ids - valid_teacher_ids
+        if missing_teacher_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"指定された講師が見つからないか、講師ロールを持っていません: 講師ID {min(missing_teacher_ids)}"
+            )
+
+
+async def insert_schedules(
+    db: AsyncSession,
+    current_user: User,
+    schedules: List[Dict]
+) -> List[int]:
+    """
+    スケジュールを一括登録（commit は呼び出し側で行う）
+
+    件数に関わらず、講座・講師の検証、登録データ同士と既存スケジュールとの時間重複チェック、
+    登録をそれぞれ 1 回のクエリで行う
+
+    Args:
+        db: データベースセッション
+        current_user: 現在のユーザー（講師・管理者）
+        schedules: lecture_id, teacher_id, booking_date, start_time, end_time, capacity を持つ辞書のリスト（形式チェック済み）
+
+    Returns:
+        List[int]: 登録したスケジュールID（schedules と同じ順序）
+
+    Raises:
+        HTTPException: 講座・講師が存在しない、権限がない、時間帯が重複している場合
+    """
+    await validate_schedule_owners(db, current_user, schedules)
+
+    new_schedules = _schedule_rows(schedules)
+    starts_at = (new_schedules.c.booking_date + new_schedules.c.start_time).label("starts_at")
+    ends_at = (new_schedules.c.booking_date + new_schedules.c.end_time).label("ends_at")
+
+    # 登録データ同士の重複：講座ごとに開始時刻順に並べ、それより前の枠の終了時刻の最大値が開始時刻を超える枠
+    ordered = select(
+        new_schedules.c.booking_date,
+        new_schedules.c.start_time,
+        new_schedules.c.end_time,
+        starts_at,
+        func.max(ends_at).over(
+            partition_by=new_schedules.c.lecture_id,
+            order_by=(starts_at, new_schedules.c.idx),
+            rows=(None, -1)
+        ).label("previous_ends_at")
+    ).subquery()
+    batch_conflict = (await db.execute(
+        select(ordered.c.booking_date, ordered.c.start_time, ordered.c.end_time)
+        .where(ordered.c.previous_ends_at > ordered.c.starts_at)
+        .order_by(ordered.c.starts_at)
+        .limit(1)
+    )).first()
+    if batch_conflict:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"登録するスケジュール同士の時間帯が重複しています: 日付 {batch_conflict.booking_date} {batch_conflict.start_time}-{batch_conflict.end_time}"
+        )
+
+    # 既存スケジュールとの重複（排他制約の GiST インデックスを使用）
+    db_conflict = (await db.execute(
+        select(
+            new_schedules.c.booking_date,
+            LectureSchedule.start_time,
+            LectureSchedule.end_time
+        )
+        .join(LectureSchedule, and_(
+            LectureSchedule.lecture_id == new_schedules.c.lecture_id,
+            LectureSchedule.time_range.op("&&")(func.tsrange(starts_at, ends_at)),
+            LectureSchedule.is_expired == False
+        ))
+        .order_by(new_schedules.c.idx)
+        .limit(1)
+    )).first()
+    if db_conflict:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"日付 {db_conflict.booking_date} の指定された時間帯は既に他のスケジュールと重複しています。既存の時間: {db_conflict.start_time}-{db_conflict.end_time}"
+        )
+
+    # 複数行を 1 回の INSERT ... SELECT で登録（チェック後に同時登録された重複は排他制約で検出）
+    try:
+        result = await db.execute(
+            insert(LectureSchedule).from_select(
+                ["lecture_id", "teacher_id", "booking_date", "start_time", "end_time", "capacity"],
+                select(
+                    new_schedules.c.lecture_id,
+                    new_schedules.c.teacher_id,
+                    new_schedules.c.booking_date,
+                    new_schedules.c.start_time,
+                    new_schedules.c.end_time,
+                    new_schedules.c.capacity
+                ).order_by(new_schedules.c.idx)
+            ).returning(LectureSchedule.id)
+        )
+    except IntegrityError as e:
+        if not is_exclusion_violation(e, SCHEDULE_OVERLAP_CONSTRAINT):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="指定された時間帯は既に他のスケジュールと重複しています"
+        )
+    return list(result.scalars().all())
+
+
+def _active_booking_exists():
+    """スケジュールと講座・日付・時間帯が一致する有効な予約（pending / confirmed）の EXISTS 条件"""
+    return select(LectureBooking.id).where(
+        LectureBooking.lecture_id == LectureSchedule.lecture_id,
+        LectureBooking.booking_date == LectureSchedule.booking_date,
+        LectureBooking.start_time == LectureSchedule.start_time,
+        LectureBooking.end_time == LectureSchedule.end_time,
+        LectureBooking.status.in_(["pending", "confirmed"]),
+        LectureBooking.is_expired == False
+    ).exists()
+
+
+async def expire_schedules(db: AsyncSession, *criteria) -> List[int]:
+    """
+    条件に一致する有効なスケジュールをまとめて論理削除（commit は呼び出し側で行う）
+
+    件数に関わらず、予約のあるスケジュールの確認と UPDATE ... RETURNING の 2 回のクエリで行う。
+    予約がある（席が占有されている、または時間帯が一致する有効な予約がある）スケジュールが 1 件でもあれば何も削除しない。
+    確認後に予約が入ったスケジュールは UPDATE の条件（反結合）で除外され、削除されずに残る
+
+    Args:
+        db: データベースセッション
+        criteria: 対象スケジュールの条件（lectures を参照する条件も可）
+
+    Returns:
+        List[int]: 削除したスケジュールID
+
+    Raises:
+        HTTPException: 予約のあるスケジュールが含まれる場合
+    """
+    booked = (await db.execute(
+        select(LectureSchedule.booking_date, LectureSchedule.start_time, LectureSchedule.end_time)
+        .where(
+            *criteria,
+            LectureSchedule.is_expired == False,
+            or_(LectureSchedule.booked_count > 0, _active_booking_exists())
+        )
+        .order_by(LectureSchedule.booking_date, LectureSchedule.start_time)
+        .limit(1)
+    )).first()
+    if booked:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"日付 {booked.booking_date} の時間帯 {booked.start_time}-{booked.end_time} は既に予約されているため削除できません"
+        )
+
+    result = await db.execute(
+        update(LectureSchedule)
+        .where(
+            *criteria,
+            LectureSchedule.is_expired == False,
+            LectureSchedule.booked_count == 0,
+            ~_active_booking_exists()
+        )
+        .values(is_expired=True)
+        .returning(LectureSchedule.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars().all())
 
 
 @router.post("/", response_model=ScheduleCreateResponse)
 async def create_schedule(
     schedule_data: ScheduleCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     予約可能時間登録API（講師・管理者）
@@ -77,10 +346,12 @@ async def create_schedule(
             )
         
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == schedule_data.lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == schedule_data.lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -105,11 +376,13 @@ async def create_schedule(
         
         # 管理者の場合、指定された講師が存在するかチェック
         elif current_user.role == "admin":
-            teacher = db.query(User).filter(
-                User.id == schedule_data.teacher_id,
-                User.role == "teacher",
-                User.is_deleted == False
-            ).first()
+            teacher = await db.scalar(
+                select(User).where(
+                    User.id == schedule_data.teacher_id,
+                    User.role == "teacher",
+                    User.is_deleted == False
+                )
+            )
             
             if not teacher:
                 raise HTTPException(
@@ -118,9 +391,11 @@ async def create_schedule(
                 )
             
             # 講師プロフィールの存在性をチェック
-            teacher_profile = db.query(TeacherProfile).filter(
-                TeacherProfile.id == schedule_data.teacher_id
-            ).first()
+            teacher_profile = await db.scalar(
+                select(TeacherProfile).where(
+                    TeacherProfile.id == schedule_data.teacher_id
+                )
+            )
             
             if not teacher_profile:
                 raise HTTPException(
@@ -153,30 +428,35 @@ async def create_schedule(
                 detail="過去の日付にはスケジュールを登録できません"
             )
         
-        # 時間衝突チェック
-        has_conflict, conflicting_schedule = check_time_conflicts(
-            db, schedule_data.lecture_id, booking_date, start_time, end_time
-        )
-        
-        if has_conflict:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"指定された時間帯は既に他のスケジュールと重複しています。既存の時間: {conflicting_schedule.start_time}-{conflicting_schedule.end_time}"
-            )
-        
         # 新しいスケジュールを作成
         new_schedule = LectureSchedule(
             lecture_id=schedule_data.lecture_id,
             teacher_id=schedule_data.teacher_id,  # 新增：讲师ID
             booking_date=booking_date,
             start_time=start_time,
-            end_time=end_time
+            end_time=end_time,
+            capacity=schedule_data.capacity
         )
         
-        # データベースに保存
+        # データベースに保存（時間衝突は排他制約で検出）
         db.add(new_schedule)
-        db.commit()
-        db.refresh(new_schedule)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            if not is_exclusion_violation(e, SCHEDULE_OVERLAP_CONSTRAINT):
+                raise
+            await db.rollback()
+            _, conflicting_schedule = await check_time_conflicts(
+                db, schedule_data.lecture_id, booking_date, start_time, end_time
+            )
+            detail = "指定された時間帯は既に他のスケジュールと重複しています"
+            if conflicting_schedule:
+                detail += f"。既存の時間: {conflicting_schedule.start_time}-{conflicting_schedule.end_time}"
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
+        await db.refresh(new_schedule)
         
         logger.info(f"予約可能時間登録完了: スケジュールID {new_schedule.id}, 講座ID {schedule_data.lecture_id}, 日付 {booking_date}, 時間 {start_time}-{end_time}")
         
@@ -185,10 +465,10 @@ async def create_schedule(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"予約可能時間登録エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -198,11 +478,342 @@ async def create_schedule(
         )
 
 
+@router.post("/batch", response_model=ScheduleBatchCreateResponse)
+async def create_schedules_batch(
+    batch_data: ScheduleBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    予約可能時間一括登録API（講師・管理者）
+
+    同じ講座・時間帯の予約可能時間を複数の日付にまとめて登録する。
+    いずれかの日付が登録できない場合は 1 件も登録しない
+    """
+    logger.info(f"予約可能時間一括登録リクエスト: 講座ID {batch_data.lecture_id}, 講師ID {batch_data.teacher_id}, {len(batch_data.dates)}件 by {current_user.email}")
+    
+    try:
+        # 権限チェック：講師または管理者のみアクセス可能
+        if current_user.role not in ["teacher", "admin"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この操作を実行する権限がありません。講師または管理者権限が必要です"
+            )
+        
+        # 日付と時間の形式を変換
+        try:
+            booking_dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in batch_data.dates]
+            start_time = datetime.strptime(batch_data.start, "%H:%M").time()
+            end_time = datetime.strptime(batch_data.end, "%H:%M").time()
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"日付または時間の形式が正しくありません: {str(e)}"
+            )
+        
+        # 開始時間が終了時間より前であることをチェック
+        if start_time >= end_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="開始時間は終了時間より前である必要があります"
+            )
+        
+        # 過去の日付でないことをチェック
+        past_dates = [d for d in booking_dates if d < date.today()]
+        if past_dates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"過去の日付にはスケジュールを登録できません: {past_dates[0]}"
+            )
+        
+        schedule_ids = await insert_schedules(db, current_user, [
+            {
+                "lecture_id": batch_data.lecture_id,
+                "teacher_id": batch_data.teacher_id,
+                "booking_date": booking_date,
+                "start_time": start_time,
+                "end_time": end_time,
+                "capacity": batch_data.capacity
+            }
+            for booking_date in booking_dates
+        ])
+        await db.commit()
+        
+        logger.info(f"予約可能時間一括登録完了: 講座ID {batch_data.lecture_id}, {len(schedule_ids)}件")
+        
+        return ScheduleBatchCreateResponse(
+            message=f"{len(schedule_ids)}件の予約可能時間を登録しました",
+            created_count=len(schedule_ids)
+        )
+        
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"予約可能時間一括登録エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.post("/templates", response_model=ScheduleTemplateCreateResponse)
+async def create_schedule_template(
+    template_data: ScheduleTemplateCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    繰り返しスケジュールテンプレート作成API（講師・管理者）
+    
+    曜日・隔週の規則と期間を登録し、予約可能時間をサーバー側で一括生成する。
+    作成時は今日から SCHEDULE_TEMPLATE_HORIZON_DAYS 日先までを生成し、以降はバックグラウンドジョブが順次追加する。
+    既存の予約可能時間と重複する日はスキップする
+    
+    Args:
+        template_data: テンプレート
+        current_user: 現在のユーザー（講師または管理者）
+        db: データベースセッション
+    
+    Returns:
+        ScheduleTemplateCreateResponse: テンプレートIDと生成した件数
+    
+    Raises:
+        HTTPException: 権限不足、講座・講師不存在、入力不正、サーバーエラー時
+    """
+    logger.info(f"繰り返しテンプレート作成リクエスト: 講座ID {template_data.lecture_id}, 講師ID {template_data.teacher_id} by {current_user.email}")
+    
+    try:
+        # 権限チェック：講師または管理者のみアクセス可能
+        if current_user.role not in ["teacher", "admin"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この操作を実行する権限がありません。講師または管理者権限が必要です"
+            )
+        
+        start_date = datetime.strptime(template_data.start_date, "%Y-%m-%d").date()
+        end_date = datetime.strptime(template_data.end_date, "%Y-%m-%d").date()
+        start_time = datetime.strptime(template_data.start, "%H:%M").time()
+        end_time = datetime.strptime(template_data.end, "%H:%M").time()
+        
+        if start_time >= end_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="開始時間は終了時間より前である必要があります"
+            )
+        
+        if start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="開始日は終了日以前である必要があります"
+            )
+        
+        if end_date < date.today():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="終了日が過去の日付です"
+            )
+        
+        if end_date - start_date >= timedelta(days=SCHEDULE_TEMPLATE_MAX_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"繰り返しの期間は{SCHEDULE_TEMPLATE_MAX_DAYS}日以内である必要があります"
+            )
+        
+        await validate_schedule_owners(db, current_user, [
+            {"lecture_id": template_data.lecture_id, "teacher_id": template_data.teacher_id}
+        ])
+        
+        template = ScheduleTemplate(
+            lecture_id=template_data.lecture_id,
+            teacher_id=template_data.teacher_id,
+            weekdays=template_data.weekdays,
+            interval_weeks=template_data.interval_weeks,
+            start_date=start_date,
+            end_date=end_date,
+            start_time=start_time,
+            end_time=end_time,
+            capacity=template_data.capacity,
+            excluded_dates=[datetime.strptime(d, "%Y-%m-%d").date() for d in template_data.excluded_dates]
+        )
+        db.add(template)
+        await db.flush()
+        
+        # 直近の期間分を同じトランザクションで生成
+        created_count = await materialize_schedule_templates(db, template_id=template.id)
+        await db.commit()
+        
+        logger.info(f"繰り返しテンプレート作成完了: テンプレートID {template.id}, {created_count}件生成")
+        
+        return ScheduleTemplateCreateResponse(
+            message=f"繰り返しテンプレートを登録し、{created_count}件の予約可能時間を作成しました",
+            template_id=template.id,
+            created_count=created_count
+        )
+        
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"繰り返しテンプレート作成エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.get("/templates", response_model=List[ScheduleTemplateOut])
+async def get_schedule_templates(
+    lecture_id: Optional[int] = Query(None, description="講座IDで絞り込み"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    繰り返しスケジュールテンプレート一覧取得API（講師・管理者）
+    
+    講師は自分のテンプレートのみ、管理者はすべてのテンプレートを取得できる（有効なもののみ）
+    
+    Args:
+        lecture_id: 講座ID（任意）
+        current_user: 現在のユーザー（講師または管理者）
+        db: データベースセッション
+    
+    Returns:
+        List[ScheduleTemplateOut]: テンプレート一覧
+    
+    Raises:
+        HTTPException: 権限不足、サーバーエラー時
+    """
+    logger.info(f"繰り返しテンプレート一覧取得リクエスト: 講座ID {lecture_id} by {current_user.email}")
+    
+    try:
+        if current_user.role not in ["teacher", "admin"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この操作を実行する権限がありません。講師または管理者権限が必要です"
+            )
+        
+        query = select(ScheduleTemplate).where(ScheduleTemplate.is_active == True)
+        if lecture_id is not None:
+            query = query.where(ScheduleTemplate.lecture_id == lecture_id)
+        if current_user.role == "teacher":
+            query = query.where(ScheduleTemplate.teacher_id == current_user.id)
+        
+        templates = (await db.scalars(query.order_by(ScheduleTemplate.id))).all()
+        
+        return [ScheduleTemplateOut.model_validate(template) for template in templates]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"繰り返しテンプレート一覧取得エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.delete("/templates/{template_id}", response_model=dict)
+async def delete_schedule_template(
+    template_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    繰り返しスケジュールテンプレート削除API（講師・管理者）
+    
+    テンプレートを無効化し、テンプレートから生成した今日以降の予約のない予約可能時間を論理削除する。
+    予約のある予約可能時間はそのまま残す
+    
+    Args:
+        template_id: 削除するテンプレートID
+        current_user: 現在のユーザー（講師または管理者）
+        db: データベースセッション
+    
+    Returns:
+        dict: 削除結果
+    
+    Raises:
+        HTTPException: 権限不足、テンプレート不存在、サーバーエラー時
+    """
+    logger.info(f"繰り返しテンプレート削除リクエスト: テンプレートID {template_id} by {current_user.email}")
+    
+    try:
+        if current_user.role not in ["teacher", "admin"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この操作を実行する権限がありません。講師または管理者権限が必要です"
+            )
+        
+        template = await db.scalar(
+            select(ScheduleTemplate).where(
+                ScheduleTemplate.id == template_id,
+                ScheduleTemplate.is_active == True
+            )
+        )
+        
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="指定された繰り返しテンプレートが見つかりません"
+            )
+        
+        if current_user.role == "teacher" and template.teacher_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="講師は自分の繰り返しテンプレートのみ削除できます"
+            )
+        
+        template.is_active = False
+        result = await db.execute(
+            update(LectureSchedule)
+            .where(
+                LectureSchedule.template_id == template_id,
+                LectureSchedule.booking_date >= date.today(),
+                LectureSchedule.booked_count == 0,
+                LectureSchedule.is_expired == False
+            )
+            .values(is_expired=True)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        
+        logger.info(f"繰り返しテンプレート削除完了: テンプレートID {template_id}, 予約可能時間 {result.rowcount}件を削除")
+        
+        return {
+            "success": True,
+            "message": f"繰り返しテンプレートを削除し、{result.rowcount}件の予約可能時間を削除しました",
+            "template_id": template_id,
+            "deleted_count": result.rowcount
+        }
+        
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"繰り返しテンプレート削除エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
 @router.delete("/{schedule_id}", response_model=dict)
 async def delete_schedule(
     schedule_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     予約可能時間削除API（講師・管理者）
@@ -229,10 +840,12 @@ async def delete_schedule(
             )
         
         # スケジュールの存在性をチェック
-        schedule = db.query(LectureSchedule).filter(
-            LectureSchedule.id == schedule_id,
-            LectureSchedule.is_expired == False
-        ).first()
+        schedule = await db.scalar(
+            select(LectureSchedule).where(
+                LectureSchedule.id == schedule_id,
+                LectureSchedule.is_expired == False
+            )
+        )
         
         if not schedule:
             raise HTTPException(
@@ -241,10 +854,12 @@ async def delete_schedule(
             )
         
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == schedule.lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == schedule.lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -262,7 +877,7 @@ async def delete_schedule(
         
         # スケジュールを削除（物理削除ではなく論理削除）
         schedule.is_expired = True
-        db.commit()
+        await db.commit()
         
         logger.info(f"予約可能時間削除完了: スケジュールID {schedule_id}")
         
@@ -273,10 +888,10 @@ async def delete_schedule(
         }
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"予約可能時間削除エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -288,16 +903,22 @@ async def delete_schedule(
 
 @router.get("/", response_model=List[ScheduleListOut])
 async def get_all_schedules(
+    response: Response,
     lecture_id: int = None,
     teacher_id: int = None,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの件数（指定時はカーソル方式のページネーション）"),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講座スケジュール一覧取得API（認証不要）
     
     Args:
+        response: レスポンス（次ページのカーソルを X-Next-Cursor ヘッダーに設定）
         lecture_id: 講座ID（オプション）
         teacher_id: 講師ID（オプション）
+        limit: 1ページの件数（未指定かつ cursor 未指定の場合は全件）
+        cursor: 次ページ取得用カーソル
         db: データベースセッション
     
     Returns:
@@ -308,15 +929,17 @@ async def get_all_schedules(
     """
     logger.info(f"講座スケジュール一覧取得リクエスト: 講座ID {lecture_id}, 講師ID {teacher_id}")
     
+    page = KeysetPage(SCHEDULE_SORT_KEYS, limit, cursor)
+    
     try:
         # 削除されていない講座のスケジュールを全て取得
-        query = db.query(
+        query = select(
             LectureSchedule, Lecture, User
         ).join(
             Lecture, LectureSchedule.lecture_id == Lecture.id
         ).join(
             User, Lecture.teacher_id == User.id
-        ).filter(
+        ).where(
             Lecture.is_deleted == False,
             User.is_deleted == False,
             LectureSchedule.is_expired == False
@@ -324,10 +947,10 @@ async def get_all_schedules(
         
         # フィルタリング
         if lecture_id:
-            query = query.filter(LectureSchedule.lecture_id == lecture_id)
+            query = query.where(LectureSchedule.lecture_id == lecture_id)
         
         if teacher_id:
-            query = query.filter(Lecture.teacher_id == teacher_id)
+            query = query.where(Lecture.teacher_id == teacher_id)
         
         # ソート
         query = query.order_by(
@@ -335,7 +958,11 @@ async def get_all_schedules(
             LectureSchedule.start_time.asc()
         )
         
-        schedules = query.all()
+        schedules = page.finish(
+            (await db.execute(page.apply(query))).all(),
+            lambda row: (row.LectureSchedule.booking_date, row.LectureSchedule.start_time, row.LectureSchedule.id),
+            response
+        )
         
         logger.info(f"講座スケジュール一覧取得成功: {len(schedules)}件")
         
@@ -351,6 +978,8 @@ async def get_all_schedules(
                 "booking_date": schedule.booking_date,
                 "start_time": schedule.start_time,
                 "end_time": schedule.end_time,
+                "capacity": schedule.capacity,
+                "booked_count": schedule.booked_count,
                 "created_at": schedule.created_at
             }
             schedule_list.append(ScheduleListOut(**schedule_data))
@@ -370,7 +999,7 @@ async def get_all_schedules(
 @router.get("/lecture/{lecture_id}", response_model=List[ScheduleOut])
 async def get_schedules_by_lecture(
     lecture_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     特定講座のスケジュール一覧取得API（認証不要）
@@ -389,10 +1018,12 @@ async def get_schedules_by_lecture(
     
     try:
         # 講座の存在性をチェック
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -401,15 +1032,17 @@ async def get_schedules_by_lecture(
             )
         
         # 指定された講座のスケジュールを取得
-        schedules = db.query(LectureSchedule).filter(
-            and_(
-                LectureSchedule.lecture_id == lecture_id,
-                LectureSchedule.is_expired == False
+        schedules = (await db.scalars(
+            select(LectureSchedule).where(
+                and_(
+                    LectureSchedule.lecture_id == lecture_id,
+                    LectureSchedule.is_expired == False
+                )
+            ).order_by(
+                LectureSchedule.booking_date.asc(),
+                LectureSchedule.start_time.asc()
             )
-        ).order_by(
-            LectureSchedule.booking_date.asc(),
-            LectureSchedule.start_time.asc()
-        ).all()
+        )).all()
         
         logger.info(f"特定講座のスケジュール一覧取得成功: 講座ID {lecture_id}, {len(schedules)}件")
         
@@ -432,28 +1065,49 @@ async def get_schedules_by_lecture(
 
 @router.get("/lecture-schedules", response_model=List[dict])
 async def get_lecture_schedules_for_frontend(
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの件数（指定時はカーソル方式のページネーション）"),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     フロントエンド互換講座スケジュール取得API
+    
+    limit / cursor 指定時はカーソル方式でページ分割し、次ページのカーソルを X-Next-Cursor ヘッダーで返す
+    ETag を返し、If-None-Match が一致する場合は一覧を取得せずに 304 を返す
     """
     logger.info("フロントエンド互換講座スケジュール取得リクエスト")
     
+    page = KeysetPage(SCHEDULE_SORT_KEYS, limit, cursor)
+    
     try:
-            schedules = db.query(
-                LectureSchedule, Lecture, User
-            ).join(
-                Lecture, LectureSchedule.lecture_id == Lecture.id
-            ).join(
-                User, Lecture.teacher_id == User.id
-            ).filter(
-                Lecture.is_deleted == False,
-                User.is_deleted == False,
-                LectureSchedule.is_expired == False
-            ).order_by(
-                LectureSchedule.booking_date.asc(),
-                LectureSchedule.start_time.asc()
-            ).all()
+            # 変更がなければ一覧を取得せずに 304 を返す
+            _, unchanged = await conditional_get(request, response, db, SCHEDULE_LIST_TABLES, limit, cursor)
+            if unchanged is not None:
+                return unchanged
+            
+            schedules = (await db.execute(page.apply(
+                select(
+                    LectureSchedule, Lecture, User
+                ).join(
+                    Lecture, LectureSchedule.lecture_id == Lecture.id
+                ).join(
+                    User, Lecture.teacher_id == User.id
+                ).where(
+                    Lecture.is_deleted == False,
+                    User.is_deleted == False,
+                    LectureSchedule.is_expired == False
+                ).order_by(
+                    LectureSchedule.booking_date.asc(),
+                    LectureSchedule.start_time.asc()
+                )
+            ))).all()
+            schedules = page.finish(
+                schedules,
+                lambda row: (row.LectureSchedule.booking_date, row.LectureSchedule.start_time, row.LectureSchedule.id),
+                response
+            )
             
             frontend_schedules = []
             for schedule, lecture, user in schedules:
@@ -485,7 +1139,7 @@ async def get_lecture_schedules_for_frontend(
 async def create_lecture_schedules_for_frontend(
     request_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     フロントエンド互換講座スケジュール作成API
@@ -506,6 +1160,7 @@ async def create_lecture_schedules_for_frontend(
                 detail="スケジュールデータが提供されていません"
             )
         
+        # 形式チェック（データベースへの問い合わせは insert_schedules() でまとめて行う）
         new_schedules = []
         for schedule_data in schedules_data:
             required_fields = ["lecture_id", "teacher_id", "date", "start", "end"]
@@ -516,29 +1171,6 @@ async def create_lecture_schedules_for_frontend(
                         detail=f"必須フィールドが不足しています: {field}"
                     )
             
-            if current_user.role == "teacher" and schedule_data["teacher_id"] != current_user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="講師は自分自身のIDのみ指定できます"
-                )
-            
-            lecture = db.query(Lecture).filter(
-                Lecture.id == schedule_data["lecture_id"],
-                Lecture.is_deleted == False
-            ).first()
-            
-            if not lecture:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"講座ID {schedule_data['lecture_id']} が見つかりません"
-                )
-            
-            if current_user.role == "teacher" and lecture.teacher_id != current_user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="講師は自分が担当する講座のスケジュールのみ登録できます"
-                )
-            
             try:
                 booking_date = datetime.strptime(schedule_data["date"], "%Y-%m-%d").date()
                 start_time = datetime.strptime(schedule_data["start"], "%H:%M").time()
@@ -561,27 +1193,31 @@ async def create_lecture_schedules_for_frontend(
                     detail=f"過去の日付にはスケジュールを登録できません: {schedule_data['date']}"
                 )
             
-            has_conflict, conflicting_schedule = check_time_conflicts(
-                db, schedule_data["lecture_id"], booking_date, start_time, end_time
-            )
+            capacity = schedule_data.get("capacity", 1)
+            if not isinstance(capacity, int) or capacity <= 0 or capacity > 1000:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="定員は1以上1000以下である必要があります"
+                )
             
-            if has_conflict:
+            if not isinstance(schedule_data["lecture_id"], int) or not isinstance(schedule_data["teacher_id"], int):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"日付 {schedule_data['date']} の指定された時間帯は既に他のスケジュールと重複しています。既存の時間: {conflicting_schedule.start_time}-{conflicting_schedule.end_time}"
+                    detail="IDは正の整数である必要があります"
                 )
             
-            new_schedule = LectureSchedule(
-                lecture_id=schedule_data["lecture_id"],
-                teacher_id=schedule_data["teacher_id"],  # 新增：讲师ID
-                booking_date=booking_date,
-                start_time=start_time,
-                end_time=end_time
-            )
-            new_schedules.append(new_schedule)
+            new_schedules.append({
+                "lecture_id": schedule_data["lecture_id"],
+                "teacher_id": schedule_data["teacher_id"],
+                "booking_date": booking_date,
+                "start_time": start_time,
+                "end_time": end_time,
+                "capacity": capacity
+            })
         
-        db.add_all(new_schedules)
-        db.commit()
+        # 講座・講師の検証、時間重複チェック、登録を一括で実行
+        await insert_schedules(db, current_user, new_schedules)
+        await db.commit()
         
         logger.info(f"フロントエンド互換講座スケジュール作成成功: {len(new_schedules)}件")
         
@@ -592,10 +1228,10 @@ async def create_lecture_schedules_for_frontend(
         }
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"フロントエンド互換講座スケジュール作成エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -609,7 +1245,7 @@ async def create_lecture_schedules_for_frontend(
 async def delete_schedules_by_date(
     target_date: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     指定日の全可予約時間削除API（教師のみ）
@@ -637,48 +1273,23 @@ async def delete_schedules_by_date(
                 detail="過去の日付のスケジュールは削除できません"
             )
         
-        schedules_to_delete = db.query(LectureSchedule).join(
-            Lecture, LectureSchedule.lecture_id == Lecture.id
-        ).filter(
-            and_(
-                LectureSchedule.booking_date == target_date_obj,
-                Lecture.teacher_id == current_user.id,
-                Lecture.is_deleted == False,
-                LectureSchedule.is_expired == False
-            )
-        ).all()
+        deleted_ids = await expire_schedules(
+            db,
+            LectureSchedule.lecture_id == Lecture.id,
+            LectureSchedule.booking_date == target_date_obj,
+            Lecture.teacher_id == current_user.id,
+            Lecture.is_deleted == False
+        )
         
-        if not schedules_to_delete:
+        if not deleted_ids:
             return {
                 "success": True,
                 "message": f"日付 {target_date} に削除可能なスケジュールがありません",
                 "deleted_count": 0
             }
         
-        for schedule in schedules_to_delete:
-            existing_booking = db.query(LectureBooking).filter(
-                and_(
-                    LectureBooking.lecture_id == schedule.lecture_id,
-                    LectureBooking.booking_date == schedule.booking_date,
-                    LectureBooking.start_time == schedule.start_time,
-                    LectureBooking.end_time == schedule.end_time,
-                    LectureBooking.status.in_(["pending", "confirmed"]),
-                    LectureBooking.is_expired == False
-                )
-            ).first()
-            
-            if existing_booking:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"日付 {target_date} の時間帯 {schedule.start_time}-{schedule.end_time} は既に予約されているため削除できません"
-                )
-        
-        deleted_count = 0
-        for schedule in schedules_to_delete:
-            schedule.is_expired = True
-            deleted_count += 1
-        
-        db.commit()
+        deleted_count = len(deleted_ids)
+        await db.commit()
         
         logger.info(f"指定日可予約時間削除完了: 日付 {target_date}, 削除件数 {deleted_count}")
         
@@ -690,10 +1301,10 @@ async def delete_schedules_by_date(
         }
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"指定日可予約時間削除エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -707,7 +1318,7 @@ async def delete_schedules_by_date(
 async def delete_all_schedules_by_lecture(
     lecture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     指定講座の全可予約時間削除API（教師のみ）
@@ -721,12 +1332,14 @@ async def delete_all_schedules_by_lecture(
                 detail="この操作を実行する権限がありません。教師権限が必要です"
             )
         
-        lecture = db.query(Lecture).filter(
-            and_(
-                Lecture.id == lecture_id,
-                Lecture.is_deleted == False
+        lecture = await db.scalar(
+            select(Lecture).where(
+                and_(
+                    Lecture.id == lecture_id,
+                    Lecture.is_deleted == False
+                )
             )
-        ).first()
+        )
         
         if not lecture:
             raise HTTPException(
@@ -740,44 +1353,17 @@ async def delete_all_schedules_by_lecture(
                 detail="この講座のスケジュールを削除する権限がありません。自分が担当する講座のみ削除できます"
             )
         
-        schedules_to_delete = db.query(LectureSchedule).filter(
-            and_(
-                LectureSchedule.lecture_id == lecture_id,
-                LectureSchedule.is_expired == False
-            )
-        ).all()
+        deleted_ids = await expire_schedules(db, LectureSchedule.lecture_id == lecture_id)
         
-        if not schedules_to_delete:
+        if not deleted_ids:
             return {
                 "success": True,
                 "message": f"講座ID {lecture_id} に削除可能なスケジュールがありません",
                 "deleted_count": 0
             }
         
-        for schedule in schedules_to_delete:
-            existing_booking = db.query(LectureBooking).filter(
-                and_(
-                    LectureBooking.lecture_id == schedule.lecture_id,
-                    LectureBooking.booking_date == schedule.booking_date,
-                    LectureBooking.start_time == schedule.start_time,
-                    LectureBooking.end_time == schedule.end_time,
-                    LectureBooking.status.in_(["pending", "confirmed"]),
-                    LectureBooking.is_expired == False
-                )
-            ).first()
-            
-            if existing_booking:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"日付 {schedule.booking_date} の時間帯 {schedule.start_time}-{schedule.end_time} は既に予約されているため削除できません"
-                )
-        
-        deleted_count = 0
-        for schedule in schedules_to_delete:
-            schedule.is_expired = True
-            deleted_count += 1
-        
-        db.commit()
+        deleted_count = len(deleted_ids)
+        await db.commit()
         
         logger.info(f"指定講座全可予約時間削除完了: 講座ID {lecture_id}, 削除件数 {deleted_count}")
         
@@ -790,10 +1376,10 @@ async def delete_all_schedules_by_lecture(
         }
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"指定講座全可予約時間削除エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -807,7 +1393,7 @@ async def delete_all_schedules_by_lecture(
 async def get_lecture_available_times(
     lecture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取指定课程的全部可预约时间API（仅限用户调用）
@@ -827,10 +1413,12 @@ async def get_lecture_available_times(
     
     try:
         # 检查课程是否存在
-        lecture = db.query(Lecture).filter(
-            Lecture.id == lecture_id,
-            Lecture.is_deleted == False
-        ).first()
+        lecture = await db.scalar(
+            select(Lecture).where(
+                Lecture.id == lecture_id,
+                Lecture.is_deleted == False
+            )
+        )
         
         if not lecture:
             raise HTTPException(
@@ -839,20 +1427,22 @@ async def get_lecture_available_times(
             )
         
         # 查询该课程的所有可预约时间（从lecture_schedules表）
-        available_times = db.query(
-            LectureSchedule.booking_date,
-            LectureSchedule.start_time,
-            LectureSchedule.end_time
-        ).filter(
-            and_(
-                LectureSchedule.lecture_id == lecture_id,
-                LectureSchedule.is_expired == False,  # 只包含未过期的时间
-                LectureSchedule.booking_date >= date.today()  # 只包含今天及以后的日期
+        available_times = (await db.execute(
+            select(
+                LectureSchedule.booking_date,
+                LectureSchedule.start_time,
+                LectureSchedule.end_time
+            ).where(
+                and_(
+                    LectureSchedule.lecture_id == lecture_id,
+                    LectureSchedule.is_expired == False,  # 只包含未过期的时间
+                    LectureSchedule.booking_date >= date.today()  # 只包含今天及以后的日期
+                )
+            ).order_by(
+                LectureSchedule.booking_date.asc(),
+                LectureSchedule.start_time.asc()
             )
-        ).order_by(
-            LectureSchedule.booking_date.asc(),
-            LectureSchedule.start_time.asc()
-        ).all()
+        )).all()
         
         # 转换为前端需要的格式
         result = []
@@ -881,7 +1471,7 @@ async def get_lecture_available_times(
 @router.get("/{schedule_id}", response_model=ScheduleOut)
 async def get_schedule_by_id(
     schedule_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     特定スケジュール詳細取得API（認証不要）
@@ -900,10 +1490,12 @@ async def get_schedule_by_id(
     
     try:
         # 指定されたIDのスケジュールを取得
-        schedule = db.query(LectureSchedule).filter(
-            LectureSchedule.id == schedule_id,
-            LectureSchedule.is_expired == False
-        ).first()
+        schedule = await db.scalar(
+            select(LectureSchedule).where(
+                LectureSchedule.id == schedule_id,
+                LectureSchedule.is_expired == False
+            )
+        )
         
         if not schedule:
             raise HTTPException(
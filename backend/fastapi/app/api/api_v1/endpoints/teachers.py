@@ -1,32 +1,51 @@
 """
 講師関連 API エンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func
+from typing import Optional
 import logging
 import traceback
 
 from app.models.user import User
 from app.models.teacher import TeacherProfile
 from app.schemas.teacher import TeacherListOut, TeacherProfileUpdate, TeacherProfileUpdateResponse
-from app.utils.jwt import get_current_user, get_current_admin
-from app.db.database import get_db
+from app.utils.jwt import get_current_user, get_current_admin, invalidate_cached_user
+from app.core.cache import autocomplete_cache, catalogue_cache
+from app.core.server_timing import TimedRoute
+from app.db.database import get_async_db
+from app.db.listener import publish_invalidation
+from app.utils.etag import cached_conditional_get, conditional_get
+from app.utils.pagination import KeysetPage, MAX_PAGE_LIMIT, NEXT_CURSOR_HEADER
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+# 講師一覧の内容が依存するテーブル（ETag の算出に使用）
+TEACHER_CATALOGUE_TABLES = ("user_infos", "teacher_profiles")
 
 
 @router.get("/", response_model=list[TeacherListOut])
 async def get_all_teachers(
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの件数（指定時はカーソル方式のページネーション）"),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講師一覧取得API（認証不要）
     
+    ETag を返し、If-None-Match が一致する場合は一覧を取得せずに 304 を返す
+    
     Args:
+        request: リクエスト（If-None-Match ヘッダーを参照）
+        response: レスポンス（次ページのカーソルを X-Next-Cursor ヘッダーに設定）
+        limit: 1ページの件数（未指定かつ cursor 未指定の場合は全件）
+        cursor: 次ページ取得用カーソル
         db: データベースセッション
     
     Returns:
@@ -37,18 +56,41 @@ async def get_all_teachers(
     """
     logger.info("講師一覧取得リクエスト")
     
+    page = KeysetPage([(User.id, False)], limit, cursor)
+    
+    # キャッシュ済みの場合はそのまま返却（講師情報の更新時に全ワーカーで無効化される）
+    cache_key = ("teachers", limit, cursor)
+    cached = catalogue_cache.get(cache_key)
+    if cached is not None:
+        teacher_list, etag, headers = cached
+        unchanged = cached_conditional_get(request, response, etag, headers)
+        return unchanged if unchanged is not None else teacher_list
+    cache_generation = catalogue_cache.generation
+    
     try:
+        # 変更がなければ一覧を取得せずに 304 を返す
+        etag, unchanged = await conditional_get(request, response, db, TEACHER_CATALOGUE_TABLES, limit, cursor)
+        if unchanged is not None:
+            return unchanged
+        
         # 講師ロールを持つユーザーとその講師プロフィールを取得
-        teachers = db.query(
-            User, TeacherProfile
-        ).outerjoin(
-            TeacherProfile, User.id == TeacherProfile.id
-        ).filter(
-            and_(
-                User.role == "teacher",
-                User.is_deleted == False
+        query = page.apply(
+            select(
+                User, TeacherProfile
+            ).outerjoin(
+                TeacherProfile, User.id == TeacherProfile.id
+            ).where(
+                and_(
+                    User.role == "teacher",
+                    User.is_deleted == False
+                )
             )
-        ).all()
+        )
+        teachers = page.finish(
+            (await db.execute(query)).all(),
+            lambda row: (row.User.id,),
+            response
+        )
         
         logger.info(f"講師一覧取得成功: {len(teachers)}件")
         
@@ -65,6 +107,13 @@ async def get_all_teachers(
             }
             teacher_list.append(TeacherListOut(**teacher_data))
         
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        catalogue_cache.set(
+            cache_key,
+            (teacher_list, etag, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None),
+            cache_generation
+        )
+        
         return teacher_list
         
     except Exception as e:
@@ -80,7 +129,7 @@ async def get_all_teachers(
 @router.get("/{teacher_id}", response_model=TeacherListOut)
 async def get_teacher_by_id(
     teacher_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     特定講師情報取得API（認証不要）
@@ -99,17 +148,19 @@ async def get_teacher_by_id(
     
     try:
         # 指定されたIDの講師とそのプロフィールを取得
-        teacher_data = db.query(
-            User, TeacherProfile
-        ).outerjoin(
-            TeacherProfile, User.id == TeacherProfile.id
-        ).filter(
-            and_(
-                User.id == teacher_id,
-                User.role == "teacher",
-                User.is_deleted == False
+        teacher_data = (await db.execute(
+            select(
+                User, TeacherProfile
+            ).outerjoin(
+                TeacherProfile, User.id == TeacherProfile.id
+            ).where(
+                and_(
+                    User.id == teacher_id,
+                    User.role == "teacher",
+                    User.is_deleted == False
+                )
             )
-        ).first()
+        )).first()
         
         if not teacher_data:
             raise HTTPException(
@@ -150,7 +201,7 @@ async def update_teacher_profile(
     teacher_id: int,
     profile_data: TeacherProfileUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     講師プロフィール更新API（本人・管理者）
@@ -178,11 +229,13 @@ async def update_teacher_profile(
             )
         
         # 対象講師が存在し、講師ロールを持っているかチェック
-        target_user = db.query(User).filter(
-            User.id == teacher_id,
-            User.role == "teacher",
-            User.is_deleted == False
-        ).first()
+        target_user = await db.scalar(
+            select(User).where(
+                User.id == teacher_id,
+                User.role == "teacher",
+                User.is_deleted == False
+            )
+        )
         
         if not target_user:
             raise HTTPException(
@@ -191,9 +244,11 @@ async def update_teacher_profile(
             )
         
         # 講師プロフィールを取得または作成
-        teacher_profile = db.query(TeacherProfile).filter(
-            TeacherProfile.id == teacher_id
-        ).first()
+        teacher_profile = await db.scalar(
+            select(TeacherProfile).where(
+                TeacherProfile.id == teacher_id
+            )
+        )
         
         if not teacher_profile:
             # プロフィールが存在しない場合は新規作成
@@ -237,8 +292,14 @@ async def update_teacher_profile(
             target_user.updated_at = func.now()
             teacher_profile.updated_at = func.now()
             
+            # 公開カタログのキャッシュを無効化（コミット時に全ワーカーへ通知）
+            await publish_invalidation(db)
+            if "name" in updated_fields:
+                # 名前は自動補全の候補・認証キャッシュのユーザー情報に含まれるため、どちらも無効化
+                await publish_invalidation(db, autocomplete_cache.name)
+                await invalidate_cached_user(db, target_user)
             # データベースに保存
-            db.commit()
+            await db.commit()
             
             logger.info(f"講師プロフィール更新完了: 講師ID {teacher_id}, 更新フィールド: {updated_fields}")
         else:
@@ -247,10 +308,10 @@ async def update_teacher_profile(
         return TeacherProfileUpdateResponse()
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"講師プロフィール更新エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
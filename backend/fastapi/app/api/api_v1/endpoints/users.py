@@ -1,43 +1,60 @@
 """
 ユーザー関連 API エンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 import logging
 import traceback
-from sqlalchemy import func
+import unicodedata
+from sqlalchemy import select, func, literal, union_all
+from typing import Optional
 
 from app.schemas.user import (
     UserCreate, UserRegisterResponse, UserLogin, UserLoginResponse, 
-    UserOut, generate_random_username, UserRoleUpdate, UserRoleUpdateResponse,
+    TokenRefreshRequest, TokenRefreshResponse, LogoutResponse, UserOut, generate_random_username, UserRoleUpdate, UserRoleUpdateResponse,
     PasswordChange, PasswordChangeResponse, UserDeleteResponse, UserUpdate, UserProfileUpdateResponse
 )
-from app.utils.jwt import create_access_token, authenticate_user, get_current_user, get_current_admin
+from app.utils.jwt import (
+    create_access_token, authenticate_user, get_current_user, get_current_admin,
+    get_cached_user, get_token_user, invalidate_cached_user, revoke_user_tokens
+)
+from app.utils.sessions import create_session, revoke_session, rotate_session
 from app.models.user import User
-from app.core.security import get_password_hash, verify_password
-from app.db.database import get_db
+from app.core.cache import autocomplete_cache
+from app.core.security import check_password, hash_password
+from app.core.server_timing import TimedRoute
+from app.db.database import get_async_db
+from app.db.listener import publish_invalidation
 from app.models.teacher import TeacherProfile
+from app.utils.pagination import KeysetPage, MAX_PAGE_LIMIT
+from app.utils.search import prefix_key, text_startswith
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+# 自動補全の候補件数（既定値と上限）
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/register", response_model=UserRegisterResponse)
 async def register_user(
     user_data: UserCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ユーザー登録 API"""
     logger.info(f"ユーザー登録リクエスト: {user_data.email}")
     
     try:
         # メールアドレスが既に存在するかチェック
-        existing_user = db.query(User).filter(
-            User.email == user_data.email,
-            User.is_deleted == False
-        ).first()
+        existing_user = await db.scalar(
+            select(User).where(
+                User.email == user_data.email,
+                User.is_deleted == False
+            )
+        )
         
         if existing_user:
             raise HTTPException(
@@ -46,7 +63,7 @@ async def register_user(
             )
         
         # 新しいユーザーを作成
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await hash_password(user_data.password)
         generated_name = generate_random_username()
         db_user = User(
             name=generated_name,
@@ -57,22 +74,27 @@ async def register_user(
         
         # データベースに保存
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        # 自動補全のキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db, autocomplete_cache.name)
+        await db.commit()
+        await db.refresh(db_user)
         
         logger.info(f"ユーザー {user_data.email} の登録が完了しました")
         
         return UserRegisterResponse()
         
+    except HTTPException:
+        await db.rollback()
+        raise
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         logger.error(f"データベース整合性エラー: {user_data.email}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="データベースエラーが発生しました"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"ユーザー登録エラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -83,14 +105,14 @@ async def register_user(
 @router.post("/login", response_model=UserLoginResponse)
 async def login_user(
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ユーザーログイン API"""
     logger.info(f"ユーザーログインリクエスト: {login_data.email}")
     
     try:
         # ユーザー認証
-        user = authenticate_user(login_data.email, login_data.password, db)
+        user = await authenticate_user(login_data.email, login_data.password, db)
         
         if not user:
             raise HTTPException(
@@ -102,21 +124,28 @@ async def login_user(
         access_token = create_access_token(
             subject=user.id,
             email=user.email,
-            role=user.role
+            role=user.role,
+            token_version=user.token_version
         )
         
+        # リフレッシュトークンを発行（以降の再発行ではパスワードの検証を行わない）
+        refresh_token = create_session(db, user)
+        await db.commit()
+        
         logger.info(f"ユーザー {login_data.email} のログインが完了しました")
         
         return UserLoginResponse(
             id=user.id,
             name=user.name,
             role=user.role,
-            token=access_token
+            token=access_token,
+            refresh_token=refresh_token
         )
         
     except HTTPException:
         raise
     except Exception as e:
+        await db.rollback()
         logger.error(f"ユーザーログインエラー: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -124,17 +153,126 @@ async def login_user(
         )
 
 
+@router.post("/refresh", response_model=TokenRefreshResponse)
+async def refresh_access_token(
+    refresh_data: TokenRefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    アクセストークン再発行API
+    
+    リフレッシュトークンを使用済みにして、新しいアクセストークンとリフレッシュトークンを返す。
+    パスワードの検証は行わず、トークンハッシュの一意インデックスによる検索のみで判定する
+    
+    Args:
+        refresh_data: リフレッシュトークン
+        db: データベースセッション
+    
+    Returns:
+        TokenRefreshResponse: 新しいアクセストークンとリフレッシュトークン
+    
+    Raises:
+        HTTPException: リフレッシュトークンが無効・期限切れ・使用済み、サーバーエラー時
+    """
+    logger.info("アクセストークン再発行リクエスト")
+    
+    try:
+        session = await rotate_session(db, refresh_data.refresh_token)
+        user = await get_cached_user(db, str(session.user_id)) if session is not None else None
+        
+        if user is None:
+            # 再利用検知による失効を確定してから拒否する
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="リフレッシュトークンが無効です。再度ログインしてください",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # 同じ系列で新しいリフレッシュトークンを発行
+        refresh_token = create_session(db, user, session.family_id)
+        await db.commit()
+        
+        return TokenRefreshResponse(
+            token=create_access_token(
+                subject=user.id,
+                email=user.email,
+                role=user.role,
+                token_version=user.token_version
+            ),
+            refresh_token=refresh_token
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"アクセストークン再発行エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
+@router.post("/logout", response_model=LogoutResponse)
+async def logout_user(
+    refresh_data: TokenRefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    ログアウトAPI
+    
+    リフレッシュトークンの系列（同じログインから発行されたトークン）をすべて失効させる。
+    発行済みのアクセストークンは有効期限まで使用できるため、クライアント側でも破棄すること
+    
+    Args:
+        refresh_data: リフレッシュトークン
+        db: データベースセッション
+    
+    Returns:
+        LogoutResponse: ログアウト結果
+    
+    Raises:
+        HTTPException: サーバーエラー時
+    """
+    logger.info("ログアウトリクエスト")
+    
+    try:
+        await revoke_session(db, refresh_data.refresh_token)
+        await db.commit()
+        
+        return LogoutResponse()
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"ログアウトエラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
+
+
 
 
 @router.get("/", response_model=list[UserOut])
 async def get_all_users(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの件数（指定時はカーソル方式のページネーション）"),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     全ユーザー情報取得API（管理者のみ）
     
     Args:
+        response: レスポンス（次ページのカーソルを X-Next-Cursor ヘッダーに設定）
+        limit: 1ページの件数（未指定かつ cursor 未指定の場合は全件）
+        cursor: 次ページ取得用カーソル
         current_user: 現在のユーザー（管理者権限が必要）
         db: データベースセッション
     
@@ -146,13 +284,23 @@ async def get_all_users(
     """
     logger.info(f"全ユーザー情報取得リクエスト by {current_user.email}")
     
+    page = KeysetPage([(User.id, False)], limit, cursor)
+    
     try:
         # 管理者権限チェック（get_current_admin依存性で既にチェック済み）
         
         # 削除されていないユーザーを全て取得
-        users = db.query(User).filter(
-            User.is_deleted == False
-        ).all()
+        users = page.finish(
+            (await db.scalars(
+                page.apply(
+                    select(User).where(
+                        User.is_deleted == False
+                    )
+                )
+            )).all(),
+            lambda user: (user.id,),
+            response
+        )
         
         logger.info(f"全ユーザー情報取得成功: {len(users)}件")
         
@@ -169,6 +317,93 @@ async def get_all_users(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="サーバーエラーが発生しました"
         )
+
+
+@router.get("/autocomplete", response_model=list[UserOut])
+async def autocomplete_users(
+    q: str = Query(..., max_length=255, description="名前またはメールアドレスの先頭部分"),
+    role: Optional[str] = Query(None, pattern="^(student|teacher|admin)$", description="役割で絞り込み（講師の選択には teacher）"),
+    limit: int = Query(AUTOCOMPLETE_DEFAULT_LIMIT, ge=1, le=AUTOCOMPLETE_MAX_LIMIT, description="候補の件数"),
+    current_user: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    ユーザー自動補全API（管理者のみ）
+    
+    名前またはメールアドレスが入力文字列で始まるユーザーを最大 limit 件返す
+    （名前の一致を先に、それぞれ正規化した名前・メールアドレスの順）。
+    講師の割り当てやユーザー管理画面の入力候補に使用し、一覧全件の取得を不要にする。
+    名前・メールアドレスの前方一致はそれぞれ式インデックスの範囲検索で、候補は入力文字列ごとにキャッシュする
+    
+    Args:
+        q: 名前またはメールアドレスの先頭部分（NFKC 正規化し、大文字・小文字を区別しない）
+        role: 役割で絞り込み
+        limit: 候補の件数
+        current_user: 現在のユーザー（管理者権限が必要）
+        db: データベースセッション
+    
+    Returns:
+        list[UserOut]: 候補ユーザーのリスト
+    
+    Raises:
+        HTTPException: 入力文字列が空の場合、管理者権限がない場合
+    """
+    logger.info(f"ユーザー自動補全リクエスト by {current_user.email}")
+    
+    prefix = unicodedata.normalize("NFKC", q).strip()
+    if not prefix:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="検索キーワードを入力してください"
+        )
+    
+    # キャッシュ済みの場合はそのまま返却（ユーザーの追加・名前や役割の変更・削除時に全ワーカーで無効化される）
+    cache_key = (prefix, role, limit)
+    cached = autocomplete_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    cache_generation = autocomplete_cache.generation
+    
+    try:
+        def candidates(column, rank: int):
+            # 列ごとに式インデックスの順で先頭 limit 件だけ読む
+            stmt = select(
+                User.id, User.name, User.email, User.role,
+                literal(rank).label("rank"), prefix_key(column).label("sort_key")
+            ).where(
+                User.is_deleted == False,
+                text_startswith(column, prefix)
+            )
+            if role is not None:
+                stmt = stmt.where(User.role == role)
+            return stmt.order_by(prefix_key(column), User.id).limit(limit)
+        
+        matches = union_all(candidates(User.name, 0), candidates(User.email, 1)).subquery()
+        rows = (await db.execute(
+            select(matches).order_by(matches.c.rank, matches.c.sort_key, matches.c.id)
+        )).all()
+        
+        # 名前とメールアドレスの両方に一致したユーザーは 1 件にまとめる
+        users = {}
+        for row in rows:
+            if row.id not in users:
+                users[row.id] = UserOut(id=row.id, name=row.name, email=row.email, role=row.role)
+        user_list = list(users.values())[:limit]
+        
+        autocomplete_cache.set(cache_key, user_list, cache_generation)
+        
+        return user_list
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"ユーザー自動補全エラー: {str(e)}")
+        logger.error(f"エラーの詳細: {type(e).__name__}")
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバーエラーが発生しました"
+        )
     
 
 @router.patch("/{user_id}/role", response_model=UserRoleUpdateResponse)
@@ -176,7 +411,7 @@ async def update_user_role(
     user_id: int,
     role_data: UserRoleUpdate,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ユーザー役割更新API（管理者のみ）
@@ -197,10 +432,12 @@ async def update_user_role(
     
     try:
         # 対象ユーザーが存在するかチェック
-        target_user = db.query(User).filter(
-            User.id == user_id,
-            User.is_deleted == False
-        ).first()
+        target_user = await db.scalar(
+            select(User).where(
+                User.id == user_id,
+                User.is_deleted == False
+            )
+        )
         
         if not target_user:
             raise HTTPException(
@@ -226,14 +463,19 @@ async def update_user_role(
         target_user.role = role_data.role
         target_user.updated_at = func.now()
         
+        # 変更前の役割で発行されたトークンを無効化
+        await revoke_user_tokens(db, target_user)
+        
         teacher_profile_created = False
         
         # 役割がteacherに変更された場合、teacher_profilesテーブルにレコードを作成
         if role_data.role == "teacher":
             # 既存のteacher_profileが存在するかチェック
-            existing_profile = db.query(TeacherProfile).filter(
-                TeacherProfile.id == user_id
-            ).first()
+            existing_profile = await db.scalar(
+                select(TeacherProfile).where(
+                    TeacherProfile.id == user_id
+                )
+            )
             
             if not existing_profile:
                 # 新しいteacher_profileを作成
@@ -247,8 +489,11 @@ async def update_user_role(
                 teacher_profile_created = True
                 logger.info(f"教師プロフィールを作成しました: ユーザーID {user_id}")
         
+        # 公開カタログ・自動補全のキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await publish_invalidation(db, autocomplete_cache.name)
         # データベースに保存
-        db.commit()
+        await db.commit()
         
         logger.info(f"ユーザー役割更新完了: ユーザーID {user_id} {old_role} -> {role_data.role}")
         
@@ -259,10 +504,10 @@ async def update_user_role(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"ユーザー役割更新エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -276,7 +521,7 @@ async def update_user_role(
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     パスワード変更API（本人のみ）
@@ -296,36 +541,48 @@ async def change_password(
     
     try:
         # 現在のパスワードが正しいかチェック
-        if not verify_password(password_data.current_password, current_user.hashed_password):
+        if not await check_password(password_data.current_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="現在のパスワードが正しくありません"
             )
         
         # 新しいパスワードが現在のパスワードと同じでないかチェック
-        if verify_password(password_data.new_password, current_user.hashed_password):
+        if await check_password(password_data.new_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="新しいパスワードは現在のパスワードと異なる必要があります"
             )
         
         # 新しいパスワードをハッシュ化して更新
-        new_hashed_password = get_password_hash(password_data.new_password)
+        new_hashed_password = await hash_password(password_data.new_password)
         current_user.hashed_password = new_hashed_password
         current_user.updated_at = func.now()
         
+        # 変更前に発行されたトークン・セッションを無効化し、本人には新しいトークンを返す
+        await revoke_user_tokens(db, current_user)
+        refresh_token = create_session(db, current_user)
+        
         # データベースに保存
-        db.commit()
+        await db.commit()
         
         logger.info(f"パスワード変更完了: ユーザー {current_user.email}")
         
-        return PasswordChangeResponse()
+        return PasswordChangeResponse(
+            token=create_access_token(
+                subject=current_user.id,
+                email=current_user.email,
+                role=current_user.role,
+                token_version=current_user.token_version
+            ),
+            refresh_token=refresh_token
+        )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"パスワード変更エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -339,7 +596,7 @@ async def change_password(
 async def delete_user(
     user_id: int,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ユーザー削除API（管理者のみ）
@@ -359,10 +616,12 @@ async def delete_user(
     
     try:
         # 対象ユーザーが存在するかチェック
-        target_user = db.query(User).filter(
-            User.id == user_id,
-            User.is_deleted == False
-        ).first()
+        target_user = await db.scalar(
+            select(User).where(
+                User.id == user_id,
+                User.is_deleted == False
+            )
+        )
         
         if not target_user:
             raise HTTPException(
@@ -389,8 +648,14 @@ async def delete_user(
         target_user.deleted_at = func.now()
         target_user.updated_at = func.now()
         
+        # 削除したユーザーのトークンを無効化
+        await revoke_user_tokens(db, target_user)
+        
+        # 公開カタログ・自動補全のキャッシュを無効化（コミット時に全ワーカーへ通知）
+        await publish_invalidation(db)
+        await publish_invalidation(db, autocomplete_cache.name)
         # データベースに保存
-        db.commit()
+        await db.commit()
         
         logger.info(f"ユーザー削除完了: ユーザーID {user_id} ({target_user.email})")
         
@@ -399,10 +664,10 @@ async def delete_user(
         )
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"ユーザー削除エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -415,7 +680,7 @@ async def delete_user(
 @router.get("/check-auth", response_model=dict)
 async def check_auth_status(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     检查用户登录状态API
@@ -453,16 +718,18 @@ async def check_auth_status(
             logger.info("Token验证失败：token已过期")
             return {"is_authenticated": False}
         
-        # 检查用户是否仍然存在于数据库中且未被删除
-        user_exists = db.query(User).filter(
-            User.id == int(token_payload.sub),
-            User.is_deleted == False
-        ).first()
+        # 检查用户是否仍然存在于数据库中且未被删除（优先使用认证缓存）
+        user = await get_token_user(db, token_payload)
         
-        if not user_exists:
+        if not user:
             logger.warning(f"用户不存在或已被删除: {token_payload.email}")
             return {"is_authenticated": False}
         
+        # 检查token是否已被撤销（删除・角色变更・密码变更后）
+        if user.token_version != token_payload.ver:
+            logger.info(f"Token验证失败：token已被撤销: {token_payload.email}")
+            return {"is_authenticated": False}
+        
         # 返回登录状态
         result = {
             "is_authenticated": True
@@ -483,7 +750,7 @@ async def check_auth_status(
 async def update_user_profile(
     profile_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     用户资料更新API（本人のみ）
@@ -515,8 +782,14 @@ async def update_user_profile(
         if updated_fields:
             current_user.updated_at = func.now()
             
+            # 講師の名前は公開カタログに含まれるため、キャッシュを無効化（コミット時に全ワーカーへ通知）
+            if current_user.role == "teacher":
+                await publish_invalidation(db)
+            # 名前は自動補全の候補に含まれるため、自動補全のキャッシュも無効化
+            await publish_invalidation(db, autocomplete_cache.name)
+            await invalidate_cached_user(db, current_user)
             # データベースに保存
-            db.commit()
+            await db.commit()
             
             logger.info(f"ユーザー资料更新完了: ユーザーID {current_user.id}, 更新フィールド: {updated_fields}")
         else:
@@ -527,7 +800,7 @@ async def update_user_profile(
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"ユーザー资料更新エラー: {str(e)}")
         logger.error(f"エラーの詳細: {type(e).__name__}")
         logger.error(f"スタックトレース: {traceback.format_exc()}")
@@ -541,7 +814,7 @@ async def update_user_profile(
 async def get_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ユーザー情報取得API（ID指定、本人と管理者のみ）"""
     logger.info(f"ユーザー情報取得リクエスト: ユーザーID {user_id} by {current_user.email}")
@@ -555,10 +828,12 @@ async def get_user_by_id(
             )
         
         # ユーザー情報を取得
-        user = db.query(User).filter(
-            User.id == user_id,
-            User.is_deleted == False
-        ).first()
+        user = await db.scalar(
+            select(User).where(
+                User.id == user_id,
+                User.is_deleted == False
+            )
+        )
         
         if not user:
             raise HTTPException(
@@ -0,0 +1,131 @@
+"""
+进程内缓存（TTL + LRU）
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    带过期时间与容量上限的进程内缓存
+
+    - 条目超过 ttl 秒后视为失效
+    - 条目数超过 max_entries 时淘汰最久未使用的条目
+    - clear() / delete() 会递增 generation，写入时若 generation 已变化则丢弃，
+      防止失效前发起的查询把旧数据写回缓存
+    - online 为 False（失效通知的监听未连接）时不读写缓存，避免错过失效通知后返回旧数据；
+      不依赖失效通知的缓存（requires_listener=False）始终在线
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int,
+        enabled: bool = True,
+        requires_listener: bool = True
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled and ttl > 0 and max_entries > 0
+        self.online = not requires_listener
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得缓存值（不存在或已过期时返回 None）"""
+        if not (self.enabled and self.online):
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """写入缓存值（generation 与当前值不一致时不写入；ttl 可缩短该条目的有效秒数）"""
+        if not (self.enabled and self.online) or (generation is not None and generation != self.generation):
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl)), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """删除指定条目"""
+        self._entries.pop(key, None)
+        self.generation += 1
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        """清空全部条目"""
+        self._entries.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> Dict:
+        """返回统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            "online": self.online,
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# 公开目录（讲座一览・轮播・讲师一览・讲座详情）用缓存
+catalogue_cache = TTLCache(
+    "catalogue",
+    ttl=settings.CACHE_TTL_SECONDS,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    enabled=settings.CACHE_ENABLED,
+)
+
+# 已认证用户缓存（键为令牌的 sub，值为与会话分离的 User 副本）
+auth_user_cache = TTLCache(
+    "auth_users",
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    enabled=settings.CACHE_ENABLED,
+)
+
+# 用户自动补全缓存（键为输入前缀・角色・件数，值为候选用户列表）
+autocomplete_cache = TTLCache(
+    "user_autocomplete",
+    ttl=settings.AUTOCOMPLETE_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTOCOMPLETE_CACHE_MAX_ENTRIES,
+    enabled=settings.CACHE_ENABLED,
+)
+
+# 已验证的访问令牌缓存（键为令牌的 SHA-256，值为 TokenPayload；条目在令牌过期时失效）
+# 令牌内容不可变，无需失效通知
+token_cache = TTLCache(
+    "tokens",
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    requires_listener=False,
+)
+
+# 缓存名称 -> 缓存实例（失效通知的 payload 为「缓存名称」或「缓存名称:键」）
+CACHES: Dict[str, TTLCache] = {cache.name: cache for cache in (catalogue_cache, auth_user_cache, autocomplete_cache)}
@@ -22,7 +22,86 @@ class Settings:
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+    
+    # 数据库连接池配置
+    # WEB_CONCURRENCY: uvicorn 工作进程数（uvicorn --workers 的默认值也读取此变量）
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # 本服务所有工作进程合计可使用的最大数据库连接数
+    DB_MAX_CONNECTIONS: int = int(os.getenv("DB_MAX_CONNECTIONS", "30"))
+    # 每个工作进程的连接池大小与溢出连接数（0 或未设置时根据工作进程数自动计算）
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "0"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "-1"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # 获取连接的最长等待秒数
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 连接最长复用秒数
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    
+    @property
+    def DB_CONNECTIONS_PER_WORKER(self) -> int:
+        return max(2, self.DB_MAX_CONNECTIONS // max(1, self.WEB_CONCURRENCY))
+    
+    @property
+    def DB_POOL_SIZE_EFFECTIVE(self) -> int:
+        if self.DB_POOL_SIZE > 0:
+            return self.DB_POOL_SIZE
+        # 自动计算：每个进程可用连接数的 2/3 作为常驻连接
+        return max(1, self.DB_CONNECTIONS_PER_WORKER * 2 // 3)
+    
+    @property
+    def DB_MAX_OVERFLOW_EFFECTIVE(self) -> int:
+        if self.DB_MAX_OVERFLOW >= 0:
+            return self.DB_MAX_OVERFLOW
+        # 自动计算：剩余部分作为突发时的溢出连接
+        return max(0, self.DB_CONNECTIONS_PER_WORKER - self.DB_POOL_SIZE_EFFECTIVE)
+
+    # 进程内缓存配置（公开目录类 API 使用，通过 PostgreSQL LISTEN/NOTIFY 跨进程失效）
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_LISTEN_RECONNECT_SECONDS: float = float(os.getenv("CACHE_LISTEN_RECONNECT_SECONDS", "5"))
+    # 已认证用户缓存（get_current_user 使用，用户的令牌版本变更时立即失效）
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    # 已验证访问令牌的缓存条目数（省略同一令牌的重复签名验证与解析；0 为禁用）
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    # 用户自动补全缓存（按输入前缀保存候选，用户新增・改名・变更角色・删除时全进程失效）
+    AUTOCOMPLETE_CACHE_TTL_SECONDS: float = float(os.getenv("AUTOCOMPLETE_CACHE_TTL_SECONDS", "30"))
+    AUTOCOMPLETE_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTOCOMPLETE_CACHE_MAX_ENTRIES", "512"))
     
+    # HTTP 缓存配置（ETag 由 table_versions 表的变更计数生成）
+    HTTP_CACHE_SHARED_MAX_AGE: int = int(os.getenv("HTTP_CACHE_SHARED_MAX_AGE", "5"))  # nginx 等共享缓存的保持秒数
+    TABLE_VERSION_COMPACT_INTERVAL: float = float(os.getenv("TABLE_VERSION_COMPACT_INTERVAL", "600"))
+
+    # 重复日程模板设置（定期将模板展开为从今天起 SCHEDULE_TEMPLATE_HORIZON_DAYS 天内的可预约时间段）
+    SCHEDULE_TEMPLATE_HORIZON_DAYS: int = int(os.getenv("SCHEDULE_TEMPLATE_HORIZON_DAYS", "90"))
+    SCHEDULE_TEMPLATE_MATERIALIZE_INTERVAL: float = float(os.getenv("SCHEDULE_TEMPLATE_MATERIALIZE_INTERVAL", "3600"))
+
+    # 预约统计设置（物化视图 lecture_booking_stats 的刷新间隔秒数）
+    BOOKING_STATS_REFRESH_INTERVAL: float = float(os.getenv("BOOKING_STATS_REFRESH_INTERVAL", "60"))
+    # 讲座日次统计：将触发器追加的差分行（lecture_daily_stat_deltas）合并到 lecture_daily_stats 的间隔秒数与每批行数
+    DAILY_STATS_FOLD_INTERVAL: float = float(os.getenv("DAILY_STATS_FOLD_INTERVAL", "30"))
+    DAILY_STATS_FOLD_BATCH_SIZE: int = int(os.getenv("DAILY_STATS_FOLD_BATCH_SIZE", "10000"))
+
+    # 事件循环阻塞监控（默认关闭；开启后每个进程运行一个心跳协程与一个看门狗线程）
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "false").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS: float = max(10.0, float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100")))  # 心跳间隔
+    LOOP_MONITOR_THRESHOLD_MS: float = max(10.0, float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "200")))  # 视为阻塞的延迟
+    LOOP_MONITOR_STACK_DEPTH: int = int(os.getenv("LOOP_MONITOR_STACK_DEPTH", "20"))  # 采样调用栈的帧数
+    LOOP_MONITOR_MAX_EVENTS: int = int(os.getenv("LOOP_MONITOR_MAX_EVENTS", "50"))  # 保留的最近阻塞事件数
+
+    # Prometheus 指标（/metrics；多进程汇总需设置环境变量 PROMETHEUS_MULTIPROC_DIR）
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")  # 设置时 /metrics 要求 Authorization: Bearer <令牌>
+    METRICS_PROCESS_STATS_INTERVAL: float = float(os.getenv("METRICS_PROCESS_STATS_INTERVAL", "15"))  # 多进程时各进程写入连接池・缓存统计的间隔秒数
+
+    # Server-Timing 响应头（auth / sql / serialize / total 的耗时，浏览器开发者工具中可查看）
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    # 每个请求的 SQL 语句数上限（超过时该请求出错；开发・测试环境用于发现 N+1 查询，0 为不检查）
+    SQL_STATEMENT_BUDGET: int = max(0, int(os.getenv("SQL_STATEMENT_BUDGET", "0")))
+
     # CORS 设置
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:3000",  # React 默认端口
@@ -37,7 +116,21 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+    # 刷新令牌（登录会话）设置
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+    # 已交换的刷新令牌在此秒数内再次使用时仅拒绝（多个标签页同时刷新），超过则视为盗用并失效整个会话
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = int(os.getenv("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "10"))
+    # 过期会话的清理间隔秒数与每批删除行数
+    SESSION_SWEEP_INTERVAL: float = float(os.getenv("SESSION_SWEEP_INTERVAL", "3600"))
+    SESSION_SWEEP_BATCH_SIZE: int = int(os.getenv("SESSION_SWEEP_BATCH_SIZE", "1000"))
+
+    # 密码哈希设置
+    # BCRYPT_ROUNDS: bcrypt 的 cost（变更后，旧 cost 的哈希会在用户登录时自动重新哈希）
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # 每个工作进程的哈希线程数与排队上限（超过上限的请求返回 503）
+    PASSWORD_HASH_WORKERS: int = max(1, int(os.getenv("PASSWORD_HASH_WORKERS", "2")))
+    PASSWORD_HASH_MAX_QUEUE: int = max(0, int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32")))
+
     # 其他设置
     FIRST_SUPERUSER: str = os.getenv("FIRST_SUPERUSER", "admin@example.com")
     FIRST_SUPERUSER_PASSWORD: str = os.getenv("FIRST_SUPERUSER_PASSWORD", "admin123")
@@ -0,0 +1,213 @@
+"""
+事件循环阻塞监控（可选）
+
+- 心跳协程每隔 LOOP_MONITOR_INTERVAL_MS 休眠一次，醒来时比预定时刻晚的时间即为事件循环延迟
+- 看门狗线程定期检查心跳，事件循环超过 LOOP_MONITOR_THRESHOLD_MS 未恢复时，
+  采样事件循环线程的调用栈以及当前执行中的任务所对应的请求（方法・路由）
+- 心跳恢复后将阻塞事件写入日志（JSON）并保留最近的事件，供管理员诊断 API 查询
+
+未启用（LOOP_MONITOR_ENABLED=false）时不启动心跳与线程，也不注册中间件
+"""
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 事件循环延迟直方图的桶上限（毫秒）
+LAG_BUCKETS_MS: List[float] = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class LoopMonitor:
+    """事件循环延迟与阻塞事件的统计（进程内累计值）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples = 0
+        self.lag_total_ms = 0.0
+        self.lag_max_ms = 0.0
+        self.lag_buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.blocked = 0
+        self.events: deque = deque(maxlen=settings.LOOP_MONITOR_MAX_EVENTS)
+        self.routes: Dict[str, Dict] = {}
+        # 执行中的请求（任务 -> {"method", "path", "scope"}），任务结束后自动移除
+        self._requests: "weakref.WeakKeyDictionary[asyncio.Task, Dict]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        # 当前心跳的开始时刻（time.monotonic()）与看门狗对该心跳的采样结果
+        self._beat_started = 0.0
+        self._capture: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat_started = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor-heartbeat")
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    def track_request(self, scope: Dict) -> None:
+        """将请求与当前任务关联（由中间件在请求开始时调用）"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = scope
+
+    def untrack_request(self) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests.pop(task, None)
+
+    async def _heartbeat(self) -> None:
+        interval = settings.LOOP_MONITOR_INTERVAL_MS / 1000
+        while True:
+            started = time.monotonic()
+            with self._lock:
+                self._beat_started = started
+                self._capture = None
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.monotonic() - started - interval) * 1000)
+            self._record(lag_ms)
+
+    def _watchdog(self) -> None:
+        """在独立线程中检测事件循环停止，并采样停止期间的调用栈与请求"""
+        interval = settings.LOOP_MONITOR_INTERVAL_MS / 1000
+        threshold = settings.LOOP_MONITOR_THRESHOLD_MS / 1000
+        # 检查间隔不超过阈值的一半，保证持续 1.5 倍阈值以上的阻塞一定能采样到
+        poll = min(interval, threshold / 2)
+        while not self._stopping.wait(poll):
+            with self._lock:
+                started = self._beat_started
+                if self._capture is not None or time.monotonic() - started - interval < threshold:
+                    continue
+            capture = self._sample()
+            with self._lock:
+                if self._beat_started == started:
+                    self._capture = capture
+
+    def _sample(self) -> Dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=settings.LOOP_MONITOR_STACK_DEPTH) if frame else []
+        task = asyncio.current_task(self._loop)
+        scope = self._requests.get(task) if task is not None else None
+        capture = {
+            "task": task.get_name() if task is not None else None,
+            "method": None,
+            "route": None,
+            "path": None,
+            "stack": [line.rstrip() for line in stack],
+        }
+        if scope is not None:
+            route = scope.get("route")
+            capture.update(
+                method=scope.get("method"),
+                route=getattr(route, "path", None),
+                path=scope.get("path"),
+            )
+        return capture
+
+    def _record(self, lag_ms: float) -> None:
+        with self._lock:
+            self.samples += 1
+            self.lag_total_ms += lag_ms
+            self.lag_max_ms = max(self.lag_max_ms, lag_ms)
+            self.lag_buckets[bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+            if lag_ms < settings.LOOP_MONITOR_THRESHOLD_MS:
+                return
+            self.blocked += 1
+            capture = self._capture or {"task": None, "method": None, "route": None, "path": None, "stack": []}
+            event = {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "lag_ms": round(lag_ms, 3),
+                **capture,
+            }
+            self.events.append(event)
+            key = f"{capture['method']} {capture['route'] or capture['path']}" if capture["method"] else "(不明)"
+            route_stats = self.routes.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            route_stats["count"] += 1
+            route_stats["total_ms"] += lag_ms
+            route_stats["max_ms"] = max(route_stats["max_ms"], lag_ms)
+        logger.warning(f"イベントループの停止を検出しました: {json.dumps(event, ensure_ascii=False)}")
+
+    def snapshot(self) -> Dict:
+        """返回统计信息快照（阻塞事件按新到旧排列）"""
+        with self._lock:
+            buckets = {}
+            cumulative = 0
+            for upper, count in zip(LAG_BUCKETS_MS + [float("inf")], self.lag_buckets):
+                cumulative += count
+                buckets["+Inf" if upper == float("inf") else f"{upper:g}"] = cumulative
+            return {
+                "running": self.running,
+                "samples": self.samples,
+                "blocked": self.blocked,
+                "lag_ms": {
+                    "max": round(self.lag_max_ms, 3),
+                    "avg": round(self.lag_total_ms / self.samples, 3) if self.samples else 0.0,
+                    "buckets": buckets,
+                },
+                "routes": [
+                    {
+                        "route": key,
+                        "count": stats["count"],
+                        "max_ms": round(stats["max_ms"], 3),
+                        "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                    }
+                    for key, stats in sorted(self.routes.items(), key=lambda item: -item[1]["total_ms"])
+                ],
+                "events": list(reversed(self.events)),
+            }
+
+
+class LoopMonitorMiddleware:
+    """将 HTTP 请求与执行它的任务关联的 ASGI 中间件（仅在监控启用时注册）"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        loop_monitor.track_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop_monitor.untrack_request()
+
+
+# 进程级实例（应用 lifespan 中启动/停止）
+loop_monitor = LoopMonitor()
@@ -0,0 +1,164 @@
+"""
+Prometheus 指标
+
+- 按路由（路径模板）・方法・状态码统计请求数与响应时间直方图，按方法统计处理中的请求数
+- 按请求统计 SQL 语句数与耗时（app.db.query_stats）
+- 连接池与进程内缓存的统计（各进程的累计值）
+
+设置环境变量 PROMETHEUS_MULTIPROC_DIR 时使用 prometheus_client 的多进程模式：
+各工作进程把指标写入该目录下的文件，/metrics 汇总所有进程的值后返回（目录须在启动前清空）。
+连接池・缓存的统计保存在各进程内存中，由各进程定期写入 livesum 模式的 Gauge（只汇总存活进程）。
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+from app.core.cache import CACHES, token_cache
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import async_engine
+from app.db.pool import get_pool_status
+from app.db.query_stats import start_query_stats
+
+# 多进程模式（prometheus_client 在导入时读取同一环境变量）
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# /metrics 的 Content-Type
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# 响应时间・SQL 耗时直方图的桶上限（秒）
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 每个请求的 SQL 语句数直方图的桶上限
+SQL_STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# 作为标签使用的 HTTP 方法（其他方法归入 OTHER，防止标签值无限增加）
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+# 未匹配到路由的请求（404、CORS 预检等）的路由标签
+UNMATCHED_ROUTE = "(unmatched)"
+
+http_requests = Counter(
+    "http_requests_total", "HTTP 请求数", ["method", "route", "status"]
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP 请求的处理时间", ["method", "route", "status"],
+    buckets=DURATION_BUCKETS
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "处理中的 HTTP 请求数", ["method"], multiprocess_mode="livesum"
+)
+http_request_sql_statements = Histogram(
+    "http_request_sql_statements", "每个 HTTP 请求执行的 SQL 语句数", ["method", "route"],
+    buckets=SQL_STATEMENT_BUCKETS
+)
+http_request_sql_duration = Histogram(
+    "http_request_sql_duration_seconds", "每个 HTTP 请求的 SQL 执行时间合计", ["method", "route"],
+    buckets=DURATION_BUCKETS
+)
+
+db_pool_connections = Gauge(
+    "db_pool_connections", "连接池的连接数（state: checked_out / checked_in / overflow）", ["state"],
+    multiprocess_mode="livesum"
+)
+db_pool_checkouts = Gauge("db_pool_checkouts", "连接获取次数（累计）", multiprocess_mode="livesum")
+db_pool_timeouts = Gauge("db_pool_timeouts", "连接获取超时次数（累计）", multiprocess_mode="livesum")
+db_pool_wait_seconds = Gauge("db_pool_wait_seconds", "连接获取等待时间合计（累计）", multiprocess_mode="livesum")
+
+cache_entries = Gauge("cache_entries", "缓存条目数", ["cache"], multiprocess_mode="livesum")
+cache_hits = Gauge("cache_hits", "缓存命中次数（累计）", ["cache"], multiprocess_mode="livesum")
+cache_misses = Gauge("cache_misses", "缓存未命中次数（累计）", ["cache"], multiprocess_mode="livesum")
+cache_evictions = Gauge("cache_evictions", "容量上限导致的淘汰次数（累计）", ["cache"], multiprocess_mode="livesum")
+cache_invalidations = Gauge("cache_invalidations", "失效次数（累计）", ["cache"], multiprocess_mode="livesum")
+cache_online = Gauge("cache_online", "缓存是否在线（所有进程中的最小值）", ["cache"], multiprocess_mode="livemin")
+
+
+def update_process_metrics() -> None:
+    """将当前进程的连接池・缓存统计写入 Gauge"""
+    pool = get_pool_status(async_engine.sync_engine.pool)
+    db_pool_connections.labels("checked_out").set(pool["checked_out"])
+    db_pool_connections.labels("checked_in").set(pool["checked_in"])
+    db_pool_connections.labels("overflow").set(pool["overflow"])
+    db_pool_checkouts.set(pool["checkouts"])
+    db_pool_timeouts.set(pool["timeouts"])
+    db_pool_wait_seconds.set(pool["wait_time_ms"]["total"] / 1000)
+
+    for cache in (*CACHES.values(), token_cache):
+        stats = cache.stats()
+        cache_entries.labels(cache.name).set(stats["entries"])
+        cache_hits.labels(cache.name).set(stats["hits"])
+        cache_misses.labels(cache.name).set(stats["misses"])
+        cache_evictions.labels(cache.name).set(stats["evictions"])
+        cache_invalidations.labels(cache.name).set(stats["invalidations"])
+        cache_online.labels(cache.name).set(1 if stats["online"] else 0)
+
+
+def render_metrics() -> bytes:
+    """返回 Prometheus 文本格式的指标（多进程模式时为所有进程的汇总）"""
+    update_process_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+class MetricsMiddleware:
+    """记录请求指标并开始按请求的 SQL 统计的 ASGI 中间件"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        query_stats = start_query_stats()
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            # 路由标签使用路径模板（如 /api/v1/users/{user_id}），路由确定后由 Starlette 写入 scope
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            status = str(status_code)
+            http_requests.labels(method, route, status).inc()
+            http_request_duration.labels(method, route, status).observe(elapsed)
+            http_request_sql_statements.labels(method, route).observe(query_stats.count)
+            http_request_sql_duration.labels(method, route).observe(query_stats.duration_ms / 1000)
+
+
+async def _publish_process_metrics() -> None:
+    update_process_metrics()
+
+
+def _mark_process_dead() -> None:
+    # 删除本进程的 live* Gauge，使其不再计入汇总
+    multiprocess.mark_process_dead(os.getpid())
+
+
+# 多进程模式下定期写入本进程的连接池・缓存统计（/metrics 由任意一个进程响应）
+# 进程级实例（应用 lifespan 中启动/停止）
+process_metrics_publisher = PeriodicTask(
+    "process-metrics-publisher",
+    _publish_process_metrics,
+    settings.METRICS_PROCESS_STATS_INTERVAL,
+    error_message="メトリクスの更新エラー",
+    run_immediately=False,
+    enabled=MULTIPROCESS,
+    on_stop=_mark_process_dead if MULTIPROCESS else None
+)
@@ -0,0 +1,76 @@
+"""
+定期任务
+
+按固定间隔在事件循环中执行协程函数。执行中的异常只记录日志，不会终止任务；
+由应用 lifespan 启动/停止（停止时取消正在等待或执行中的任务）。
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """每隔 interval 秒执行一次 job 的后台任务（进程级实例，start/stop 可重复调用）"""
+
+    def __init__(
+        self,
+        name: str,
+        job: Callable[[], Awaitable[object]],
+        interval: float,
+        *,
+        error_message: str,
+        run_immediately: bool = True,
+        enabled: bool = True,
+        on_stop: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Args:
+            name: 任务名（asyncio.Task 的名称）
+            job: 每次执行的协程函数
+            interval: 执行间隔（秒）
+            error_message: job 出错时写入日志的消息（后接异常内容）
+            run_immediately: 启动后立即执行一次（False 时先等待 interval 秒）
+            enabled: False 时 start() 不启动任务
+            on_stop: stop() 时调用的清理处理
+        """
+        self.name = name
+        self._job = job
+        self._interval = interval
+        self._error_message = error_message
+        self._run_immediately = run_immediately
+        self._enabled = enabled
+        self._on_stop = on_stop
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def _run(self) -> None:
+        if not self._run_immediately:
+            await asyncio.sleep(self._interval)
+        while True:
+            try:
+                await self._job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self._error_message}: {str(e)}")
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None and self._enabled:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._on_stop is not None:
+            self._on_stop()
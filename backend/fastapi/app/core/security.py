@@ -1,17 +1,179 @@
 """
 安全相关工具函数
 """
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 # 密码加密上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt 的 cost 固定为 BCRYPT_ROUNDS，cost 不同的既有哈希会被 needs_update 判定为需要重新哈希
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# 哈希耗时直方图的桶上限（毫秒）
+HASH_TIME_BUCKETS_MS: List[float] = [50, 100, 200, 300, 500, 750, 1000, 2000, 5000]
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
+    """验证密码（同步，会阻塞调用线程；异步代码中请使用 check_password）"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """获取密码哈希值"""
+    """获取密码哈希值（同步，会阻塞调用线程；异步代码中请使用 hash_password）"""
     return pwd_context.hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """验证密码，哈希的 cost 与当前设置不同时一并返回新的哈希值（同步）"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class HashingStats:
+    """密码哈希统计信息（进程内累计值）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.in_flight_max = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.wait_time_total_ms = 0.0
+        self.hash_time_total_ms = 0.0
+        self.hash_time_max_ms = 0.0
+        self.hash_time_buckets = [0] * (len(HASH_TIME_BUCKETS_MS) + 1)
+
+    def try_acquire(self, limit: int) -> bool:
+        """占用一个执行槽位（执行中 + 排队中的数量达到上限时返回 False）"""
+        with self._lock:
+            if self.in_flight >= limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.in_flight_max = max(self.in_flight_max, self.in_flight)
+            return True
+
+    def release(self, wait_ms: float, hash_ms: Optional[float]) -> None:
+        """释放执行槽位并记录排队时间与哈希耗时（hash_ms 为 None 表示排队中被取消、未执行）"""
+        with self._lock:
+            self.in_flight -= 1
+            if hash_ms is None:
+                self.cancelled += 1
+                return
+            self.completed += 1
+            self.wait_time_total_ms += wait_ms
+            self.hash_time_total_ms += hash_ms
+            self.hash_time_max_ms = max(self.hash_time_max_ms, hash_ms)
+            self.hash_time_buckets[bisect_left(HASH_TIME_BUCKETS_MS, hash_ms)] += 1
+
+    def snapshot(self) -> Dict:
+        """返回统计信息快照"""
+        with self._lock:
+            buckets = {}
+            cumulative = 0
+            for upper, count in zip(HASH_TIME_BUCKETS_MS + [float("inf")], self.hash_time_buckets):
+                cumulative += count
+                buckets["+Inf" if upper == float("inf") else f"{upper:g}"] = cumulative
+            return {
+                "in_flight": self.in_flight,
+                "in_flight_max": self.in_flight_max,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "wait_time_ms": {
+                    "total": round(self.wait_time_total_ms, 3),
+                    "avg": round(self.wait_time_total_ms / self.completed, 3) if self.completed else 0.0,
+                },
+                "hash_time_ms": {
+                    "total": round(self.hash_time_total_ms, 3),
+                    "max": round(self.hash_time_max_ms, 3),
+                    "avg": round(self.hash_time_total_ms / self.completed, 3) if self.completed else 0.0,
+                    "buckets": buckets,
+                },
+            }
+
+
+# 进程级统计实例
+hashing_stats = HashingStats()
+
+# 密码哈希专用线程池
+# bcrypt 计算期间会释放 GIL，线程池即可并行执行且不阻塞事件循环
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+
+async def _run_hashing(func: Callable, *args):
+    """
+    在密码哈希线程池中执行
+
+    Raises:
+        HTTPException: 执行中与排队中的数量已达上限时（503）
+    """
+    if not hashing_stats.try_acquire(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ただいま混み合っています。しばらくしてから再度お試しください",
+            headers={"Retry-After": "1"}
+        )
+
+    submitted = time.perf_counter()
+    started: Optional[float] = None
+
+    def timed():
+        nonlocal started
+        started = time.perf_counter()
+        return func(*args)
+
+    def release(_future) -> None:
+        # 在任务结束（或排队中被取消）时释放槽位：等待的协程被取消（客户端断开）后，
+        # 已提交的哈希仍会在线程池中执行，槽位须保持占用直到其结束
+        finished = time.perf_counter()
+        if started is None:
+            hashing_stats.release((finished - submitted) * 1000, None)
+        else:
+            hashing_stats.release((started - submitted) * 1000, (finished - started) * 1000)
+
+    try:
+        future = _hash_executor.submit(timed)
+    except Exception:
+        hashing_stats.release(0.0, None)
+        raise
+    future.add_done_callback(release)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    """获取密码哈希值（在线程池中执行）"""
+    return await _run_hashing(get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（在线程池中执行）"""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def check_password_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码（在线程池中执行）
+
+    Returns:
+        (是否一致, 哈希的 cost 与当前设置不同时为新的哈希值，否则为 None)
+    """
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
@@ -0,0 +1,113 @@
+"""
+Server-Timing 响应头与 SQL 语句数预算（可选）
+
+- auth: get_current_user 的耗时（令牌验证与用户查询）
+- sql: 该请求执行的 SQL 语句数与耗时合计（app.db.query_stats）
+- serialize: 端点函数返回后到响应开始发送的耗时（响应模型验证・JSON 序列化）
+- total: 中间件内的总耗时
+
+SQL_STATEMENT_BUDGET 大于 0 时，请求内的 SQL 语句数超过该值将抛出 QueryBudgetExceeded
+（开发・测试环境用于尽早发现 N+1 查询，生产环境保持 0）
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.db.query_stats import current_query_stats, start_query_stats
+
+
+class RequestTiming:
+    """一个请求内的各阶段耗时"""
+
+    __slots__ = ("started", "phases", "endpoint_returned")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.endpoint_returned: Optional[float] = None
+
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def timing_phase(name: str) -> Iterator[None]:
+    """将 with 块的耗时计入当前请求的阶段 name（未在请求内时不做任何记录）"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[name] = timing.phases.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+
+def _mark_endpoint_returned() -> None:
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.endpoint_returned = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """记录端点函数返回时刻的路由类（用于计算 serialize 耗时；各路由器以 route_class 指定）"""
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            async def timed_call(**kwargs):
+                try:
+                    return await call(**kwargs)
+                finally:
+                    _mark_endpoint_returned()
+        else:
+            # 同步端点在线程池中执行（上下文会被复制，RequestTiming 对象仍是同一个）
+            def timed_call(**kwargs):
+                try:
+                    return call(**kwargs)
+                finally:
+                    _mark_endpoint_returned()
+        self.dependant.call = timed_call
+        return super().get_route_handler()
+
+
+def _format_header(timing: RequestTiming, sql_count: int, sql_ms: float, now: float) -> bytes:
+    entries = [f"{name};dur={ms:.1f}" for name, ms in timing.phases.items()]
+    entries.append(f'sql;dur={sql_ms:.1f};desc="{sql_count} statements"')
+    if timing.endpoint_returned is not None:
+        entries.append(f"serialize;dur={(now - timing.endpoint_returned) * 1000:.1f}")
+    entries.append(f"total;dur={(now - timing.started) * 1000:.1f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+class ServerTimingMiddleware:
+    """添加 Server-Timing 响应头并设置 SQL 语句数预算的 ASGI 中间件（两者均未启用时不注册）"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        _current_timing.set(timing)
+        # 指标中间件已开始统计时共用同一个对象
+        query_stats = current_query_stats() or start_query_stats()
+        if settings.SQL_STATEMENT_BUDGET > 0:
+            query_stats.budget = settings.SQL_STATEMENT_BUDGET
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING_ENABLED:
+                header = _format_header(timing, query_stats.count, query_stats.duration_ms, time.perf_counter())
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,78 @@
+"""
+予約統計のマテリアライズドビュー（lecture_booking_stats）
+
+按讲座汇总预约数的物化视图，lecture_id = 0 的行为全部讲座的合计（GROUPING SETS）。
+管理画面的统计 API 只读取合计行与按预约数索引排序的前几行，与 lecture_bookings 的行数无关；
+视图由定期任务 REFRESH ... CONCURRENTLY 刷新（刷新期间不阻塞读取），
+刷新时间只记录在合计行的 refreshed_at，未变化的讲座行不会被改写。
+"""
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+
+# 人気講座として返す件数
+POPULAR_LECTURE_LIMIT = 5
+
+_TOTALS_QUERY = text(
+    "SELECT total_bookings, confirmed_bookings, cancelled_bookings, pending_bookings, refreshed_at, "
+    "extract(epoch FROM now() - refreshed_at) AS stale_seconds "
+    "FROM lecture_booking_stats WHERE lecture_id = 0"
+)
+
+_POPULAR_QUERY = text(
+    "SELECT lecture_title, total_bookings AS booking_count FROM lecture_booking_stats "
+    "WHERE lecture_id <> 0 ORDER BY total_bookings DESC, lecture_id LIMIT :limit"
+)
+
+_TRY_LOCK_QUERY = text("SELECT pg_try_advisory_xact_lock(hashtext('refresh_lecture_booking_stats'))")
+
+_REFRESH_QUERY = text("REFRESH MATERIALIZED VIEW CONCURRENTLY lecture_booking_stats")
+
+
+async def get_booking_stats(db: AsyncSession) -> Dict:
+    """从物化视图读取预约统计（合计 + 人气讲座）及数据的新旧程度"""
+    totals = (await db.execute(_TOTALS_QUERY)).one()
+    popular = (await db.execute(_POPULAR_QUERY, {"limit": POPULAR_LECTURE_LIMIT})).all()
+    return {
+        "total_bookings": totals.total_bookings,
+        "confirmed_bookings": totals.confirmed_bookings,
+        "cancelled_bookings": totals.cancelled_bookings,
+        "pending_bookings": totals.pending_bookings,
+        "popular_lectures": [
+            {"lecture_title": row.lecture_title, "booking_count": row.booking_count}
+            for row in popular
+        ],
+        "refreshed_at": totals.refreshed_at,
+        "stale_seconds": round(float(totals.stale_seconds), 3),
+    }
+
+
+async def refresh_booking_stats() -> bool:
+    """
+    刷新物化视图（其他进程正在刷新时跳过）
+
+    Returns:
+        bool: 是否执行了刷新
+    """
+    async with AsyncSessionLocal() as db:
+        if not await db.scalar(_TRY_LOCK_QUERY):
+            return False
+        await db.execute(_REFRESH_QUERY)
+        await db.commit()
+        return True
+
+
+# 定期刷新预约统计的物化视图
+# 进程级实例（应用 lifespan 中启动/停止）
+booking_stats_refresher = PeriodicTask(
+    "booking-stats-refresher",
+    refresh_booking_stats,
+    settings.BOOKING_STATS_REFRESH_INTERVAL,
+    error_message="予約統計の更新エラー",
+    run_immediately=False
+)
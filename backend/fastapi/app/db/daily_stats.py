@@ -0,0 +1,47 @@
+"""
+讲座日次统计差分的合并（lecture_daily_stat_deltas → lecture_daily_stats）
+
+lecture_bookings / lecture_schedules 的行触发器只向追加专用的差分表插入行，
+不在预约事务内更新 lecture_daily_stats 的共享行（同一日期・讲座的预约与取消不会因行锁顺序相反而死锁）。
+定期任务按 id 顺序分批将差分加算到日次统计并删除（同一事务内完成，读取方看到的合计值始终一致）；
+分析 API 同时读取未合并的差分，结果不依赖合并间隔。
+"""
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+
+_TRY_LOCK_QUERY = text("SELECT pg_try_advisory_xact_lock(hashtext('fold_lecture_daily_stat_deltas'))")
+
+_FOLD_QUERY = text("SELECT fold_lecture_daily_stat_deltas(:limit)")
+
+
+async def fold_daily_stat_deltas() -> int:
+    """
+    将所有已提交的差分合并到日次统计（其他进程正在合并时跳过）
+
+    Returns:
+        int: 合并的差分行数
+    """
+    folded = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            if not await db.scalar(_TRY_LOCK_QUERY):
+                return folded
+            count = await db.scalar(_FOLD_QUERY, {"limit": settings.DAILY_STATS_FOLD_BATCH_SIZE})
+            await db.commit()
+        folded += count
+        if count < settings.DAILY_STATS_FOLD_BATCH_SIZE:
+            return folded
+
+
+# 定期将日次统计差分合并到 lecture_daily_stats
+# 进程级实例（应用 lifespan 中启动/停止）
+daily_stats_folder = PeriodicTask(
+    "daily-stats-folder",
+    fold_daily_stat_deltas,
+    settings.DAILY_STATS_FOLD_INTERVAL,
+    error_message="講座別日次集計の差分集約エラー",
+    run_immediately=False
+)
@@ -2,17 +2,42 @@
 数据库连接配置
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, register_pool_events
+from app.db.query_stats import register_query_events
 
-# 创建数据库引擎
+# 创建数据库引擎（同步，供脚本及迁移工具使用）
 engine = create_engine(str(settings.DATABASE_URL))
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 创建异步数据库引擎（asyncpg，API 端点使用）
+async_engine = create_async_engine(
+    str(settings.ASYNC_DATABASE_URL),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE_EFFECTIVE,
+    max_overflow=settings.DB_MAX_OVERFLOW_EFFECTIVE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
+)
+register_pool_events(async_engine.sync_engine)
+register_query_events(async_engine.sync_engine)
+
+# 创建异步会话工厂
+# expire_on_commit=False: 提交后仍可访问已加载的属性，避免在异步上下文中触发隐式懒加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # 创建基础模型类
 Base = declarative_base()
 
@@ -24,3 +49,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,34 @@
+"""
+データベースエラー判定ユーティリティ
+"""
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+# PostgreSQL SQLSTATE: 排他制約違反
+EXCLUSION_VIOLATION = "23P01"
+
+
+def get_constraint_name(exc: IntegrityError) -> Optional[str]:
+    """制約違反エラーから違反した制約名を取得する（asyncpg / psycopg2 両対応）"""
+    orig = exc.orig
+    diag = getattr(orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name
+    return getattr(orig.__cause__, "constraint_name", None)
+
+
+def is_exclusion_violation(exc: IntegrityError, constraint_name: Optional[str] = None) -> bool:
+    """
+    排他制約違反かどうかを判定する
+    
+    Args:
+        exc: IntegrityError
+        constraint_name: 制約名（指定した場合はその制約の違反のみ True）
+    
+    Returns:
+        bool: 排他制約違反の場合 True
+    """
+    if getattr(exc.orig, "pgcode", None) != EXCLUSION_VIOLATION:
+        return False
+    return constraint_name is None or get_constraint_name(exc) == constraint_name
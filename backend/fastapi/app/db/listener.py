@@ -0,0 +1,141 @@
+"""
+缓存失效通知（PostgreSQL LISTEN/NOTIFY）
+
+写入端点在事务内执行 pg_notify，提交后由数据库广播给所有工作进程/容器；
+各进程的监听任务收到通知后清空对应的进程内缓存（指定键时只删除该条目）。
+监听未连接期间各缓存处于离线状态，不读写缓存。
+"""
+import asyncio
+import logging
+from typing import Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import CACHES
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 通知频道名（payload 为「缓存名称」或「缓存名称:键」）
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+
+# 会话中待提交后失效的（缓存名称, 键）（Session.info 的键）
+_PENDING_KEY = "pending_cache_invalidations"
+
+# 连接健康检查间隔（秒）
+_HEALTH_CHECK_INTERVAL = 30
+
+
+async def publish_invalidation(db: AsyncSession, cache_name: str = "catalogue", key: Optional[str] = None) -> None:
+    """
+    缓存失效通知（须在 commit 之前调用）
+
+    NOTIFY 随事务一起提交，回滚时不会发送；
+    当前进程的缓存在提交后立即失效，不必等待通知回送。
+
+    Args:
+        db: 数据库会话
+        cache_name: 缓存名称
+        key: 只删除该键的条目（省略时清空整个缓存）
+    """
+    payload = cache_name if key is None else f"{cache_name}:{key}"
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CACHE_INVALIDATION_CHANNEL, "payload": payload}
+    )
+    pending: Set[Tuple[str, Optional[str]]] = db.sync_session.info.setdefault(_PENDING_KEY, set())
+    pending.add((cache_name, key))
+
+
+def _invalidate(cache_name: str, key: Optional[str]) -> bool:
+    cache = CACHES.get(cache_name)
+    if cache is None:
+        return False
+    if key is None:
+        cache.clear()
+    else:
+        cache.delete(key)
+    return True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_local_caches(session: Session) -> None:
+    for cache_name, key in session.info.pop(_PENDING_KEY, ()):
+        _invalidate(cache_name, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _set_caches_online(online: bool) -> None:
+    # 在线状态变化前后都清空，未连接期间可能错过了失效通知
+    for cache in CACHES.values():
+        cache.clear()
+        cache.online = online
+
+
+def _on_notification(connection, pid: int, channel: str, payload: str) -> None:
+    cache_name, _, key = payload.partition(":")
+    if not _invalidate(cache_name, key or None):
+        logger.warning(f"未知のキャッシュ名の無効化通知を受信しました: {payload}")
+
+
+class InvalidationListener:
+    """缓存失效通知监听任务（断线后自动重连）"""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.reconnects = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cache-invalidation-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(settings.DATABASE_URL)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CACHE_INVALIDATION_CHANNEL, _on_notification)
+                _set_caches_online(True)
+                self.connected = True
+                logger.info("キャッシュ無効化通知の監視を開始しました")
+
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=_HEALTH_CHECK_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1", timeout=5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"キャッシュ無効化通知の監視エラー: {str(e)}")
+            finally:
+                self.connected = False
+                _set_caches_online(False)
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            self.reconnects += 1
+            await asyncio.sleep(settings.CACHE_LISTEN_RECONNECT_SECONDS)
+
+
+# 进程级监听实例（应用 lifespan 中启动/停止）
+invalidation_listener = InvalidationListener()
@@ -0,0 +1,111 @@
+"""
+数据库连接池监控
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+# 连接获取等待时间直方图的桶上限（毫秒）
+WAIT_TIME_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class PoolStats:
+    """连接池统计信息（进程内累计值）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_time_total_ms = 0.0
+        self.wait_time_max_ms = 0.0
+        self.wait_time_buckets = [0] * (len(WAIT_TIME_BUCKETS_MS) + 1)
+
+    def record_checkout(self, wait_ms: float) -> None:
+        """记录一次连接获取及其等待时间"""
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total_ms += wait_ms
+            self.wait_time_max_ms = max(self.wait_time_max_ms, wait_ms)
+            self.wait_time_buckets[bisect_left(WAIT_TIME_BUCKETS_MS, wait_ms)] += 1
+
+    def record_timeout(self) -> None:
+        """记录一次连接获取超时"""
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        """记录一次新建物理连接"""
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self) -> None:
+        """记录一次连接失效（如数据库故障切换后）"""
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict:
+        """返回统计信息快照"""
+        with self._lock:
+            buckets = {}
+            cumulative = 0
+            for upper, count in zip(WAIT_TIME_BUCKETS_MS + [float("inf")], self.wait_time_buckets):
+                cumulative += count
+                buckets["+Inf" if upper == float("inf") else f"{upper:g}"] = cumulative
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_time_ms": {
+                    "total": round(self.wait_time_total_ms, 3),
+                    "max": round(self.wait_time_max_ms, 3),
+                    "avg": round(self.wait_time_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                    "buckets": buckets,
+                },
+            }
+
+
+# 进程级统计实例（连接池重建后仍保留累计值）
+pool_stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """记录连接获取等待时间的异步连接池"""
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.record_timeout()
+            raise
+        pool_stats.record_checkout((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def register_pool_events(target) -> None:
+    """注册连接池事件监听器（target 可为 Engine 或 Pool）"""
+    @event.listens_for(target, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_stats.record_connect()
+
+    @event.listens_for(target, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_stats.record_invalidation()
+
+
+def get_pool_status(pool) -> Dict:
+    """返回连接池当前状态及累计统计"""
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        **pool_stats.snapshot(),
+    }
@@ -0,0 +1,77 @@
+"""
+按请求统计 SQL 语句（执行次数与耗时）
+
+中间件在请求开始时调用 start_query_stats()，统计对象保存在 ContextVar 中；
+引擎的 before/after_cursor_execute 事件在同一上下文中执行（AsyncSession 经由 greenlet 时也会继承），
+因此只统计该请求自身发出的语句。未开始统计的上下文（后台任务等）不做任何记录。
+设置了语句数预算（budget）时，超出预算的语句在执行前抛出 QueryBudgetExceeded。
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """请求内执行的 SQL 语句数超过预算"""
+
+
+class QueryStats:
+    """一个请求内的 SQL 统计"""
+
+    __slots__ = ("count", "duration_ms", "budget")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration_ms = 0.0
+        # 语句数预算（None 为不限制）
+        self.budget: Optional[int] = None
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    """为当前上下文（请求）开始统计"""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """返回当前上下文的统计（未开始时为 None）"""
+    return _current_stats.get()
+
+
+def register_query_events(target) -> None:
+    """注册 SQL 执行事件监听器（target 为同步 Engine；异步引擎传入 async_engine.sync_engine）"""
+    @event.listens_for(target, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        if stats.budget is not None and stats.count >= stats.budget:
+            logger.warning(f"SQL 文の実行数が上限（{stats.budget}）を超えました: {statement[:200]}")
+            raise QueryBudgetExceeded(f"SQL 文の実行数が上限（{stats.budget}）を超えました")
+        context._query_started = time.perf_counter()
+
+    def _record(context) -> None:
+        stats = _current_stats.get()
+        started = getattr(context, "_query_started", None)
+        if stats is not None and started is not None:
+            stats.count += 1
+            stats.duration_ms += (time.perf_counter() - started) * 1000
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _record(context)
+
+    # 执行失败的语句（约束违反等）也计入
+    @event.listens_for(target, "handle_error")
+    def _handle_error(exception_context):
+        if exception_context.execution_context is not None:
+            _record(exception_context.execution_context)
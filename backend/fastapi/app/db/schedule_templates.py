@@ -0,0 +1,100 @@
+"""
+重复日程模板（schedule_templates）的展开
+
+模板（schedule_templates）按曜日・隔周规则，由一条 SQL 用 generate_series 展开为 lecture_schedules 行：
+- 每个模板从 materialized_until 的次日（不早于今天）展开到 end_date 与「今天 + 展开期间」中较早的一天
+- 与已有有效时间段重叠的行由排他约束 + ON CONFLICT DO NOTHING 跳过，不会中断整批展开
+- 定期任务通过事务级 advisory lock 保证多个工作进程中同一时间只有一个在执行
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+_MATERIALIZE_QUERY = text("""
+    WITH targets AS (
+        SELECT
+            t.id, t.lecture_id, t.teacher_id, t.weekdays, t.interval_weeks, t.excluded_dates,
+            t.start_time, t.end_time, t.capacity,
+            -- 隔周的基准：start_date 所在周的周一
+            t.start_date - (extract(isodow FROM t.start_date)::int - 1) AS anchor_monday,
+            greatest(coalesce(t.materialized_until + 1, t.start_date), current_date) AS from_date,
+            least(t.end_date, current_date + CAST(:horizon_days AS integer)) AS to_date
+        FROM schedule_templates t
+        JOIN lectures l ON l.id = t.lecture_id AND NOT l.is_deleted
+        WHERE t.is_active
+          AND (CAST(:template_id AS integer) IS NULL OR t.id = CAST(:template_id AS integer))
+          AND coalesce(t.materialized_until, t.start_date - 1) < least(t.end_date, current_date + CAST(:horizon_days AS integer))
+    ),
+    inserted AS (
+        INSERT INTO lecture_schedules (lecture_id, teacher_id, booking_date, start_time, end_time, capacity, template_id)
+        SELECT t.lecture_id, t.teacher_id, d.day, t.start_time, t.end_time, t.capacity, t.id
+        FROM targets t
+        CROSS JOIN LATERAL (
+            SELECT CAST(g AS date) AS day FROM generate_series(t.from_date, t.to_date, interval '1 day') AS g
+        ) d
+        WHERE extract(isodow FROM d.day)::smallint = ANY(t.weekdays)
+          AND ((d.day - t.anchor_monday) / 7) % t.interval_weeks = 0
+          AND NOT (d.day = ANY(t.excluded_dates))
+        ORDER BY t.id, d.day
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    ),
+    advanced AS (
+        UPDATE schedule_templates s
+        SET materialized_until = t.to_date
+        FROM targets t
+        WHERE s.id = t.id
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM inserted) AS created, (SELECT count(*) FROM advanced) AS templates
+""")
+
+_TRY_LOCK_QUERY = text("SELECT pg_try_advisory_xact_lock(hashtext('materialize_schedule_templates'))")
+
+
+async def materialize_schedule_templates(
+    db: AsyncSession,
+    template_id: Optional[int] = None,
+    horizon_days: Optional[int] = None
+) -> int:
+    """
+    展开模板并返回新建的时间段数（commit 由调用方负责）
+
+    Args:
+        db: 数据库会话
+        template_id: 仅展开指定模板（None 时展开全部有效模板）
+        horizon_days: 从今天起展开的天数（默认 SCHEDULE_TEMPLATE_HORIZON_DAYS）
+    """
+    row = (await db.execute(_MATERIALIZE_QUERY, {
+        "template_id": template_id,
+        "horizon_days": settings.SCHEDULE_TEMPLATE_HORIZON_DAYS if horizon_days is None else horizon_days,
+    })).one()
+    return int(row.created)
+
+
+async def _materialize_locked() -> None:
+    """其他进程未在展开时展开全部有效模板（事务级咨询锁）"""
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(_TRY_LOCK_QUERY):
+            created = await materialize_schedule_templates(db)
+            await db.commit()
+            if created:
+                logger.info(f"繰り返しテンプレートから予約可能時間を {created} 件作成しました")
+
+
+# 定期将模板展开到「今天 + 展开期间」为止（日期推进后补充新的时间段）
+# 进程级实例（应用 lifespan 中启动/停止）
+schedule_template_materializer = PeriodicTask(
+    "schedule-template-materializer",
+    _materialize_locked,
+    settings.SCHEDULE_TEMPLATE_MATERIALIZE_INTERVAL,
+    error_message="繰り返しテンプレートの展開エラー"
+)
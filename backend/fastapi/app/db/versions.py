@@ -0,0 +1,45 @@
+"""
+表变更计数器（table_versions）
+
+各表的 INSERT/UPDATE/DELETE 由语句级触发器在同一事务内累加计数，
+计数随事务一起提交，因此读取到的版本号与数据始终一致，可用于生成 ETag。
+计数按（表名, 后端进程ID）分行存储，并发写入的事务不会争用同一行锁；
+表的版本号为该表所有行的合计值。
+"""
+from typing import Dict, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+
+_VERSIONS_QUERY = text(
+    "SELECT table_name, sum(version) AS version FROM table_versions "
+    "WHERE table_name = ANY(:tables) GROUP BY table_name"
+)
+
+
+async def get_table_versions(db: AsyncSession, tables: Sequence[str]) -> Dict[str, int]:
+    """返回指定表的当前版本号（从未变更过的表为 0）"""
+    rows = (await db.execute(_VERSIONS_QUERY, {"tables": list(tables)})).all()
+    versions = {table: 0 for table in tables}
+    versions.update({row.table_name: int(row.version) for row in rows})
+    return versions
+
+
+async def compact_table_versions() -> None:
+    """将已结束后端进程的计数行合并到 backend_pid = 0 的行（合计值不变）"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT compact_table_versions()"))
+        await db.commit()
+
+
+# 进程级实例（应用 lifespan 中启动/停止）
+table_version_compactor = PeriodicTask(
+    "table-version-compactor",
+    compact_table_versions,
+    settings.TABLE_VERSION_COMPACT_INTERVAL,
+    error_message="テーブル変更カウンターの集約エラー"
+)
@@ -1,7 +1,8 @@
 """
 講座予約 SQLAlchemy ORM モデル
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Date, Time
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, DateTime, ForeignKey, Boolean, Text, Date, Time, Computed, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSRANGE, ExcludeConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -10,6 +11,15 @@ from app.db.database import Base
 class LectureSchedule(Base):
     """講座スケジュールモデル"""
     __tablename__ = "lecture_schedules"
+    __table_args__ = (
+        # 同一講座の有効なスケジュール同士の時間帯重複を禁止（btree_gist 拡張が必要）
+        ExcludeConstraint(
+            ("lecture_id", "="), ("time_range", "&&"),
+            name="lecture_schedules_no_overlap",
+            using="gist",
+            where=text("NOT is_expired")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lecture_id = Column(Integer, ForeignKey("lectures.id"), nullable=False)
@@ -17,26 +27,73 @@ class LectureSchedule(Base):
     booking_date = Column(Date, nullable=False)  # 予約可能日期
     start_time = Column(Time, nullable=False)  # 開始時間
     end_time = Column(Time, nullable=False)  # 終了時間
+    capacity = Column(Integer, nullable=False, default=1, server_default="1")  # 定員（席数）
+    booked_count = Column(Integer, nullable=False, default=0, server_default="0")  # 予約済み席数（pending/confirmed）
+    time_range = Column(TSRANGE, Computed("tsrange(booking_date + start_time, booking_date + end_time)", persisted=True))  # 重複判定用の時間範囲
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     is_expired = Column(Boolean, default=False)  # 是否过期
+    template_id = Column(Integer, ForeignKey("schedule_templates.id", ondelete="SET NULL"), nullable=True)  # 生成元の繰り返しテンプレート
 
     # リレーションシップ
     lecture = relationship("Lecture", back_populates="schedules")
     teacher = relationship("TeacherProfile")  # 新增：讲师关系
 
 
+class ScheduleTemplate(Base):
+    """
+    繰り返しスケジュールテンプレートモデル
+
+    指定した曜日・隔週の規則で期間内の予約可能時間を生成する。
+    スケジュールはバックグラウンドジョブが materialized_until の翌日から一定期間先まで一括で作成する
+    """
+    __tablename__ = "schedule_templates"
+    __table_args__ = (
+        CheckConstraint("start_time < end_time"),
+        CheckConstraint("start_date <= end_date"),
+        CheckConstraint("interval_weeks IN (1, 2)", name="schedule_templates_interval_weeks_check"),
+        CheckConstraint("capacity > 0", name="schedule_templates_capacity_check"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    lecture_id = Column(Integer, ForeignKey("lectures.id", ondelete="CASCADE"), nullable=False, index=True)
+    teacher_id = Column(Integer, ForeignKey("teacher_profiles.id", ondelete="CASCADE"), nullable=False)
+    weekdays = Column(ARRAY(SmallInteger), nullable=False)  # ISO 曜日（1=月曜 〜 7=日曜）
+    interval_weeks = Column(SmallInteger, nullable=False, default=1, server_default="1")  # 1=毎週、2=隔週（start_date の週から数える）
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    capacity = Column(Integer, nullable=False, default=1, server_default="1")
+    excluded_dates = Column(ARRAY(Date), nullable=False, default=list, server_default="{}")  # 生成しない日付（祝日など）
+    materialized_until = Column(Date, nullable=True)  # スケジュールを生成済みの最終日
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class LectureBooking(Base):
     """講座予約モデル"""
     __tablename__ = "lecture_bookings"
+    __table_args__ = (
+        # 同一ユーザーの同一講座における有効な予約同士の時間帯重複を禁止（btree_gist 拡張が必要）
+        ExcludeConstraint(
+            ("user_id", "="), ("lecture_id", "="), ("time_range", "&&"),
+            name="lecture_bookings_no_overlap",
+            using="gist",
+            where=text("status IN ('pending', 'confirmed')")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user_infos.id"), nullable=False)
     lecture_id = Column(Integer, ForeignKey("lectures.id"), nullable=False)  # 直接关联讲座ID
     teacher_id = Column(Integer, ForeignKey("teacher_profiles.id"), nullable=False)  # 新增：讲师ID
+    schedule_id = Column(Integer, ForeignKey("lecture_schedules.id", ondelete="SET NULL"), nullable=True)  # 占用席位的スケジュールID
     status = Column(String(20), nullable=False, default="pending")  # ステータス: pending, confirmed, cancelled
     booking_date = Column(Date, nullable=False)  # 予約日期
     start_time = Column(Time, nullable=False)  # 开始时间
     end_time = Column(Time, nullable=False)  # 结束时间
+    time_range = Column(TSRANGE, Computed("tsrange(booking_date + start_time, booking_date + end_time)", persisted=True))  # 重複判定用の時間範囲
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     is_expired = Column(Boolean, default=False)
 
@@ -68,3 +125,50 @@ class BookingWaitlist(Base):
     # リレーションシップ
     user = relationship("User", back_populates="waitlist_entries")
     lecture = relationship("Lecture")
+
+
+class LectureDailyStat(Base):
+    """
+    講座別日次集計モデル（日付・講座・講師ごとの予約件数と予約可能時間の席数）
+
+    lecture_bookings / lecture_schedules のトリガーが追記した差分（LectureDailyStatDelta）を定期処理が加算する（アプリケーションからは読み取りのみ）。
+    講座の物理削除後も履歴として残すため外部キーは持たない
+    """
+    __tablename__ = "lecture_daily_stats"
+    __table_args__ = (
+        Index("idx_lecture_daily_stats_lecture_id", "lecture_id", "stat_date"),
+        Index("idx_lecture_daily_stats_teacher_id", "teacher_id", "stat_date"),
+    )
+
+    stat_date = Column(Date, primary_key=True)  # 予約日（講座の実施日）
+    lecture_id = Column(Integer, primary_key=True)
+    teacher_id = Column(Integer, primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)  # 予約件数（全状態）
+    pending_bookings = Column(Integer, nullable=False, default=0)
+    confirmed_bookings = Column(Integer, nullable=False, default=0)
+    cancelled_bookings = Column(Integer, nullable=False, default=0)
+    slots = Column(Integer, nullable=False, default=0)  # 有効な予約可能時間の数
+    capacity = Column(Integer, nullable=False, default=0)  # 有効な予約可能時間の定員合計
+    booked_seats = Column(Integer, nullable=False, default=0)  # 有効な予約可能時間の予約済み席数合計
+
+
+class LectureDailyStatDelta(Base):
+    """
+    講座別日次集計の差分モデル（追記専用）
+
+    トリガーが予約・スケジュールの変更ごとに 1 行追加し、app.db.daily_stats の定期処理が LectureDailyStat に集約して削除する。
+    共有行を更新しないため、同じ日付・講座の予約作成とキャンセルが行ロックで競合しない
+    """
+    __tablename__ = "lecture_daily_stat_deltas"
+
+    id = Column(BigInteger, primary_key=True)
+    stat_date = Column(Date, nullable=False)
+    lecture_id = Column(Integer, nullable=False)
+    teacher_id = Column(Integer, nullable=False)
+    bookings = Column(Integer, nullable=False, default=0)
+    pending_bookings = Column(Integer, nullable=False, default=0)
+    confirmed_bookings = Column(Integer, nullable=False, default=0)
+    cancelled_bookings = Column(Integer, nullable=False, default=0)
+    slots = Column(Integer, nullable=False, default=0)
+    capacity = Column(Integer, nullable=False, default=0)
+    booked_seats = Column(Integer, nullable=False, default=0)
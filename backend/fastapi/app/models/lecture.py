@@ -1,9 +1,10 @@
 """
 講座 SQLAlchemy ORM モデル
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Computed
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.database import Base
 
 
@@ -21,6 +22,9 @@ class Lecture(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # 部分一致検索用（正規化した 2 文字の組、GIN インデックス対象。通常の取得では読み込まない）
+    title_bigrams = deferred(Column(ARRAY(Text), Computed("search_bigrams(lecture_title)", persisted=True)))
+    description_bigrams = deferred(Column(ARRAY(Text), Computed("search_bigrams(lecture_description)", persisted=True)))
 
     # リレーションシップ
     teacher = relationship("TeacherProfile", back_populates="lectures")
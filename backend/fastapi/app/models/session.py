@@ -0,0 +1,32 @@
+"""
+ログインセッション（リフレッシュトークン）SQLAlchemy ORM モデル
+"""
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UserSession(Base):
+    """
+    ログインセッションモデル
+
+    リフレッシュトークン 1 件につき 1 行。トークン本体は保存せず SHA-256 ハッシュのみを保存する。
+    リフレッシュのたびに行をローテーション済みにして同じ family_id の新しい行を発行し、
+    ローテーション済みのトークンが再利用された場合は family_id 単位で失効させる
+    """
+    __tablename__ = "user_sessions"
+    __table_args__ = (
+        # ユーザー単位・系列単位の一括失効と、期限切れ行の定期削除用
+        Index("idx_user_sessions_user_id", "user_id", postgresql_where=text("revoked_at IS NULL")),
+        Index("idx_user_sessions_family_id", "family_id"),
+        Index("idx_user_sessions_expires_at", "expires_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("user_infos.id", ondelete="CASCADE"), nullable=False)
+    family_id = Column(String(32), nullable=False)  # ログイン 1 回ごとの系列ID
+    token_hash = Column(String(64), nullable=False, unique=True)  # リフレッシュトークンの SHA-256（16進）
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    rotated_at = Column(DateTime(timezone=True), nullable=True)  # 新しいトークンと交換した日時
+    revoked_at = Column(DateTime(timezone=True), nullable=True)  # ログアウト・強制失効の日時
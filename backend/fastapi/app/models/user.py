@@ -1,9 +1,10 @@
 """
 ユーザー SQLAlchemy ORM モデル
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Computed
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.database import Base
 
 
@@ -16,10 +17,14 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(20), nullable=False, default="student")
+    # トークンバージョン（加算するとそれ以前に発行したアクセストークンが無効になる）
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # 名前の部分一致検索用（正規化した 2 文字の組、GIN インデックス対象。通常の取得では読み込まない）
+    name_bigrams = deferred(Column(ARRAY(Text), Computed("search_bigrams(name)", persisted=True)))
 
     # リレーションシップ
     teacher_profile = relationship("TeacherProfile", back_populates="user", uselist=False)
@@ -15,6 +15,7 @@ class ScheduleCreate(BaseModel):
     date: str  # 格式: "YYYY-MM-DD"
     start: str  # 格式: "HH:MM"
     end: str    # 格式: "HH:MM"
+    capacity: int = 1  # 定員（席数）
     
     @field_validator('lecture_id', 'teacher_id')
     @classmethod
@@ -40,6 +41,13 @@ class ScheduleCreate(BaseModel):
             return v
         except ValueError:
             raise ValueError('時間は HH:MM 形式である必要があります')
+    
+    @field_validator('capacity')
+    @classmethod
+    def validate_capacity(cls, v):
+        if v <= 0 or v > 1000:
+            raise ValueError('定員は1以上1000以下である必要があります')
+        return v
 
 
 class ScheduleBatchCreate(BaseModel):
@@ -49,6 +57,7 @@ class ScheduleBatchCreate(BaseModel):
     dates: List[str]  # 日期列表，格式: ["YYYY-MM-DD", "YYYY-MM-DD", ...]
     start: str  # 格式: "HH:MM"
     end: str    # 格式: "HH:MM"
+    capacity: int = 1  # 定員（席数）
     
     @field_validator('lecture_id', 'teacher_id')
     @classmethod
@@ -82,6 +91,115 @@ class ScheduleBatchCreate(BaseModel):
             return v
         except ValueError:
             raise ValueError('時間は HH:MM 形式である必要があります')
+    
+    @field_validator('capacity')
+    @classmethod
+    def validate_capacity(cls, v):
+        if v <= 0 or v > 1000:
+            raise ValueError('定員は1以上1000以下である必要があります')
+        return v
+
+
+class ScheduleTemplateCreate(BaseModel):
+    """繰り返しスケジュールテンプレート作成モデル"""
+    lecture_id: int
+    teacher_id: int
+    weekdays: List[int]  # ISO 曜日（1=月曜 〜 7=日曜）
+    interval_weeks: int = 1  # 1=毎週、2=隔週（start_date の週から数える）
+    start_date: str  # 格式: "YYYY-MM-DD"
+    end_date: str    # 格式: "YYYY-MM-DD"
+    start: str  # 格式: "HH:MM"
+    end: str    # 格式: "HH:MM"
+    capacity: int = 1  # 定員（席数）
+    excluded_dates: List[str] = []  # 生成しない日付（祝日など）、格式: ["YYYY-MM-DD", ...]
+    
+    @field_validator('lecture_id', 'teacher_id')
+    @classmethod
+    def validate_ids(cls, v):
+        if v <= 0:
+            raise ValueError('IDは正の整数である必要があります')
+        return v
+    
+    @field_validator('weekdays')
+    @classmethod
+    def validate_weekdays(cls, v):
+        if not v:
+            raise ValueError('曜日を1つ以上指定してください')
+        if any(d < 1 or d > 7 for d in v):
+            raise ValueError('曜日は1（月曜）から7（日曜）の範囲で指定してください')
+        return sorted(set(v))
+    
+    @field_validator('interval_weeks')
+    @classmethod
+    def validate_interval_weeks(cls, v):
+        if v not in (1, 2):
+            raise ValueError('繰り返し間隔は1（毎週）または2（隔週）である必要があります')
+        return v
+    
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def validate_date(cls, v):
+        try:
+            datetime.strptime(v, "%Y-%m-%d")
+            return v
+        except ValueError:
+            raise ValueError('日付は YYYY-MM-DD 形式である必要があります')
+    
+    @field_validator('excluded_dates')
+    @classmethod
+    def validate_excluded_dates(cls, v):
+        if len(v) > 366:
+            raise ValueError('除外日は366件までです')
+        for date_str in v:
+            try:
+                datetime.strptime(date_str, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f'日付の形式が正しくありません: {date_str}')
+        return v
+    
+    @field_validator('start', 'end')
+    @classmethod
+    def validate_time(cls, v):
+        try:
+            datetime.strptime(v, "%H:%M")
+            return v
+        except ValueError:
+            raise ValueError('時間は HH:MM 形式である必要があります')
+    
+    @field_validator('capacity')
+    @classmethod
+    def validate_capacity(cls, v):
+        if v <= 0 or v > 1000:
+            raise ValueError('定員は1以上1000以下である必要があります')
+        return v
+
+
+class ScheduleTemplateCreateResponse(BaseModel):
+    """繰り返しスケジュールテンプレート作成レスポンス"""
+    message: str
+    template_id: int
+    created_count: int  # 作成時に生成した予約可能時間の件数（既存の時間帯と重複する日は除く）
+
+
+class ScheduleTemplateOut(BaseModel):
+    """繰り返しスケジュールテンプレート出力モデル"""
+    id: int
+    lecture_id: int
+    teacher_id: int
+    weekdays: List[int]
+    interval_weeks: int
+    start_date: date
+    end_date: date
+    start_time: time
+    end_time: time
+    capacity: int
+    excluded_dates: List[date]
+    materialized_until: Optional[date] = None
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
 
 
 class ScheduleCreateResponse(BaseModel):
@@ -98,6 +216,8 @@ class ScheduleOut(BaseModel):
     booking_date: date
     start_time: time
     end_time: time
+    capacity: int  # 定員
+    booked_count: int  # 予約済み席数
     created_at: datetime
     is_expired: bool
 
@@ -115,6 +235,8 @@ class ScheduleListOut(BaseModel):
     booking_date: date
     start_time: time
     end_time: time
+    capacity: int  # 定員
+    booked_count: int  # 予約済み席数
     created_at: datetime
 
     class Config:
@@ -308,3 +430,30 @@ class UserBookingsResponse(BaseModel):
     message: str = "予約記録の取得が完了しました"
     total_count: int
     bookings: List[UserBookingRecord]
+
+
+class BookingAnalyticsBucket(BaseModel):
+    """予約分析の集計行（期間 × 講座 / 講師）"""
+    period: date  # 集計期間の開始日（週は月曜日、月は 1 日）
+    lecture_id: Optional[int] = None
+    lecture_title: Optional[str] = None
+    teacher_id: Optional[int] = None
+    teacher_name: Optional[str] = None
+    bookings: int
+    pending_bookings: int
+    confirmed_bookings: int
+    cancelled_bookings: int
+    cancellation_rate: Optional[float] = None  # キャンセル件数 / 予約件数（予約がない場合は None）
+    slots: int  # 有効な予約可能時間の数
+    capacity: int  # 有効な予約可能時間の定員合計
+    booked_seats: int
+    utilization: Optional[float] = None  # 予約済み席数 / 定員（予約可能時間がない場合は None）
+
+
+class BookingAnalyticsResponse(BaseModel):
+    """予約分析レスポンス"""
+    date_from: date
+    date_to: date
+    granularity: str
+    group_by: str
+    buckets: List[BookingAnalyticsBucket]
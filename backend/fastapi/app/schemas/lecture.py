@@ -103,6 +103,17 @@ class LectureListOut(BaseModel):
         from_attributes = True
 
 
+class LectureSearchItem(LectureListOut):
+    """講座検索結果の出力モデル"""
+    score: float  # 検索文字列と講座名・講師名の類似度（0〜1 の加重和）
+
+
+class LectureSearchResponse(BaseModel):
+    """講座検索レスポンス"""
+    total_count: int
+    lectures: List[LectureSearchItem]
+
+
 class LectureDetailOut(LectureOut):
     """講座詳細出力モデル"""
     teacher_name: str
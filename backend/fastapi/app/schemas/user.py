@@ -83,6 +83,23 @@ class UserLoginResponse(BaseModel):
     name: str
     role: str
     token: str
+    refresh_token: str  # アクセストークン再発行用（使用のたびに新しいトークンに交換される）
+
+
+class TokenRefreshRequest(BaseModel):
+    """アクセストークン再発行・ログアウトリクエスト"""
+    refresh_token: str
+
+
+class TokenRefreshResponse(BaseModel):
+    """アクセストークン再発行レスポンス"""
+    token: str
+    refresh_token: str  # 新しいリフレッシュトークン（送信したトークンは使用済みになる）
+
+
+class LogoutResponse(BaseModel):
+    """ログアウトレスポンス"""
+    message: str = "ログアウトしました"
 
 
 class UserUpdate(BaseModel):
@@ -143,6 +160,8 @@ class PasswordChange(BaseModel):
 class PasswordChangeResponse(BaseModel):
     """パスワード変更レスポンス"""
     message: str = "パスワードの変更が完了しました"
+    token: str  # 新しいアクセストークン（変更前に発行されたトークンは無効になる）
+    refresh_token: str  # 新しいリフレッシュトークン（変更前のセッションはすべて失効する）
 
 
 class UserDeleteResponse(BaseModel):
@@ -0,0 +1,117 @@
+"""
+ETag・条件付き GET（If-None-Match）関連機能
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.versions import get_table_versions
+
+
+def build_etag(versions: Dict[str, int], *parts: Any) -> str:
+    """
+    テーブルのバージョン番号とリソース識別子から弱い ETag を生成
+
+    レスポンス本文をシリアライズせずに算出できる（プロキシの gzip 圧縮後も有効な弱い ETag を使用）
+    """
+    payload = json.dumps([sorted(versions.items()), [str(p) for p in parts]], separators=(",", ":"))
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match ヘッダーが ETag と一致するか（弱い比較）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def cache_control() -> str:
+    """
+    公開データ用の Cache-Control
+
+    ブラウザには毎回 ETag で再検証させ、共有キャッシュ（nginx）には短時間の保持を許可する
+    """
+    return f"public, max-age=0, s-maxage={settings.HTTP_CACHE_SHARED_MAX_AGE}, must-revalidate"
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """レスポンスに ETag と Cache-Control を設定"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control()
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """304 Not Modified レスポンスを生成"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    set_cache_headers(response, etag)
+    return response
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    tables: Sequence[str],
+    *parts: Any
+) -> Tuple[str, Optional[Response]]:
+    """
+    条件付き GET の判定
+
+    重いクエリの前に呼び出し、テーブルのバージョン番号のみで ETag を算出する。
+    バージョン番号はデータより先に読み取るため、ETag がデータより新しくなることはない
+
+    Args:
+        request: リクエスト
+        response: レスポンス（ETag・Cache-Control を設定）
+        db: データベースセッション
+        tables: レスポンスの内容が依存するテーブル
+        parts: リソース識別子（パスパラメータ・クエリパラメータなど）
+
+    Returns:
+        (ETag, If-None-Match が一致した場合は 304 レスポンス、それ以外は None)
+    """
+    etag = build_etag(await get_table_versions(db, tables), request.url.path, *parts)
+    if etag_matches(request, etag):
+        return etag, not_modified(etag)
+    set_cache_headers(response, etag)
+    return etag, None
+
+
+def cached_conditional_get(
+    request: Request,
+    response: Response,
+    etag: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Optional[Response]:
+    """
+    プロセス内キャッシュに保存済みの ETag で条件付き GET を判定（データベースへの問い合わせなし）
+
+    Args:
+        request: リクエスト
+        response: レスポンス（ETag・Cache-Control・headers を設定）
+        etag: キャッシュ保存時に conditional_get() で算出した ETag
+        headers: キャッシュと一緒に保存した追加ヘッダー（X-Next-Cursor など）
+
+    Returns:
+        If-None-Match が一致した場合は 304 レスポンス、それ以外は None
+    """
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    set_cache_headers(response, etag)
+    if headers:
+        response.headers.update(headers)
+    return None
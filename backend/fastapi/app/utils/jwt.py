@@ -1,17 +1,27 @@
 """
 JWT Token 関連機能
 """
+import hashlib
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import auth_user_cache, token_cache
 from app.core.config import settings
-from app.core.security import verify_password
-from app.db.database import get_db
+from app.core.server_timing import timing_phase
+from app.core.security import check_password_and_update
+from app.db.database import get_async_db
+from app.db.listener import publish_invalidation
 from app.models.user import User
+from app.utils.sessions import revoke_user_sessions
+
+logger = logging.getLogger(__name__)
 
 # HTTP Bearer 認証スキーム
 security = HTTPBearer()
@@ -22,6 +32,7 @@ class TokenPayload:
     sub: str  # ユーザーID
     email: str  # メールアドレス
     role: str  # ユーザーロール
+    ver: int  # トークンバージョン（発行時のユーザーの token_version）
     exp: datetime  # 有効期限
 
 
@@ -29,7 +40,8 @@ def create_access_token(
     subject: Union[str, int], 
     email: str, 
     role: str,
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    token_version: int = 0
 ) -> str:
     """
     アクセストークンを作成
@@ -39,6 +51,7 @@ def create_access_token(
         email: メールアドレス
         role: ユーザーロール
         expires_delta: 有効期限（指定しない場合は設定ファイルの値を使用）
+        token_version: ユーザーの現在のトークンバージョン
     
     Returns:
         str: JWT トークン
@@ -54,6 +67,7 @@ def create_access_token(
         "sub": str(subject),
         "email": email,
         "role": role,
+        "ver": token_version,
         "exp": expire,
         "iat": datetime.now(timezone.utc)
     }
@@ -71,12 +85,20 @@ def verify_token(token: str) -> Optional[TokenPayload]:
     """
     JWT トークンを検証
     
+    検証済みのトークンは SHA-256 をキーに有効期限まで token_cache に保持し、
+    同じトークンの署名検証・デコードを省略する（get_current_user・認証状態確認 API で共用）
+    
     Args:
         token: JWT トークン
     
     Returns:
         TokenPayload: トークンペイロード（検証失敗時はNone）
     """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached_payload = token_cache.get(cache_key)
+    if cached_payload is not None:
+        return cached_payload
+    
     try:
         payload = jwt.decode(
             token, 
@@ -89,16 +111,22 @@ def verify_token(token: str) -> Optional[TokenPayload]:
         token_payload.sub = payload.get("sub")
         token_payload.email = payload.get("email")
         token_payload.role = payload.get("role")
+        # ver クレームのないトークン（導入前に発行）はバージョン 0 として扱う
+        token_payload.ver = payload.get("ver", 0)
         # 使用 UTC 时区创建时间对象，确保时区一致性
         token_payload.exp = datetime.fromtimestamp(payload.get("exp"), tz=timezone.utc)
         
+        remaining = (token_payload.exp - datetime.now(timezone.utc)).total_seconds()
+        if remaining > 0:
+            token_cache.set(cache_key, token_payload, ttl=remaining)
+        
         return token_payload
         
     except JWTError:
         return None
 
 
-def authenticate_user(email: str, password: str, db: Session) -> Optional[User]:
+async def authenticate_user(email: str, password: str, db: AsyncSession) -> Optional[User]:
     """
     ユーザー認証
     
@@ -111,28 +139,101 @@ def authenticate_user(email: str, password: str, db: Session) -> Optional[User]:
         User: 認証成功時のユーザーオブジェクト（失敗時はNone）
     """
     # メールアドレスでユーザーを検索
-    user = db.query(User).filter(
-        User.email == email,
-        User.is_deleted == False
-    ).first()
+    result = await db.execute(
+        select(User).where(
+            User.email == email,
+            User.is_deleted == False
+        )
+    )
+    user = result.scalars().first()
     
     if not user:
         return None
     
-    # パスワードを検証
-    if not verify_password(password, user.hashed_password):
+    # パスワードを検証（bcrypt のコストが設定値と異なる場合は新しいハッシュも受け取る）
+    verified, new_hash = await check_password_and_update(password, user.hashed_password)
+    if not verified:
         return None
     
+    # 現在のコストで再ハッシュして保存（失敗してもログイン自体は成功させる）
+    if new_hash:
+        try:
+            user.hashed_password = new_hash
+            await invalidate_cached_user(db, user)
+            await db.commit()
+            logger.info(f"パスワードハッシュを再計算しました: ユーザーID {user.id}")
+        except Exception as e:
+            await db.rollback()
+            await db.refresh(user)
+            logger.warning(f"パスワードハッシュの再計算に失敗しました: ユーザーID {user.id}: {str(e)}")
+    
     return user
 
 
-def get_current_user(
+def _detached_copy(user: User) -> User:
+    """セッションから切り離したユーザーのコピーを作成（キャッシュ保存用、読み込み済みの列のみ）"""
+    loaded = inspect(user).dict
+    copy = User(**{attr.key: loaded[attr.key] for attr in inspect(User).column_attrs if attr.key in loaded})
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def get_cached_user(db: AsyncSession, user_id: str) -> Optional[User]:
+    """
+    ユーザーID に対応する（削除されていない）ユーザーを取得
+    
+    ユーザー情報はユーザーID をキーに短時間キャッシュし、リクエストごとの検索を省略する。
+    キャッシュはユーザーの削除・役割変更・パスワード変更・プロフィール更新時に全ワーカーで即時に無効化される
+    
+    Args:
+        db: データベースセッション
+        user_id: ユーザーID（トークンの sub）
+    
+    Returns:
+        User: セッションに関連付けられたユーザー（存在しない場合はNone）
+    """
+    cached_user = auth_user_cache.get(user_id)
+    if cached_user is not None:
+        # キャッシュのコピーをセッションに関連付ける（SELECT は発行しない、エンドポイントでの更新も可能）
+        return await db.merge(cached_user, load=False)
+    
+    cache_generation = auth_user_cache.generation
+    result = await db.execute(
+        select(User).where(
+            User.id == int(user_id),
+            User.is_deleted == False
+        )
+    )
+    user = result.scalars().first()
+    if user is not None:
+        auth_user_cache.set(user_id, _detached_copy(user), cache_generation)
+    return user
+
+
+async def get_token_user(db: AsyncSession, token_payload: TokenPayload) -> Optional[User]:
+    """
+    トークンの sub に対応する（削除されていない）ユーザーを取得（get_cached_user() を使用）
+    
+    Args:
+        db: データベースセッション
+        token_payload: 検証済みのトークンペイロード
+    
+    Returns:
+        User: セッションに関連付けられたユーザー（存在しない場合はNone）
+    """
+    return await get_cached_user(db, token_payload.sub)
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     現在のユーザーを取得（依存性注入用）
     
+    ユーザー情報は get_token_user() のキャッシュから取得し、
+    ver クレームがユーザーのトークンバージョンと一致しないトークン（無効化済み）は拒否する
+    
     Args:
         credentials: HTTP認証情報
         db: データベースセッション
@@ -143,39 +244,72 @@ def get_current_user(
     Raises:
         HTTPException: 認証失敗時
     """
-    token = credentials.credentials
+    # 認証の所要時間を Server-Timing の auth に計上
+    with timing_phase("auth"):
+        token = credentials.credentials
     
-    # トークンを検証
-    token_payload = verify_token(token)
-    if not token_payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="無効なトークンです",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        # トークンを検証
+        token_payload = verify_token(token)
+        if not token_payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="無効なトークンです",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
     
-    # トークンの有効期限をチェック
-    if datetime.now(timezone.utc) > token_payload.exp:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="トークンの有効期限が切れています",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        # トークンの有効期限をチェック
+        if datetime.now(timezone.utc) > token_payload.exp:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="トークンの有効期限が切れています",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
     
-    # データベースからユーザーを取得
-    user = db.query(User).filter(
-        User.id == int(token_payload.sub),
-        User.is_deleted == False
-    ).first()
+        # ユーザーを取得（キャッシュ優先）
+        user = await get_token_user(db, token_payload)
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="ユーザーが見つかりません",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="ユーザーが見つかりません",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
     
-    return user
+        # 削除・役割変更・パスワード変更後のトークンを拒否
+        if user.token_version != token_payload.ver:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="トークンは無効化されています。再度ログインしてください",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    
+        return user
+
+
+async def invalidate_cached_user(db: AsyncSession, user: User) -> None:
+    """
+    ユーザーの認証キャッシュを無効化（commit の前に呼び出す、コミット時に全ワーカーへ通知）
+    
+    Args:
+        db: データベースセッション
+        user: 対象ユーザー
+    """
+    await publish_invalidation(db, auth_user_cache.name, str(user.id))
+
+
+async def revoke_user_tokens(db: AsyncSession, user: User) -> None:
+    """
+    ユーザーに発行済みのアクセストークン・リフレッシュトークンをすべて無効化（commit の前に呼び出す）
+    
+    トークンバージョンを加算してセッションを失効させ、認証キャッシュも無効化する
+    
+    Args:
+        db: データベースセッション
+        user: 対象ユーザー
+    """
+    user.token_version += 1
+    await revoke_user_sessions(db, user.id)
+    await invalidate_cached_user(db, user)
 
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -0,0 +1,132 @@
+"""
+キーセットページネーション（カーソル方式）関連機能
+"""
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+# 1ページあたりの件数（cursor のみ指定された場合のデフォルト値と上限）
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+# 次ページのカーソルを返すレスポンスヘッダー
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# ソートキー: (カラム, 降順かどうか)
+SortKey = Tuple[Any, bool]
+
+
+def _encode_value(value: Any) -> Any:
+    """カーソル値を JSON 化可能な形式に変換"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, time):
+        return {"t": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """JSON からカーソル値を復元"""
+    if isinstance(value, dict) and len(value) == 1:
+        (tag, text), = value.items()
+        if tag == "dt":
+            return datetime.fromisoformat(text)
+        if tag == "d":
+            return date.fromisoformat(text)
+        if tag == "t":
+            return time.fromisoformat(text)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """ソートキーの値からカーソル文字列を生成"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[SortKey]) -> List[Any]:
+    """
+    カーソル文字列をソートキーの値に復元
+
+    Raises:
+        HTTPException: カーソルが不正な場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = [_decode_value(v) for v in json.loads(base64.urlsafe_b64decode(padded))]
+        if len(values) != len(sort_keys):
+            raise ValueError("cursor length mismatch")
+        for value, (column, _) in zip(values, sort_keys):
+            if not isinstance(value, column.type.python_type):
+                raise ValueError("cursor type mismatch")
+        return values
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルの形式が正しくありません"
+        )
+
+
+def keyset_condition(sort_keys: Sequence[SortKey], values: Sequence[Any]):
+    """
+    カーソル位置より後ろの行を表す条件式を生成（昇順・降順の混在に対応）
+
+    例: (a DESC, b ASC) の場合
+        a < :a OR (a = :a AND b > :b)
+    """
+    clauses = []
+    for i, ((column, descending), value) in enumerate(zip(sort_keys, values)):
+        equal_prefix = [c == v for (c, _), v in zip(sort_keys[:i], values[:i])]
+        after = column < value if descending else column > value
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+class KeysetPage:
+    """
+    キーセットページネーション
+
+    limit と cursor がどちらも指定されない場合は無効となり、従来どおり全件を返す（互換モード）
+    """
+
+    def __init__(self, sort_keys: Sequence[SortKey], limit: Optional[int], cursor: Optional[str]):
+        self.sort_keys = list(sort_keys)
+        self.enabled = limit is not None or cursor is not None
+        self.limit = limit or DEFAULT_PAGE_LIMIT
+        self.after = decode_cursor(cursor, self.sort_keys) if cursor else None
+
+    def apply(self, query):
+        """クエリにソート・カーソル条件・件数制限を適用"""
+        if not self.enabled:
+            return query
+        query = query.order_by(None).order_by(
+            *[column.desc() if descending else column.asc() for column, descending in self.sort_keys]
+        )
+        if self.after is not None:
+            query = query.where(keyset_condition(self.sort_keys, self.after))
+        # 次ページの有無を判定するため 1 件多く取得する
+        return query.limit(self.limit + 1)
+
+    def finish(self, rows: Sequence, key_of: Callable[[Any], Sequence[Any]], response: Response) -> List:
+        """
+        取得結果を 1 ページ分に切り詰め、次ページのカーソルをレスポンスヘッダーに設定
+
+        Args:
+            rows: apply() を適用したクエリの結果
+            key_of: 行からソートキーの値を取り出す関数
+            response: レスポンス
+
+        Returns:
+            1 ページ分の行
+        """
+        rows = list(rows)
+        if self.enabled and len(rows) > self.limit:
+            rows = rows[:self.limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key_of(rows[-1]))
+        return rows
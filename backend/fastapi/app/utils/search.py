@@ -0,0 +1,90 @@
+"""
+部分一致検索関連機能
+
+検索対象の列と検索語はどちらもデータベース関数 search_normalize（NFKC 正規化 + 小文字化）で正規化して比較する。
+検索対象の列ごとに search_bigrams（正規化後の 2 文字の組の配列）を生成列として保存しており、
+その GIN インデックスで検索語の組をすべて含む行に絞り込んだ後、LIKE で部分一致を確認する。
+前方一致（自動補全）は式インデックス search_normalize(列) COLLATE "C" の範囲検索で行う
+"""
+import unicodedata
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import Text, and_, func, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+# 1 回の検索で使用する検索語（空白区切り）の上限
+MAX_SEARCH_TERMS = 5
+
+# 前方一致の範囲検索の上限に付加する文字（Unicode の最大コードポイント）
+_PREFIX_UPPER_BOUND = "\U0010ffff"
+
+
+def search_terms(query: str) -> List[str]:
+    """
+    検索文字列を NFKC 正規化して空白（全角空白を含む）で分割
+
+    1 文字の検索語はインデックスで絞り込めないため、2 文字以上の検索語を少なくとも 1 つ必要とする
+
+    Raises:
+        HTTPException: 検索語がない場合、すべての検索語が 1 文字の場合
+    """
+    terms = list(dict.fromkeys(unicodedata.normalize("NFKC", query).split()))[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="検索キーワードを入力してください"
+        )
+    if all(len(term) < 2 for term in terms):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="検索キーワードは2文字以上で入力してください"
+        )
+    return terms
+
+
+def _escape_like(term: str) -> str:
+    """LIKE のワイルドカード文字をエスケープ"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def text_contains(column, bigrams, term: str) -> ColumnElement:
+    """
+    列が検索語を含む条件
+
+    Args:
+        column: 検索対象の列
+        bigrams: column の 2 文字の組を保存した生成列（GIN インデックス対象）
+        term: 検索語（search_terms で分割済み）
+
+    1 文字の検索語は 2 文字の組がないため、インデックスを使わず LIKE のみで判定する
+    """
+    # 検索語はワイルドカードをエスケープしてから、列と同じ関数で小文字化する
+    condition = func.search_normalize(column).like(
+        func.lower(literal(f"%{_escape_like(term)}%")), escape="\\"
+    )
+    if len(term) < 2:
+        return condition
+    return and_(bigrams.op("@>")(func.search_bigrams(literal(term))), condition)
+
+
+def text_similarity(bigrams, query: str) -> ColumnElement:
+    """2 文字の組の生成列と検索文字列の類似度（Jaccard 係数、0〜1）"""
+    return func.coalesce(func.bigram_similarity(func.search_bigrams(literal(query)), bigrams), 0)
+
+
+def prefix_key(column) -> ColumnElement:
+    """前方一致検索と並べ替えに使用する式（式インデックスと同じ search_normalize(列) COLLATE "C"）"""
+    return func.search_normalize(column, type_=Text).collate("C")
+
+
+def text_startswith(column, prefix: str) -> ColumnElement:
+    """
+    列が検索語で始まる条件
+
+    LIKE 'xxx%' はパラメータ化すると汎用プランでインデックスの範囲を決められないため、
+    正規化した検索語以上・検索語 + 最大コードポイント未満の範囲条件にする（C 照合順序ではコードポイント順）
+    """
+    key = prefix_key(column)
+    lower_bound = func.search_normalize(literal(prefix), type_=Text)
+    return and_(key >= lower_bound, key < lower_bound.concat(_PREFIX_UPPER_BOUND))
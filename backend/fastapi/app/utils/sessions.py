@@ -0,0 +1,165 @@
+"""
+リフレッシュトークン（ログインセッション）関連機能
+
+リフレッシュトークンはランダムな文字列で、データベースには SHA-256 ハッシュのみを保存する。
+アクセストークンの再発行はトークンハッシュの一意インデックスによる 1 回の UPDATE で判定し、
+パスワードハッシュの計算は行わない
+"""
+import hashlib
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+from app.models.session import UserSession
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_token(refresh_token: str) -> str:
+    """リフレッシュトークンの SHA-256 ハッシュ（16進）"""
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def create_session(db: AsyncSession, user: User, family_id: Optional[str] = None) -> str:
+    """
+    リフレッシュトークンを発行してセッションに追加（commit は呼び出し側で行う）
+
+    Args:
+        db: データベースセッション
+        user: 対象ユーザー
+        family_id: ローテーション元の系列ID（ログイン時は None で新しい系列を作成）
+
+    Returns:
+        str: リフレッシュトークン（クライアントに返す値、データベースには保存しない）
+    """
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(UserSession(
+        user_id=user.id,
+        family_id=family_id or uuid.uuid4().hex,
+        token_hash=_hash_token(refresh_token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return refresh_token
+
+
+async def rotate_session(db: AsyncSession, refresh_token: str) -> Optional[Row]:
+    """
+    リフレッシュトークンを使用済み（ローテーション済み）にする（commit は呼び出し側で行う）
+
+    有効なトークンの場合のみ 1 行が更新されるため、同じトークンで同時にリフレッシュしても成功するのは 1 回のみ。
+    猶予時間を過ぎたローテーション済みトークンの再利用は盗用とみなし、同じ系列のセッションをすべて失効させる
+
+    Args:
+        db: データベースセッション
+        refresh_token: クライアントから受け取ったリフレッシュトークン
+
+    Returns:
+        Row: (user_id, family_id)（無効なトークンの場合は None）
+    """
+    token_hash = _hash_token(refresh_token)
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(UserSession)
+        .where(
+            UserSession.token_hash == token_hash,
+            UserSession.rotated_at.is_(None),
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > now
+        )
+        .values(rotated_at=now)
+        .returning(UserSession.user_id, UserSession.family_id)
+        .execution_options(synchronize_session=False)
+    )
+    session = result.first()
+    if session is not None:
+        return session
+
+    # 再利用の検知（猶予時間内は複数タブからの同時リフレッシュとみなして拒否のみ）
+    reused = (await db.execute(
+        select(UserSession.user_id, UserSession.family_id).where(
+            UserSession.token_hash == token_hash,
+            UserSession.rotated_at < now - timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS),
+            UserSession.revoked_at.is_(None)
+        )
+    )).first()
+    if reused is not None:
+        logger.warning(f"ローテーション済みリフレッシュトークンの再利用を検知しました: ユーザーID {reused.user_id}")
+        await revoke_session_family(db, reused.family_id)
+    return None
+
+
+async def revoke_session_family(db: AsyncSession, family_id: str) -> None:
+    """同じ系列（1 回のログイン）のセッションをすべて失効（commit は呼び出し側で行う）"""
+    await db.execute(
+        update(UserSession)
+        .where(UserSession.family_id == family_id, UserSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def revoke_session(db: AsyncSession, refresh_token: str) -> None:
+    """リフレッシュトークンの系列を失効（ログアウト用、commit は呼び出し側で行う）"""
+    family_id = await db.scalar(
+        select(UserSession.family_id).where(UserSession.token_hash == _hash_token(refresh_token))
+    )
+    if family_id is not None:
+        await revoke_session_family(db, family_id)
+
+
+async def revoke_user_sessions(db: AsyncSession, user_id: int) -> None:
+    """ユーザーのセッションをすべて失効（commit は呼び出し側で行う）"""
+    await db.execute(
+        update(UserSession)
+        .where(UserSession.user_id == user_id, UserSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def sweep_expired_sessions() -> int:
+    """
+    期限切れのセッションを削除（expires_at のインデックスを使用し、一定件数ずつコミット）
+
+    Returns:
+        int: 削除した行数
+    """
+    deleted = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            expired = (
+                select(UserSession.id)
+                .where(UserSession.expires_at < datetime.now(timezone.utc))
+                .order_by(UserSession.expires_at)
+                .limit(settings.SESSION_SWEEP_BATCH_SIZE)
+            )
+            result = await db.execute(
+                delete(UserSession)
+                .where(UserSession.id.in_(expired.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < settings.SESSION_SWEEP_BATCH_SIZE:
+            if deleted:
+                logger.info(f"期限切れのセッションを {deleted} 件削除しました")
+            return deleted
+
+
+# プロセス単位のインスタンス（アプリケーションの lifespan で開始・停止）
+session_sweeper = PeriodicTask(
+    "session-sweeper",
+    sweep_expired_sessions,
+    settings.SESSION_SWEEP_INTERVAL,
+    error_message="期限切れセッションの削除エラー"
+)
@@ -0,0 +1,65 @@
+"""
+認証付きリクエストのスループット
+
+計測用ユーザー --users 人でログインし、認証だけを行うエンドポイント（既定は GET /users/check-auth）に
+ユーザーを順番に切り替えながらリクエストを送って req/s と p50・p99 レイテンシーを表示する。
+計測後に GET /diagnostics/cache の認証ユーザーキャッシュ（auth_users）のヒット率を表示する。
+キャッシュなしとの比較は、サーバーを AUTH_CACHE_TTL_SECONDS=0 で起動して同じスクリプトを実行する
+
+実行例:
+    python -m benchmarks.bench_auth --base-url http://127.0.0.1:8000 --concurrency 32 --requests 4000
+"""
+import asyncio
+
+from benchmarks.common import API_PREFIX, BenchData, argument_parser, http_client, login, run_load
+
+DEFAULT_PATH = f"{API_PREFIX}/users/check-auth"
+
+
+async def _auth_cache_stats(client, headers) -> dict:
+    response = await client.get(f"{API_PREFIX}/diagnostics/cache", headers=headers)
+    response.raise_for_status()
+    return next(cache for cache in response.json()["caches"] if cache["name"] == "auth_users")
+
+
+async def main() -> None:
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--path", default=DEFAULT_PATH, help="計測するパス")
+    parser.add_argument("--concurrency", type=int, default=32, help="同時接続数")
+    parser.add_argument("--requests", type=int, default=4000, help="リクエスト数")
+    parser.add_argument("--users", type=int, default=50, help="リクエストするユーザー数")
+    args = parser.parse_args()
+
+    data = BenchData()
+    try:
+        students = await data.users(args.users)
+        admin = (await data.users(1, "admin"))[0]
+
+        async with http_client(args.base_url, args.concurrency) as client:
+            headers = [await login(client, student) for student in students]
+            admin_headers = await login(client, admin)
+
+            async def send(index):
+                return await client.get(args.path, headers=headers[index % len(headers)])
+
+            # 接続の確立を計測から除く
+            await run_load(send, len(headers), min(len(headers), args.concurrency))
+            before = await _auth_cache_stats(client, admin_headers)
+
+            result = await run_load(send, args.requests, args.concurrency)
+            after = await _auth_cache_stats(client, admin_headers)
+
+        hits = after["hits"] - before["hits"]
+        lookups = hits + after["misses"] - before["misses"]
+        print(f"{args.base_url}{args.path}  {args.requests} リクエスト  同時接続 {args.concurrency}  ユーザー {args.users} 人")
+        print(f"  {result}")
+        print(
+            f"  認証ユーザーキャッシュ: {'有効' if after['enabled'] else '無効'}  "
+            f"ヒット {hits} / {lookups}" + (f" ({hits / lookups:.1%})" if lookups else "")
+        )
+    finally:
+        await data.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+同時リクエスト数ごとのスループット
+
+講師ごとの講座一覧（GET /lectures/my-lectures、認証あり・キャッシュなしで毎回データベースを読む）に
+同時接続数を変えてリクエストを送り、req/s と p50・p99 レイテンシーを表示する。
+データベース I/O がイベントループを止める実装では、同時接続数を増やしてもスループットが伸びず p99 だけが悪化する
+
+実行例:
+    python -m benchmarks.bench_concurrency --base-url http://127.0.0.1:8000 --concurrency 1 8 32 64
+"""
+import asyncio
+
+from benchmarks.common import API_PREFIX, BenchData, argument_parser, http_client, login, run_load
+
+DEFAULT_PATH = f"{API_PREFIX}/lectures/my-lectures"
+
+
+async def main() -> None:
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--path", default=DEFAULT_PATH, help="計測するパス（計測用の講師でリクエストする）")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64], help="同時接続数")
+    parser.add_argument("--requests", type=int, default=2000, help="同時接続数ごとのリクエスト数")
+    parser.add_argument("--teachers", type=int, default=50, help="講師数（リクエストは講師に順番に割り当てる）")
+    parser.add_argument("--lectures-per-teacher", type=int, default=20, help="講師ごとの講座数")
+    args = parser.parse_args()
+
+    data = BenchData()
+    try:
+        teachers = await data.users(args.teachers, "teacher")
+        await data.lectures(teachers, args.lectures_per_teacher)
+
+        async with http_client(args.base_url, max(args.concurrency)) as client:
+            headers = [await login(client, teacher) for teacher in teachers]
+
+            async def send(index):
+                return await client.get(args.path, headers=headers[index % len(headers)])
+
+            # 接続の確立・初回のクエリ準備を計測から除く
+            await run_load(send, len(headers), min(len(headers), max(args.concurrency)))
+
+            print(f"{args.base_url}{args.path}  {args.requests} リクエスト")
+            for concurrency in args.concurrency:
+                result = await run_load(send, args.requests, concurrency)
+                print(f"  同時接続 {concurrency:4d}: {result}")
+    finally:
+        await data.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+予約エクスポート（GET /bookings/export）の大量データ
+
+計測用の予約を --rows 件（既定 100 万件）作成し、CSV と NDJSON でそれぞれ全件をエクスポートして
+所要時間・最初のデータまでの時間・件数を表示する。--server-pid を指定するとサーバープロセスの
+常駐メモリ（RSS）を計測中に監視し、開始前と最大値を表示する（件数に関係なくほぼ一定であること）
+
+実行例:
+    python -m benchmarks.bench_export --base-url http://127.0.0.1:8000 --server-pid $(pgrep -f "uvicorn main:app")
+"""
+import asyncio
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.db.database import async_engine
+from benchmarks.common import API_PREFIX, BenchData, analyze, argument_parser, http_client, login
+
+# 講座ごと・日ごとの予約件数（受講者は 1 日に 1 件だけ予約するため、受講者数は講座数 × この件数）
+BOOKINGS_PER_SCHEDULE = 100
+# 1 回の INSERT で作成する日数
+DAYS_PER_BATCH = 10
+# 既存のデータと重ならないよう、予約日は今日からこの日数後以降にする
+FIRST_DAY_OFFSET = 400
+
+
+def _rss_kib(pid: int) -> Optional[int]:
+    """プロセスの常駐メモリ（KiB）"""
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return None
+
+
+async def _seed(data: BenchData, rows: int, lecture_count: int) -> tuple:
+    """予約を rows 件作成して予約日の範囲を返す"""
+    teachers = await data.users(10, "teacher")
+    lecture_ids = await data.lectures(teachers, lecture_count // len(teachers))
+    students = await data.users(len(lecture_ids) * BOOKINGS_PER_SCHEDULE)
+    student_ids = [student["id"] for student in students]
+    days = -(-rows // len(student_ids))
+    first_day = date.today() + timedelta(days=FIRST_DAY_OFFSET)
+
+    for batch_start in range(0, days, DAYS_PER_BATCH):
+        batch_days = min(DAYS_PER_BATCH, days - batch_start)
+        async with async_engine.begin() as conn:
+            # 講座 l の予約可能時間を受講者 (l - 1) * BOOKINGS_PER_SCHEDULE + k が予約する（受講者ごとに 1 日 1 件）
+            await conn.execute(
+                text(
+                    "WITH schedules AS ("
+                    "  INSERT INTO lecture_schedules (lecture_id, teacher_id, booking_date, start_time, end_time, capacity, booked_count) "
+                    "  SELECT l.id, l.teacher_id, CAST(:first_day AS DATE) + d, TIME '10:00', TIME '11:00', :per_schedule, :per_schedule "
+                    "  FROM lectures l, generate_series(CAST(:from_day AS INTEGER), CAST(:to_day AS INTEGER)) d "
+                    "  WHERE l.id = ANY(:lecture_ids) "
+                    "  RETURNING id, lecture_id, teacher_id, booking_date, start_time, end_time"
+                    ") "
+                    "INSERT INTO lecture_bookings (user_id, lecture_id, teacher_id, schedule_id, status, booking_date, start_time, end_time) "
+                    "SELECT (CAST(:student_ids AS INTEGER[]))[(o.position - 1) * :per_schedule + k + 1], "
+                    "s.lecture_id, s.teacher_id, s.id, CASE WHEN k % 10 = 0 THEN 'confirmed' ELSE 'pending' END, "
+                    "s.booking_date, s.start_time, s.end_time "
+                    "FROM schedules s "
+                    "JOIN unnest(CAST(:lecture_ids AS INTEGER[])) WITH ORDINALITY AS o(lecture_id, position) "
+                    "ON o.lecture_id = s.lecture_id, "
+                    "generate_series(0, :per_schedule - 1) k"
+                ),
+                {
+                    "first_day": first_day, "from_day": batch_start, "to_day": batch_start + batch_days - 1,
+                    "per_schedule": BOOKINGS_PER_SCHEDULE, "lecture_ids": lecture_ids, "student_ids": student_ids
+                }
+            )
+        created = min(days, batch_start + batch_days) * len(student_ids)
+        print(f"  予約を作成中: {created:,} / {days * len(student_ids):,} 件", flush=True)
+
+    await analyze("lecture_schedules", "lecture_bookings")
+    return first_day, first_day + timedelta(days=days - 1)
+
+
+async def main() -> None:
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="作成する予約件数（受講者数の倍数に切り上げる）")
+    parser.add_argument("--lectures", type=int, default=100, help="講座数")
+    parser.add_argument("--server-pid", type=int, help="常駐メモリを監視するサーバーのプロセスID")
+    args = parser.parse_args()
+
+    data = BenchData()
+    try:
+        print(f"予約を {args.rows:,} 件作成します")
+        started = time.perf_counter()
+        date_from, date_to = await _seed(data, args.rows, args.lectures)
+        admin = (await data.users(1, "admin"))[0]
+        print(f"  作成完了: {time.perf_counter() - started:.1f} s")
+
+        async with http_client(args.base_url, timeout=3600) as client:
+            headers = await login(client, admin)
+            for export_format in ("csv", "ndjson"):
+                params = {"format": export_format, "date_from": date_from.isoformat(), "date_to": date_to.isoformat()}
+                rss_before = _rss_kib(args.server_pid) if args.server_pid else None
+                rss_peak = rss_before or 0
+                first_byte = None
+                size = lines = 0
+                last_sample = started = time.perf_counter()
+                async with client.stream("GET", f"{API_PREFIX}/bookings/export", params=params, headers=headers) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        if first_byte is None:
+                            first_byte = time.perf_counter() - started
+                        size += len(chunk)
+                        lines += chunk.count(b"\n")
+                        if args.server_pid and time.perf_counter() - last_sample >= 0.1:
+                            rss_peak = max(rss_peak, _rss_kib(args.server_pid))
+                            last_sample = time.perf_counter()
+                elapsed = time.perf_counter() - started
+
+                # CSV はヘッダー行を除く
+                rows = lines - 1 if export_format == "csv" else lines
+                print(
+                    f"{export_format:6}: {rows:,} 件 {size / 1024 / 1024:.0f} MiB  {elapsed:.1f} s "
+                    f"({rows / elapsed:,.0f} 件/s)  最初のデータまで {first_byte * 1000:.0f} ms"
+                )
+                if rss_before:
+                    print(f"        サーバーの RSS: 開始前 {rss_before / 1024:.0f} MiB  最大 {rss_peak / 1024:.0f} MiB")
+    finally:
+        print("計測用のデータを削除します")
+        await data.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+予約可能時間の一括削除（DELETE /schedules/lecture/{id}/all と DELETE /schedules/date/{date}）
+
+計測用の講師に次の予約可能時間を作成し、それぞれの一括削除の時間と削除件数を表示する
+（既定の --slots 10000 の場合）:
+- 講座 A: 10 日 × 1,000 枠（1 分刻み）を DELETE /schedules/lecture/{A}/all で削除
+- 講座 B1〜B10: 同じ 1 日に 1,000 枠ずつを DELETE /schedules/date/{日付} で削除
+別の講座 C（1 日 × 1,000 枠、うち 1 枠に予約あり）で、予約のある枠が 1 つでもあれば 400 で何も削除しないことも確認する。
+サーバーを SERVER_TIMING_ENABLED=true で起動すると Server-Timing ヘッダー（SQL 文数など）も表示する
+
+実行例:
+    python -m benchmarks.bench_schedule_delete --base-url http://127.0.0.1:8000 --slots 10000
+"""
+import asyncio
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.db.database import async_engine
+from benchmarks.common import API_PREFIX, BenchData, analyze, argument_parser, http_client, login
+
+# 1 日あたりの枠数（00:00 から 1 分刻み、各 50 秒）
+SLOTS_PER_DAY = 1000
+# 既存のデータと重ならないよう、対象日は今日からこの日数後以降にする
+FIRST_DAY_OFFSET = 30
+
+
+async def _insert_slots(lecture_ids, teacher, first_day: date, days: int) -> None:
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO lecture_schedules (lecture_id, teacher_id, booking_date, start_time, end_time) "
+                "SELECT l, :teacher_id, CAST(:first_day AS DATE) + d, "
+                "TIME '00:00' + m * INTERVAL '1 minute', TIME '00:00' + m * INTERVAL '1 minute' + INTERVAL '50 second' "
+                "FROM unnest(CAST(:lecture_ids AS INTEGER[])) l, generate_series(0, :days - 1) d, "
+                "generate_series(0, :slots_per_day - 1) m"
+            ),
+            {
+                "teacher_id": teacher["id"], "first_day": first_day, "lecture_ids": lecture_ids,
+                "days": days, "slots_per_day": SLOTS_PER_DAY
+            }
+        )
+
+
+async def _active_slots(lecture_ids) -> int:
+    async with async_engine.connect() as conn:
+        return await conn.scalar(
+            text("SELECT count(*) FROM lecture_schedules WHERE lecture_id = ANY(:ids) AND NOT is_expired"),
+            {"ids": lecture_ids}
+        )
+
+
+async def main() -> None:
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--slots", type=int, default=10000, help="1 回の削除で対象にする枠数（1,000 の倍数）")
+    args = parser.parse_args()
+    groups = max(1, args.slots // SLOTS_PER_DAY)
+
+    data = BenchData()
+    try:
+        teacher = (await data.users(1, "teacher"))[0]
+        lecture_a, lecture_c, *lectures_b = await data.lectures([teacher], 2 + groups)
+        day = date.today() + timedelta(days=FIRST_DAY_OFFSET)
+        # 講座 A は翌日から groups 日分、講座 B1〜 は day の 1 日分、講座 C は前日の 1 日分
+        await _insert_slots([lecture_a], teacher, day + timedelta(days=1), groups)
+        await _insert_slots(lectures_b, teacher, day, 1)
+        await _insert_slots([lecture_c], teacher, day - timedelta(days=1), 1)
+        await analyze("lecture_schedules")
+
+        async with http_client(args.base_url, timeout=600) as client:
+            headers = await login(client, teacher)
+
+            # 予約のある枠が含まれる場合は 400 で何も削除しない
+            async with async_engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        "UPDATE lecture_schedules SET booked_count = 1 WHERE id = ("
+                        "SELECT id FROM lecture_schedules WHERE lecture_id = :id ORDER BY start_time DESC LIMIT 1)"
+                    ),
+                    {"id": lecture_c}
+                )
+            response = await client.delete(f"{API_PREFIX}/schedules/lecture/{lecture_c}/all", headers=headers)
+            print(f"予約のある枠を含む削除: {response.status_code}  残り {await _active_slots([lecture_c]):,} 件")
+
+            for label, path in (
+                (f"lecture/{{id}}/all  {groups} 日 × {SLOTS_PER_DAY}", f"/schedules/lecture/{lecture_a}/all"),
+                (f"date/{{date}}  {len(lectures_b)} 講座 × {SLOTS_PER_DAY}", f"/schedules/date/{day.isoformat()}"),
+            ):
+                started = time.perf_counter()
+                response = await client.delete(f"{API_PREFIX}{path}", headers=headers)
+                elapsed = time.perf_counter() - started
+                response.raise_for_status()
+                server_timing = response.headers.get("server-timing")
+                print(
+                    f"{label}: 削除 {response.json().get('deleted_count'):,} 件  {elapsed * 1000:.0f} ms"
+                    + (f"\n  Server-Timing: {server_timing}" if server_timing else "")
+                )
+        print(f"削除後の有効な枠（講座 A・B）: {await _active_slots([lecture_a, *lectures_b])} 件")
+    finally:
+        await data.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
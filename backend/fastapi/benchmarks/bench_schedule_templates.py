@@ -0,0 +1,67 @@
+"""
+繰り返しスケジュールテンプレートの展開
+
+講師 --teachers 人（既定 1,000 人）に講座を 1 件ずつ作成し、それぞれ月・水・金の 1 年分のテンプレートを登録して、
+materialize_schedule_templates で 1 年分を展開する時間と作成した予約可能時間の件数を表示する。
+続けて展開済みの状態でもう一度実行し、展開するものがない場合の時間を表示する。
+サーバーの定期展開と重ならないよう、テンプレートの登録と展開は同じトランザクションで行う
+
+実行例:
+    python -m benchmarks.bench_schedule_templates --teachers 1000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.db.database import AsyncSessionLocal
+from app.db.schedule_templates import materialize_schedule_templates
+from benchmarks.common import BenchData
+
+# 月・水・金（ISO 曜日）
+WEEKDAYS = [1, 3, 5]
+HORIZON_DAYS = 365
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teachers", type=int, default=1000, help="講師数（講師ごとに講座とテンプレートを 1 件作成）")
+    args = parser.parse_args()
+
+    data = BenchData()
+    try:
+        teachers = await data.users(args.teachers, "teacher")
+        lecture_ids = await data.lectures(teachers)
+        start_date = date.today()
+        end_date = start_date + timedelta(days=HORIZON_DAYS - 1)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                text(
+                    "INSERT INTO schedule_templates (lecture_id, teacher_id, weekdays, start_date, end_date, start_time, end_time) "
+                    "SELECT l.id, l.teacher_id, CAST(:weekdays AS SMALLINT[]), :start_date, :end_date, TIME '10:00', TIME '11:00' "
+                    "FROM lectures l WHERE l.id = ANY(:lecture_ids)"
+                ),
+                {"weekdays": WEEKDAYS, "start_date": start_date, "end_date": end_date, "lecture_ids": lecture_ids}
+            )
+            started = time.perf_counter()
+            created = await materialize_schedule_templates(db, horizon_days=HORIZON_DAYS)
+            elapsed = time.perf_counter() - started
+            await db.commit()
+        print(f"講師 {args.teachers} 人 × 月・水・金 {HORIZON_DAYS} 日分")
+        print(f"  展開: {created:,} 件 {elapsed:.1f} s ({created / elapsed:,.0f} 件/s)")
+
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            created = await materialize_schedule_templates(db, horizon_days=HORIZON_DAYS)
+            elapsed = time.perf_counter() - started
+            await db.commit()
+        print(f"  展開済みで再実行: {created} 件 {elapsed * 1000:.0f} ms")
+    finally:
+        await data.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+講座検索（GET /lectures/search）の大規模カタログ
+
+講師 --teachers 人（既定 500 人、日本語・英語の氏名）と講座 --lectures 件（既定 10 万件）を作成する。
+講座名は日本語・英語・全角英字を混ぜ、説明は 40〜200 文字にする。
+そのうえで検索語ごとに該当件数とレイテンシー（中央値・最大）を表示する
+
+実行例:
+    python -m benchmarks.bench_search --base-url http://127.0.0.1:8000 --lectures 100000
+"""
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.db.database import async_engine
+from benchmarks.common import API_PREFIX, BenchData, analyze, argument_parser, http_client
+
+# （検索文字列, 追加のクエリパラメーター）
+QUERIES = [
+    ("機械学習", {}),
+    ("python 入門", {}),
+    ("ｐｙｔｈｏｎ", {}),
+    ("カメラ", {}),
+    ("佐藤 ヨガ", {}),
+    ("徹底解説", {"approval_status": "approved"}),
+    ("ポートフォリオ 簿記", {}),
+    ("emily", {}),
+    ("存在しない講座名", {}),
+]
+
+# 講座名・説明・講師名の材料（setseed で毎回同じデータを作る）
+_SEED_SQL = """
+WITH words AS (
+    SELECT
+        ARRAY['機械学習', 'Python', 'ｐｙｔｈｏｎ', 'カメラ', 'ヨガ', '簿記', '英会話', 'データ分析', 'ポートフォリオ',
+              '料理', 'プログラミング', '写真', 'マーケティング', '投資', 'デザイン', 'ギター', 'Excel', 'ＴＯＥＩＣ'] AS topics,
+        ARRAY['入門', '徹底解説', '基礎講座', '実践', '上級', '短期集中', 'for Beginners', 'Masterclass'] AS suffixes,
+        ARRAY['初めての方でも安心して学べます。', '実務で使える知識を身につけます。', 'Hands-on exercises every week.',
+              '少人数制で丁寧に指導します。', '資格試験の対策にも対応しています。', 'オンラインで受講できます。'] AS sentences
+)
+INSERT INTO lectures (teacher_id, lecture_title, lecture_description, approval_status)
+SELECT
+    (CAST(:teacher_ids AS INTEGER[]))[1 + floor(random() * cardinality(CAST(:teacher_ids AS INTEGER[])))::int],
+    topics[1 + floor(random() * cardinality(topics))::int] || ' ' || suffixes[1 + floor(random() * cardinality(suffixes))::int]
+        || ' 第' || g || '回',
+    (SELECT string_agg(sentence, '') FROM (
+        SELECT sentences[1 + floor(random() * cardinality(sentences))::int] AS sentence FROM generate_series(1, 2 + g % 9)
+     ) picked),
+    (ARRAY['approved', 'approved', 'approved', 'pending', 'rejected'])[1 + g % 5]
+FROM words, generate_series(1, :count) g
+RETURNING id
+"""
+
+_TEACHER_NAMES_SQL = """
+UPDATE user_infos u
+SET name = CASE WHEN n.i % 7 = 0
+    THEN (ARRAY['Emily', 'James', 'Olivia', 'Liam', 'Sophia'])[1 + n.i / 7 % 5] || ' ' ||
+         (ARRAY['Smith', 'Johnson', 'Brown', 'Taylor', 'Wilson'])[1 + n.i / 35 % 5]
+    ELSE (ARRAY['佐藤', '鈴木', '高橋', '田中', '伊藤', '渡辺', '山本', '中村', '小林', '加藤'])[1 + n.i % 10] ||
+         (ARRAY['花子', '太郎', '美咲', '健太', '由美', '翔太', '陽子', '大輔'])[1 + n.i / 10 % 8]
+    END
+FROM unnest(CAST(:teacher_ids AS INTEGER[])) WITH ORDINALITY AS n(id, i)
+WHERE u.id = n.id
+"""
+
+
+async def _seed(data: BenchData, teacher_count: int, lecture_count: int) -> None:
+    teachers = await data.users(teacher_count, "teacher")
+    teacher_ids = [teacher["id"] for teacher in teachers]
+    async with async_engine.begin() as conn:
+        await conn.execute(text("SELECT setseed(0.19)"))
+        await conn.execute(text(_TEACHER_NAMES_SQL), {"teacher_ids": teacher_ids})
+        lecture_ids = (await conn.scalars(
+            text(_SEED_SQL), {"teacher_ids": teacher_ids, "count": lecture_count}
+        )).all()
+    data.lecture_ids.extend(lecture_ids)
+    # 一括登録した行が GIN インデックスの保留リストに残ったままだと計画・性能が実運用と異なるため、計測前に VACUUM する
+    await analyze("lectures", "user_infos")
+
+
+async def main() -> None:
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--lectures", type=int, default=100_000, help="作成する講座数")
+    parser.add_argument("--teachers", type=int, default=500, help="作成する講師数")
+    parser.add_argument("--repeat", type=int, default=20, help="検索語ごとのリクエスト数")
+    args = parser.parse_args()
+
+    data = BenchData()
+    try:
+        print(f"講師 {args.teachers} 人・講座 {args.lectures:,} 件を作成します")
+        started = time.perf_counter()
+        await _seed(data, args.teachers, args.lectures)
+        print(f"  作成完了: {time.perf_counter() - started:.1f} s")
+
+        async with http_client(args.base_url) as client:
+            for query, extra in QUERIES:
+                params = {"q": query, **extra}
+                response = await client.get(f"{API_PREFIX}/lectures/search", params=params)
+                response.raise_for_status()
+                latencies = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    (await client.get(f"{API_PREFIX}/lectures/search", params=params)).raise_for_status()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                label = " ".join([repr(query), *(f"{key}={value}" for key, value in extra.items())])
+                print(
+                    f"  {label:36} 該当 {response.json()['total_count']:6,} 件  "
+                    f"中央値 {statistics.median(latencies):6.1f} ms  最大 {max(latencies):6.1f} ms"
+                )
+    finally:
+        await data.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
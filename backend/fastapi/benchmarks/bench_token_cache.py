@@ -0,0 +1,64 @@
+"""
+アクセストークン検証のマイクロベンチマーク
+
+jose.jwt.decode 単体、verify_token のキャッシュミス（毎回異なるトークン）、
+verify_token のキャッシュヒット（同じトークン）の 1 回あたりの時間を表示する。
+サーバー・データベースは使用しない
+
+実行例:
+    python -m benchmarks.bench_token_cache --tokens 10000
+"""
+import argparse
+import time
+from typing import Callable, Sequence
+
+from jose import jwt
+
+from app.core.cache import token_cache
+from app.core.config import settings
+from app.utils.jwt import create_access_token, verify_token
+
+
+def _per_call_us(func: Callable[[str], object], tokens: Sequence[str], repeat: int, clear_cache: bool = False) -> float:
+    """tokens を順に func に渡し、repeat 回の計測のうち最短の 1 回あたりの時間（マイクロ秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        if clear_cache:
+            token_cache.clear()
+        started = time.perf_counter()
+        for token in tokens:
+            func(token)
+        best = min(best, time.perf_counter() - started)
+    return best / len(tokens) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=10000, help="1 回の計測で検証するトークン数（キャッシュの上限以下）")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数（最短の結果を表示）")
+    args = parser.parse_args()
+
+    if not token_cache.enabled:
+        raise SystemExit("トークンキャッシュが無効です（TOKEN_CACHE_MAX_ENTRIES が 0）")
+    if args.tokens > token_cache.max_entries:
+        raise SystemExit(f"--tokens はトークンキャッシュの上限（{token_cache.max_entries}）以下にしてください")
+
+    tokens = [create_access_token(user_id, f"user{user_id}@example.com", "student") for user_id in range(args.tokens)]
+
+    def decode(token):
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    decode_us = _per_call_us(decode, tokens, args.repeat)
+    # キャッシュミス: 計測ごとにキャッシュを空にし、異なるトークンを 1 回ずつ検証する
+    miss_us = _per_call_us(verify_token, tokens, args.repeat, clear_cache=True)
+    verify_token(tokens[0])
+    hit_us = _per_call_us(verify_token, [tokens[0]] * args.tokens, args.repeat)
+
+    print(f"トークン {args.tokens} 件 × {args.repeat} 回（最短）")
+    print(f"  jose.jwt.decode               {decode_us:8.1f} us")
+    print(f"  verify_token キャッシュミス   {miss_us:8.1f} us")
+    print(f"  verify_token キャッシュヒット {hit_us:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+ベンチマーク共通処理
+
+計測用のデータは接頭辞 bench_<16進数> 付きでデータベースに直接作成し、終了時に削除する。
+HTTP の計測は --base-url のサーバー（uvicorn など本番と同じ構成）に対して行うため、
+サーバーはベンチマークと同じデータベース（POSTGRES_* 環境変数）に接続していること
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+import httpx
+from sqlalchemy import text
+
+from app.core.security import get_password_hash
+from app.db.database import async_engine
+
+API_PREFIX = "/api/v1"
+
+# 計測用ユーザーのパスワード（ログインして実際のトークンを取得する）
+BENCH_PASSWORD = "Bench1234"
+
+
+class BenchData:
+    """計測用データの作成（作成したユーザーと講座は cleanup() で削除）"""
+
+    def __init__(self) -> None:
+        self.prefix = f"bench_{uuid.uuid4().hex[:12]}"
+        self.user_ids: List[int] = []
+        self.lecture_ids: List[int] = []
+        self._hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    async def users(self, count: int, role: str = "student") -> List[Dict]:
+        """ユーザーを count 人作成（講師の場合は講師プロフィールも作成）"""
+        async with async_engine.begin() as conn:
+            rows = (await conn.execute(
+                text(
+                    "INSERT INTO user_infos (name, email, hashed_password, role) "
+                    "SELECT CAST(:name AS TEXT) || g, CAST(:name AS TEXT) || g || '@example.com', :password, :role "
+                    "FROM generate_series(CAST(:first AS INTEGER), CAST(:last AS INTEGER)) g "
+                    "RETURNING id, name, email, role"
+                ),
+                {
+                    "name": f"{self.prefix}_{role}", "password": self._hashed_password, "role": role,
+                    "first": len(self.user_ids) + 1, "last": len(self.user_ids) + count
+                }
+            )).mappings().all()
+            if role == "teacher":
+                await conn.execute(
+                    text("INSERT INTO teacher_profiles (id) SELECT unnest(CAST(:ids AS INTEGER[]))"),
+                    {"ids": [row["id"] for row in rows]}
+                )
+        self.user_ids.extend(row["id"] for row in rows)
+        return [dict(row) for row in rows]
+
+    async def lectures(self, teachers: Sequence[Dict], per_teacher: int = 1) -> List[int]:
+        """講師ごとに承認済みの講座を per_teacher 件作成"""
+        async with async_engine.begin() as conn:
+            lecture_ids = list((await conn.scalars(
+                text(
+                    "INSERT INTO lectures (teacher_id, lecture_title, approval_status) "
+                    "SELECT t, CAST(:prefix AS TEXT) || ' 講座 ' || t || '-' || g, 'approved' "
+                    "FROM unnest(CAST(:teacher_ids AS INTEGER[])) t, generate_series(1, CAST(:per_teacher AS INTEGER)) g "
+                    "ORDER BY t, g RETURNING id"
+                ),
+                {"prefix": self.prefix, "teacher_ids": [teacher["id"] for teacher in teachers], "per_teacher": per_teacher}
+            )).all())
+        self.lecture_ids.extend(lecture_ids)
+        return lecture_ids
+
+    async def cleanup(self) -> None:
+        async with async_engine.begin() as conn:
+            await conn.execute(text("DELETE FROM user_infos WHERE id = ANY(:ids)"), {"ids": self.user_ids})
+            # 日次集計は講座の削除後も残るため、作成した講座の分を削除する
+            for table in ("lecture_daily_stats", "lecture_daily_stat_deltas"):
+                await conn.execute(text(f"DELETE FROM {table} WHERE lecture_id = ANY(:ids)"), {"ids": self.lecture_ids})
+        await async_engine.dispose()
+
+
+async def analyze(*tables: str) -> None:
+    """一括登録したテーブルの統計情報を更新（計測前に実行）"""
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in tables:
+            await conn.execute(text(f"VACUUM ANALYZE {table}"))
+
+
+async def login(client: httpx.AsyncClient, user: Dict) -> Dict[str, str]:
+    """計測用ユーザーでログインし、アクセストークンを付けたリクエストヘッダーを返す"""
+    response = await client.post(
+        f"{API_PREFIX}/users/login", json={"email": user["email"], "password": BENCH_PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    """HTTP で計測するベンチマークの共通引数"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="計測対象のサーバー")
+    return parser
+
+
+def http_client(base_url: str, concurrency: int = 1, timeout: float = 60) -> httpx.AsyncClient:
+    """
+    同時接続数 concurrency までの HTTP クライアント
+
+    uvicorn は 5 秒間使われない接続を閉じるため、クライアント側ではそれより早く破棄して
+    閉じられる接続にリクエストを送らないようにする
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency, keepalive_expiry=2)
+    )
+
+
+@dataclass
+class LoadResult:
+    """負荷計測の結果"""
+    seconds: float
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.seconds
+
+    def percentile(self, ratio: float) -> float:
+        """レイテンシーのパーセンタイル（ミリ秒）"""
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] * 1000
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests_per_second:8.0f} req/s  p50 {self.percentile(0.5):7.1f} ms  "
+            f"p99 {self.percentile(0.99):7.1f} ms  エラー {self.errors}"
+        )
+
+
+async def run_load(
+    send: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int
+) -> LoadResult:
+    """send(i) を total 回、同時に concurrency 件まで実行してレイテンシーを記録（2xx 以外はエラーとして数える）"""
+    result = LoadResult(seconds=0)
+    next_index = iter(range(total))
+
+    async def worker():
+        for index in next_index:
+            started = time.perf_counter()
+            response = await send(index)
+            result.latencies.append(time.perf_counter() - started)
+            if not response.is_success:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+    return result
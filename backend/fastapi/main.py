@@ -2,17 +2,65 @@
 FastAPI 主应用入口
 講義予約システム バックエンド API
 """
-from fastapi import FastAPI, Request
+import secrets
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api_v1.api import api_router
+from app.core.loop_monitor import LoopMonitorMiddleware, loop_monitor
+from app.core.metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, process_metrics_publisher, render_metrics
+from app.core.server_timing import ServerTimingMiddleware
+from app.db.booking_stats import booking_stats_refresher
+from app.db.daily_stats import daily_stats_folder
+from app.db.listener import invalidation_listener
+from app.db.schedule_templates import schedule_template_materializer
+from app.db.versions import table_version_compactor
+from app.utils.sessions import session_sweeper
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动/停止时的处理"""
+    # 事件循环阻塞监控（仅在启用时）
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    # 启动缓存失效通知监听（每个工作进程一个连接）
+    if settings.CACHE_ENABLED:
+        invalidation_listener.start()
+    # 定期集约 ETag 用的表变更计数行
+    table_version_compactor.start()
+    # 定期删除过期的登录会话（刷新令牌）
+    session_sweeper.start()
+    # 定期将重复日程模板展开为可预约时间段
+    schedule_template_materializer.start()
+    # 定期刷新预约统计的物化视图
+    booking_stats_refresher.start()
+    # 定期将讲座日次统计的差分行合并到日次统计
+    daily_stats_folder.start()
+    # 多进程模式下定期写入本进程的连接池・缓存统计
+    if settings.METRICS_ENABLED:
+        process_metrics_publisher.start()
+    yield
+    await process_metrics_publisher.stop()
+    await daily_stats_folder.stop()
+    await booking_stats_refresher.stop()
+    await schedule_template_materializer.stop()
+    await session_sweeper.stop()
+    await table_version_compactor.stop()
+    await invalidation_listener.stop()
+    await loop_monitor.stop()
+
 
 # 创建 FastAPI 应用实例
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="講義予約システム バックエンド API",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # 设置 CORS
@@ -22,8 +70,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],  # ページネーションの次ページカーソル、条件付き GET 用の ETag
 )
 
+# 事件循环阻塞监控：记录各请求由哪个任务执行（未启用时不注册）
+if settings.LOOP_MONITOR_ENABLED:
+    app.add_middleware(LoopMonitorMiddleware)
+
+# Server-Timing 响应头与 SQL 语句数预算（均未启用时不注册）
+if settings.SERVER_TIMING_ENABLED or settings.SQL_STATEMENT_BUDGET > 0:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Prometheus 指标：按路由的请求数・响应时间・SQL 统计（最外层，包含其他中间件的处理时间）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # 注册路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -44,6 +105,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# Prometheus 指标端点
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus 指标（多进程模式时为所有工作进程的汇总）"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="無効なトークンです")
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 # 独立的认证状态检查端点
 @app.get("/check-auth-status", response_model=dict)
 async def check_auth_status_independent(request: Request):
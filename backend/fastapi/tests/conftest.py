@@ -0,0 +1,181 @@
+"""
+テスト共通設定
+
+テストは設定済みの PostgreSQL（POSTGRES_* 環境変数、スキーマは database/initdb/init.sql または alembic upgrade head）
+に対して実行し、接続できない場合はスキップする。
+各テストのデータは一意な接尾辞付きで作成し、テスト終了時に作成したユーザーを削除する
+（講座・スケジュール・予約は外部キーの ON DELETE CASCADE で一緒に削除される）
+"""
+import asyncio
+import uuid
+from datetime import date, time, timedelta
+from typing import Dict, List, Tuple
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.database import async_engine
+from app.db.query_stats import current_query_stats, start_query_stats
+from app.utils.jwt import create_access_token
+from main import app
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """接続プールをテスト間で共有するため、イベントループはセッション全体で 1 つにする"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def database():
+    """データベースに接続できない場合はすべてのテストをスキップ"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except (OSError, SQLAlchemyError) as e:
+        pytest.skip(f"データベースに接続できません: {e}")
+    yield
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def client():
+    """アプリケーションを直接呼び出す HTTP クライアント（lifespan は実行しないため、キャッシュは使用されない）"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+class DataFactory:
+    """テストデータの作成（作成したユーザーは cleanup() で削除）"""
+
+    def __init__(self) -> None:
+        self.prefix = f"test_{uuid.uuid4().hex[:12]}"
+        self.user_ids: List[int] = []
+        self.lecture_ids: List[int] = []
+
+    def headers(self, user: Dict) -> Dict[str, str]:
+        """ユーザーのアクセストークンを付けたリクエストヘッダー"""
+        token = create_access_token(user["id"], user["email"], user["role"])
+        return {"Authorization": f"Bearer {token}"}
+
+    async def users(self, count: int, role: str = "student") -> List[Dict]:
+        """ユーザーを count 人作成（講師の場合は講師プロフィールも作成）"""
+        async with async_engine.begin() as conn:
+            rows = (await conn.execute(
+                text(
+                    "INSERT INTO user_infos (name, email, hashed_password, role) "
+                    "SELECT CAST(:name AS TEXT) || g, CAST(:name AS TEXT) || g || '@example.com', '!', :role "
+                    "FROM generate_series(CAST(:first AS INTEGER), CAST(:last AS INTEGER)) g "
+                    "RETURNING id, name, email, role"
+                ),
+                {
+                    "name": f"{self.prefix}_{role}", "role": role,
+                    "first": len(self.user_ids) + 1, "last": len(self.user_ids) + count
+                }
+            )).mappings().all()
+            if role == "teacher":
+                await conn.execute(
+                    text("INSERT INTO teacher_profiles (id) SELECT unnest(CAST(:ids AS INTEGER[]))"),
+                    {"ids": [row["id"] for row in rows]}
+                )
+        self.user_ids.extend(row["id"] for row in rows)
+        return [dict(row) for row in rows]
+
+    async def user(self, role: str = "student") -> Dict:
+        return (await self.users(1, role))[0]
+
+    async def lecture(self, teacher: Dict, title: str = "テスト講座") -> int:
+        """承認済みの講座を作成"""
+        async with async_engine.begin() as conn:
+            lecture_id = await conn.scalar(
+                text(
+                    "INSERT INTO lectures (teacher_id, lecture_title, approval_status) "
+                    "VALUES (:teacher_id, :title, 'approved') RETURNING id"
+                ),
+                {"teacher_id": teacher["id"], "title": f"{title} {self.prefix}"}
+            )
+        self.lecture_ids.append(lecture_id)
+        return lecture_id
+
+    async def schedule(
+        self,
+        lecture_id: int,
+        teacher: Dict,
+        booking_date: date,
+        start: time = time(10, 0),
+        end: time = time(11, 0),
+        capacity: int = 1
+    ) -> int:
+        """予約可能時間を作成"""
+        async with async_engine.begin() as conn:
+            return await conn.scalar(
+                text(
+                    "INSERT INTO lecture_schedules (lecture_id, teacher_id, booking_date, start_time, end_time, capacity) "
+                    "VALUES (:lecture_id, :teacher_id, :booking_date, :start, :end, :capacity) "
+                    "RETURNING id"
+                ),
+                {
+                    "lecture_id": lecture_id, "teacher_id": teacher["id"], "booking_date": booking_date,
+                    "start": start, "end": end, "capacity": capacity
+                }
+            )
+
+    async def booking(
+        self,
+        student: Dict,
+        lecture_id: int,
+        teacher: Dict,
+        booking_date: date,
+        start: time = time(10, 0),
+        end: time = time(11, 0),
+        status: str = "pending"
+    ) -> int:
+        """予約を直接作成（予約可能時間・定員は確認しない）"""
+        async with async_engine.begin() as conn:
+            return await conn.scalar(
+                text(
+                    "INSERT INTO lecture_bookings (user_id, lecture_id, teacher_id, status, booking_date, start_time, end_time) "
+                    "VALUES (:user_id, :lecture_id, :teacher_id, :status, :booking_date, :start, :end) "
+                    "RETURNING id"
+                ),
+                {
+                    "user_id": student["id"], "lecture_id": lecture_id, "teacher_id": teacher["id"], "status": status,
+                    "booking_date": booking_date, "start": start, "end": end
+                }
+            )
+
+    async def cleanup(self) -> None:
+        async with async_engine.begin() as conn:
+            await conn.execute(text("DELETE FROM user_infos WHERE id = ANY(:ids)"), {"ids": self.user_ids})
+            # 日次集計は講座の削除後も残るため、テストで作成した講座の分を削除する
+            for table in ("lecture_daily_stats", "lecture_daily_stat_deltas"):
+                await conn.execute(text(f"DELETE FROM {table} WHERE lecture_id = ANY(:ids)"), {"ids": self.lecture_ids})
+
+
+@pytest.fixture
+async def factory():
+    data = DataFactory()
+    yield data
+    await data.cleanup()
+
+
+@pytest.fixture
+def booking_date() -> date:
+    """予約に使う日付（過去日の予約はできないため明日）"""
+    return date.today() + timedelta(days=1)
+
+
+async def request_with_statements(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> Tuple[httpx.Response, int]:
+    """
+    リクエストを送信し、レスポンスとそのリクエストで実行された SQL 文の数を返す
+
+    ASGITransport はアプリケーションを呼び出し側と同じコンテキストで実行するため、
+    指標ミドルウェアが開始した統計（未登録の場合はここで開始した統計）をリクエスト後に読み取る
+    """
+    start_query_stats()
+    response = await client.request(method, url, **kwargs)
+    return response, current_query_stats().count
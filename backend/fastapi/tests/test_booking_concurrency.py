@@ -0,0 +1,53 @@
+"""
+同じ予約可能時間への同時予約
+
+定員 N の予約可能時間に数百件の予約を同時に送信し、成功がちょうど N 件で残りが満席（409）になること、
+booked_count と予約件数が定員を超えないことを確認する
+"""
+import asyncio
+
+from sqlalchemy import text
+
+from app.db.database import async_engine
+
+REGISTER_URL = "/api/v1/bookings/register"
+
+CONCURRENT_REQUESTS = 300
+CAPACITY = 25
+
+
+async def test_concurrent_register_respects_capacity(client, factory, booking_date):
+    teacher = await factory.user("teacher")
+    students = await factory.users(CONCURRENT_REQUESTS)
+    lecture_id = await factory.lecture(teacher)
+    schedule_id = await factory.schedule(lecture_id, teacher, booking_date, capacity=CAPACITY)
+
+    async def register(student):
+        return await client.post(
+            REGISTER_URL,
+            json={
+                "user_id": student["id"],
+                "lecture_id": lecture_id,
+                "teacher_id": teacher["id"],
+                "reserved_date": booking_date.isoformat(),
+                "start_time": "10:00",
+                "end_time": "11:00",
+            },
+            headers=factory.headers(student)
+        )
+
+    responses = await asyncio.gather(*(register(student) for student in students))
+
+    status_codes = [response.status_code for response in responses]
+    assert status_codes.count(200) == CAPACITY
+    assert status_codes.count(409) == CONCURRENT_REQUESTS - CAPACITY
+
+    async with async_engine.connect() as conn:
+        booked_count = await conn.scalar(
+            text("SELECT booked_count FROM lecture_schedules WHERE id = :id"), {"id": schedule_id}
+        )
+        bookings = await conn.scalar(
+            text("SELECT count(*) FROM lecture_bookings WHERE schedule_id = :id"), {"id": schedule_id}
+        )
+    assert booked_count == CAPACITY
+    assert bookings == CAPACITY
@@ -0,0 +1,71 @@
+"""
+予約一覧（_build_booking_query）
+
+講師名が各予約の講師（講座の担当講師ではなく予約の teacher_id）から行ごとに正しく取得されること、
+SQL 文の数が予約件数に依存しない（行ごとの講師検索をしない）ことを確認する
+"""
+from datetime import time
+
+from tests.conftest import request_with_statements
+
+# 認証のユーザー取得、講座の存在確認、一覧の取得
+LECTURE_BOOKINGS_STATEMENTS = 3
+# 認証のユーザー取得、一覧の取得
+ALL_BOOKINGS_STATEMENTS = 2
+
+BOOKINGS_PER_TEACHER = 10
+
+
+async def _multi_teacher_bookings(factory, booking_date):
+    """2 人の講師が担当する講座に、講師ごとに予約を作成して {予約ID: 講師名} を返す"""
+    owner, guest = await factory.users(2, "teacher")
+    students = await factory.users(BOOKINGS_PER_TEACHER)
+    lecture_id = await factory.lecture(owner)
+    expected = {}
+    for index, student in enumerate(students):
+        for hour, teacher in ((9, owner), (13, guest)):
+            start = time(hour + index % 3, 0)
+            end = time(hour + index % 3, 30)
+            booking_id = await factory.booking(student, lecture_id, teacher, booking_date, start, end)
+            expected[booking_id] = teacher["name"]
+    return lecture_id, expected
+
+
+async def test_lecture_bookings_teacher_name_per_row(client, factory, booking_date):
+    lecture_id, expected = await _multi_teacher_bookings(factory, booking_date)
+    admin = await factory.user("admin")
+
+    response, statements = await request_with_statements(
+        client, "GET", f"/api/v1/bookings/lecture/{lecture_id}", headers=factory.headers(admin)
+    )
+
+    assert response.status_code == 200, response.text
+    rows = response.json()
+    assert len(rows) == len(expected)
+    assert {row["id"]: row["teacher_name"] for row in rows} == expected
+    assert statements == LECTURE_BOOKINGS_STATEMENTS
+
+
+async def test_all_bookings_teacher_name_per_row(client, factory, booking_date):
+    lecture_id, expected = await _multi_teacher_bookings(factory, booking_date)
+    admin = await factory.user("admin")
+
+    teacher_names = {}
+    cursor = None
+    while True:
+        params = {"limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        response, statements = await request_with_statements(
+            client, "GET", "/api/v1/bookings/all", params=params, headers=factory.headers(admin)
+        )
+        assert response.status_code == 200, response.text
+        assert statements == ALL_BOOKINGS_STATEMENTS
+        teacher_names.update(
+            {row["id"]: row["teacher_name"] for row in response.json() if row["lecture_id"] == lecture_id}
+        )
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert teacher_names == expected
@@ -0,0 +1,69 @@
+"""
+POST /bookings/register の SQL 文数
+
+予約 1 件あたりの文数が増えた（N+1 の再発や検証クエリの分割など）ことを検出する
+"""
+from tests.conftest import request_with_statements
+
+REGISTER_URL = "/api/v1/bookings/register"
+
+# 予約成功時: ユーザー取得（認証）、講座・講師・予約可能時間の検証、席の確保（UPDATE ... RETURNING）、予約の INSERT
+REGISTER_STATEMENTS = 4
+# 満席・重複時: ユーザー取得（認証）、検証、席の確保（0 行）、重複予約の確認
+REGISTER_REJECTED_STATEMENTS = 4
+
+
+def _booking_body(student, teacher, lecture_id, booking_date):
+    return {
+        "user_id": student["id"],
+        "lecture_id": lecture_id,
+        "teacher_id": teacher["id"],
+        "reserved_date": booking_date.isoformat(),
+        "start_time": "10:00",
+        "end_time": "11:00",
+    }
+
+
+async def test_register_statement_count(client, factory, booking_date):
+    teacher = await factory.user("teacher")
+    student = await factory.user()
+    lecture_id = await factory.lecture(teacher)
+    await factory.schedule(lecture_id, teacher, booking_date)
+
+    response, statements = await request_with_statements(
+        client, "POST", REGISTER_URL,
+        json=_booking_body(student, teacher, lecture_id, booking_date),
+        headers=factory.headers(student)
+    )
+
+    assert response.status_code == 200, response.text
+    assert statements == REGISTER_STATEMENTS
+
+
+async def test_register_rejected_statement_count(client, factory, booking_date):
+    teacher = await factory.user("teacher")
+    first, second = await factory.users(2)
+    lecture_id = await factory.lecture(teacher)
+    await factory.schedule(lecture_id, teacher, booking_date, capacity=1)
+    response = await client.post(
+        REGISTER_URL, json=_booking_body(first, teacher, lecture_id, booking_date), headers=factory.headers(first)
+    )
+    assert response.status_code == 200, response.text
+
+    # 満席
+    response, statements = await request_with_statements(
+        client, "POST", REGISTER_URL,
+        json=_booking_body(second, teacher, lecture_id, booking_date),
+        headers=factory.headers(second)
+    )
+    assert response.status_code == 409, response.text
+    assert statements == REGISTER_REJECTED_STATEMENTS
+
+    # 同じユーザーの重複予約
+    response, statements = await request_with_statements(
+        client, "POST", REGISTER_URL,
+        json=_booking_body(first, teacher, lecture_id, booking_date),
+        headers=factory.headers(first)
+    )
+    assert response.status_code == 400, response.text
+    assert statements == REGISTER_REJECTED_STATEMENTS
@@ -0,0 +1,280 @@
+"""
+エンドポイントのクエリの実行計画（EXPLAIN）スナップショット
+
+各エンドポイントへのリクエストが実行した SQL 文を同じパラメーターで EXPLAIN し、
+SQL 文と走査したテーブル・走査方法を tests/plans/<ケース名>.json のスナップショットと比較する。
+計画は enable_seqscan = off で作成するため、シーケンシャルスキャンが残るのは使えるインデックスがない場合に限られる。
+ほかのインデックスの検索条件なしの全件走査で代替されることもあるため、これも全件走査として扱い、
+主要テーブル（LARGE_TABLES）の全件走査はスナップショットに関係なく失敗とする。
+
+スナップショットの更新: UPDATE_PLAN_SNAPSHOTS=1 pytest tests/test_query_plans.py
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+import asyncpg
+import pytest
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.db.database import async_engine
+from tests.conftest import DataFactory
+
+PLANS_DIR = Path(__file__).parent / "plans"
+UPDATE_SNAPSHOTS = os.getenv("UPDATE_PLAN_SNAPSHOTS") == "1"
+
+# 全件走査を許容しないテーブル（行数がユーザー数・予約数に比例する）
+LARGE_TABLES = {
+    "user_infos", "teacher_profiles", "lectures", "lecture_schedules", "lecture_bookings",
+    "lecture_daily_stats", "user_sessions",
+}
+
+# ケースごとに全件走査を許容するテーブル
+# 講座検索は講師名で一致する講師IDの配列の大きさを見積もれず、該当講座を多めに見積もるため、
+# 講師（講師数に比例し講座数には比例しない）をハッシュ結合の構築側として全件読む
+ALLOWED_FULL_SCANS = {
+    "lectures_search": {"user_infos"},
+}
+
+# シードデータの件数
+SEED_STUDENTS = 2000
+SEED_TEACHERS = 200
+SEED_LECTURES = 5000
+# 予約可能時間・予約を作成する講座数と日数
+SEED_SCHEDULED_LECTURES = 200
+SEED_DAYS = 10
+SEED_BOOKINGS_PER_SCHEDULE = 5
+
+# （ケース名, メソッド, パス, リクエストするユーザーの役割）
+# パスの {…} はシードデータの ID などで置き換える。書き込みを行うケースは最後に置く
+CASES = [
+    ("users_list", "GET", "/api/v1/users/?limit=20", "admin"),
+    ("users_autocomplete", "GET", "/api/v1/users/autocomplete?q={prefix}", "admin"),
+    ("users_detail", "GET", "/api/v1/users/{student}", "admin"),
+    ("teachers_list", "GET", "/api/v1/teachers/?limit=20", None),
+    ("teachers_detail", "GET", "/api/v1/teachers/{teacher}", None),
+    ("lectures_list", "GET", "/api/v1/lectures/?limit=20", None),
+    # シードの講座名（「<接頭辞> 講座 <番号>号」）のうち数件だけに一致する文字列で検索する
+    ("lectures_search", "GET", "/api/v1/lectures/search?q=137号", None),
+    ("lectures_carousel", "GET", "/api/v1/lectures/carousel", None),
+    ("lectures_carousel_management", "GET", "/api/v1/lectures/carousel/management", "admin"),
+    ("lectures_my", "GET", "/api/v1/lectures/my-lectures", "teacher"),
+    ("lectures_detail", "GET", "/api/v1/lectures/{lecture}", None),
+    ("lectures_teachers", "GET", "/api/v1/lectures/{lecture}/teachers", None),
+    ("bookings_lecture", "GET", "/api/v1/bookings/lecture/{lecture}", "admin"),
+    ("bookings_all", "GET", "/api/v1/bookings/all?limit=20", "admin"),
+    ("bookings_export", "GET", "/api/v1/bookings/export?lecture_id={lecture}", "admin"),
+    ("bookings_stats", "GET", "/api/v1/bookings/stats", "admin"),
+    ("bookings_analytics", "GET", "/api/v1/bookings/analytics?group_by=lecture&lecture_id={lecture}", "admin"),
+    ("bookings_booked_times", "GET", "/api/v1/bookings/lecture/{lecture}/booked-times", None),
+    ("bookings_my", "GET", "/api/v1/bookings/my-bookings", "student"),
+    ("schedules_list", "GET", "/api/v1/schedules/?limit=20", None),
+    ("schedules_lecture", "GET", "/api/v1/schedules/lecture/{lecture}", None),
+    ("schedules_lecture_schedules", "GET", "/api/v1/schedules/lecture-schedules?limit=20", None),
+    ("schedules_available_times", "GET", "/api/v1/schedules/lecture/{lecture}/available-times", "student"),
+    ("schedules_detail", "GET", "/api/v1/schedules/{schedule}", None),
+    ("schedules_templates", "GET", "/api/v1/schedules/templates", "teacher"),
+    ("bookings_register", "POST", "/api/v1/bookings/register", "newcomer"),
+    ("bookings_cancel", "PUT", "/api/v1/bookings/cancel/{booking}", "student"),
+]
+
+
+@pytest.fixture(scope="module")
+async def seed():
+    """講師・講座・予約可能時間・予約をまとめて作成し、統計情報を更新する"""
+    data = DataFactory()
+    admin = await data.user("admin")
+    teachers = await data.users(SEED_TEACHERS, "teacher")
+    students = await data.users(SEED_STUDENTS)
+    newcomer = await data.user()
+    teacher_ids = [teacher["id"] for teacher in teachers]
+    async with async_engine.begin() as conn:
+        lecture_ids = list((await conn.execute(
+            text(
+                "INSERT INTO lectures (teacher_id, lecture_title, lecture_description, approval_status) "
+                "SELECT (CAST(:teacher_ids AS INTEGER[]))[1 + g % :teachers], :prefix || ' 講座 ' || g || '号', '説明', 'approved' "
+                "FROM generate_series(1, :lectures) g RETURNING id"
+            ),
+            {"teacher_ids": teacher_ids, "teachers": len(teacher_ids), "prefix": data.prefix, "lectures": SEED_LECTURES}
+        )).scalars())
+        await conn.execute(
+            text(
+                "INSERT INTO lecture_schedules (lecture_id, teacher_id, booking_date, start_time, end_time, capacity, booked_count) "
+                "SELECT l.id, l.teacher_id, CURRENT_DATE + d, TIME '10:00', TIME '11:00', :capacity, :booked "
+                "FROM lectures l, generate_series(1, :days) d WHERE l.id = ANY(:lecture_ids)"
+            ),
+            {
+                "lecture_ids": lecture_ids[:SEED_SCHEDULED_LECTURES], "days": SEED_DAYS,
+                "capacity": SEED_BOOKINGS_PER_SCHEDULE * 2, "booked": SEED_BOOKINGS_PER_SCHEDULE
+            }
+        )
+        # 同じ予約可能時間の予約者は重ならず、同じユーザー・講座の予約は日付が異なる
+        await conn.execute(
+            text(
+                "INSERT INTO lecture_bookings (user_id, lecture_id, teacher_id, schedule_id, booking_date, start_time, end_time) "
+                "SELECT (CAST(:student_ids AS INTEGER[]))[1 + (s.id * :per_schedule + k) % :students], "
+                "s.lecture_id, s.teacher_id, s.id, s.booking_date, s.start_time, s.end_time "
+                "FROM lecture_schedules s, generate_series(0, :per_schedule - 1) k WHERE s.lecture_id = ANY(:lecture_ids)"
+            ),
+            {
+                "student_ids": [student["id"] for student in students], "students": len(students),
+                "per_schedule": SEED_BOOKINGS_PER_SCHEDULE, "lecture_ids": lecture_ids
+            }
+        )
+    data.lecture_ids.extend(lecture_ids)
+    async with async_engine.begin() as conn:
+        lecture_id = lecture_ids[0]
+        teacher_id = await conn.scalar(
+            text("UPDATE lectures SET is_multi_teacher = TRUE WHERE id = :id RETURNING teacher_id"), {"id": lecture_id}
+        )
+        # 講座の講師一覧のため、担当講師以外の講師を追加
+        await conn.execute(
+            text("INSERT INTO lecture_teachers (lecture_id, teacher_id) VALUES (:lecture_id, :teacher_id)"),
+            {"lecture_id": lecture_id, "teacher_id": next(tid for tid in teacher_ids if tid != teacher_id)}
+        )
+        schedule = (await conn.execute(
+            text("SELECT id, booking_date FROM lecture_schedules WHERE lecture_id = :id ORDER BY booking_date LIMIT 1"),
+            {"id": lecture_id}
+        )).one()
+        booking = (await conn.execute(
+            text("SELECT id, user_id FROM lecture_bookings WHERE schedule_id = :id ORDER BY id LIMIT 1"),
+            {"id": schedule.id}
+        )).one()
+
+    # 統計情報のない（一度も ANALYZE されていない）テーブルは行数を既定値で見積もられるため、小さいテーブルも対象にする。
+    # 一括登録した行は GIN インデックスの保留リストに残り、インデックスのコストが実際より高く見積もられるため VACUUM も行う
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in (*sorted(LARGE_TABLES), "lecture_teachers", "carousel", "schedule_templates"):
+            await conn.execute(text(f"VACUUM ANALYZE {table}"))
+
+    users = {user["id"]: user for user in [admin, newcomer, *teachers, *students]}
+    yield {
+        "data": data,
+        "users": {
+            "admin": admin,
+            "teacher": users[teacher_id],
+            "student": users[booking.user_id],
+            "newcomer": newcomer,
+        },
+        "ids": {
+            "prefix": data.prefix,
+            "lecture": lecture_id,
+            "teacher": teacher_id,
+            "student": booking.user_id,
+            "schedule": schedule.id,
+            "booking": booking.id,
+        },
+        "schedule_date": schedule.booking_date,
+    }
+    await data.cleanup()
+
+
+def _register_body(seed):
+    return {
+        "user_id": seed["users"]["newcomer"]["id"],
+        "lecture_id": seed["ids"]["lecture"],
+        "teacher_id": seed["ids"]["teacher"],
+        "reserved_date": seed["schedule_date"].isoformat(),
+        "start_time": "10:00",
+        "end_time": "11:00",
+    }
+
+
+# 子ノードの全行を読み終えるまで行を返さないノード（この下の走査は上位の LIMIT で打ち切られない）
+BLOCKING_NODES = {"Sort", "Aggregate", "WindowAgg", "Hash", "Materialize", "SetOp"}
+
+
+def _has_index_cond(plan) -> bool:
+    """ビットマップスキャンのすべてのインデックス走査に検索条件があるか"""
+    if plan.get("Node Type") == "Bitmap Index Scan":
+        return "Index Cond" in plan
+    return all(_has_index_cond(child) for child in plan.get("Plans", []))
+
+
+def _scans(plan, limited: bool = False) -> set:
+    """
+    計画ノードから走査したテーブルと方法を集める
+
+    - index: 検索条件（Index Cond）付きのインデックス走査、または検索条件のない順序どおりの走査で、
+      LIMIT（一覧のページ取得）やマージ結合の相手側の終端で打ち切られるもの（どちらになるかはコストが近く入れ替わる）
+    - full index: 検索条件がなく打ち切られないインデックス走査（enable_seqscan = off でのシーケンシャルスキャンの代替）
+    - seq: シーケンシャルスキャン
+
+    コストが近いインデックス同士の選択はデータ量・統計情報で入れ替わるため、インデックス名は比較しない
+    """
+    node_type = plan.get("Node Type", "")
+    if node_type in ("Limit", "Merge Join"):
+        limited = True
+    elif node_type in BLOCKING_NODES:
+        limited = False
+
+    scans = set()
+    if node_type == "Seq Scan":
+        scans.add(f"{plan['Relation Name']}: seq")
+    elif node_type in ("Index Scan", "Index Only Scan"):
+        method = "index" if "Index Cond" in plan or limited else "full index"
+        scans.add(f"{plan['Relation Name']}: {method}")
+    elif node_type == "Bitmap Heap Scan":
+        scans.add(f"{plan['Relation Name']}: {'index' if _has_index_cond(plan) else 'full index'}")
+    for child in plan.get("Plans", []):
+        scans |= _scans(child, limited)
+    return scans
+
+
+async def _explain(statements):
+    """SQL 文ごとに enable_seqscan = off での計画を取得し、走査したテーブル・インデックスを返す"""
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        results = []
+        for statement, parameters in statements:
+            async with conn.transaction():
+                await conn.execute("SET LOCAL enable_seqscan = off")
+                plan = json.loads(await conn.fetchval(f"EXPLAIN (FORMAT JSON, COSTS OFF) {statement}", *parameters))
+            results.append({"sql": statement, "scans": sorted(_scans(plan[0]["Plan"]))})
+        return results
+    finally:
+        await conn.close()
+
+
+def _capture_statements(statements):
+    """リクエストが実行した SELECT / UPDATE / DELETE 文をパラメーターと一緒に記録するイベントリスナー"""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        normalized = re.sub(r"\s+", " ", statement).strip()
+        if re.match(r"(SELECT|WITH|UPDATE|DELETE)\b", normalized, re.IGNORECASE) and "pg_notify" not in normalized:
+            statements.append((normalized, tuple(parameters or ())))
+    return before_cursor_execute
+
+
+@pytest.mark.parametrize("name, method, path, role", CASES, ids=[case[0] for case in CASES])
+async def test_query_plan(client, seed, name, method, path, role):
+    headers = seed["data"].headers(seed["users"][role]) if role else {}
+    kwargs = {"json": _register_body(seed)} if name == "bookings_register" else {}
+
+    statements = []
+    listener = _capture_statements(statements)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = await client.request(method, path.format(**seed["ids"]), headers=headers, **kwargs)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    assert response.status_code == 200, response.text
+    assert statements, "SQL 文が実行されていません"
+
+    plans = await _explain(statements)
+
+    full_scans = [
+        (plan["sql"], scan) for plan in plans for scan in plan["scans"]
+        if scan.split(": ")[0] in LARGE_TABLES - ALLOWED_FULL_SCANS.get(name, set())
+        and scan.split(": ")[1] in ("seq", "full index")
+    ]
+    assert not full_scans, f"主要テーブルの全件走査: {full_scans}"
+
+    snapshot_path = PLANS_DIR / f"{name}.json"
+    if UPDATE_SNAPSHOTS:
+        PLANS_DIR.mkdir(exist_ok=True)
+        snapshot_path.write_text(json.dumps(plans, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    assert snapshot_path.exists(), f"スナップショットがありません（UPDATE_PLAN_SNAPSHOTS=1 で作成）: {snapshot_path}"
+    assert plans == json.loads(snapshot_path.read_text(encoding="utf-8"))
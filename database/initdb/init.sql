@@ -4,6 +4,43 @@
 -- 必要な拡張機能を作成
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+CREATE EXTENSION IF NOT EXISTS "btree_gist";
+
+-- 検索用の文字列正規化（NFKC で全角英数字・半角カナなどの表記ゆれを統一し、小文字化）
+CREATE OR REPLACE FUNCTION search_normalize(t TEXT) RETURNS TEXT AS $$
+    SELECT lower(normalize(t, NFKC))
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+-- 正規化した文字列に含まれる 2 文字の組（空白を含む組は除く）
+-- データベースは lc_ctype=C で作成されるため pg_trgm は日本語の文字から trigram を抽出しない。
+-- 文字の組の配列を生成列に保存して GIN インデックスに登録し、2 文字の語（「講座」など）も部分一致で検索できるようにする
+-- （生成列・インデックスの計算時は search_path が pg_catalog に限定されるため、関数はスキーマ名付きで参照する）
+CREATE OR REPLACE FUNCTION search_bigrams(t TEXT) RETURNS TEXT[] AS $$
+    SELECT coalesce(array_agg(DISTINCT g), '{}')
+    FROM (
+        SELECT substr(s, i, 2) AS g
+        FROM (SELECT public.search_normalize(t) AS s) n, generate_series(1, length(s) - 1) AS i
+    ) grams
+    WHERE g !~ '\s'
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+-- 2 文字の組の集合による類似度（Jaccard 係数、0〜1）
+CREATE OR REPLACE FUNCTION bigram_similarity(a TEXT[], b TEXT[]) RETURNS REAL AS $$
+DECLARE
+    common INTEGER := 0;
+    gram TEXT;
+BEGIN
+    FOREACH gram IN ARRAY a LOOP
+        IF gram = ANY(b) THEN
+            common := common + 1;
+        END IF;
+    END LOOP;
+    IF cardinality(a) + cardinality(b) = common THEN
+        RETURN 0;
+    END IF;
+    RETURN common::real / (cardinality(a) + cardinality(b) - common);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE;
 
 -- ユーザー情報テーブル
 CREATE TABLE user_infos (
@@ -12,10 +49,12 @@ CREATE TABLE user_infos (
   email TEXT NOT NULL UNIQUE,
   hashed_password TEXT NOT NULL,
   role VARCHAR(20) NOT NULL DEFAULT 'student' CHECK (role IN ('student', 'teacher', 'admin')),
+  token_version INTEGER NOT NULL DEFAULT 0, -- 加算するとそれ以前に発行したアクセストークンが無効になる
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   is_deleted BOOLEAN DEFAULT FALSE,
-  deleted_at TIMESTAMP WITH TIME ZONE
+  deleted_at TIMESTAMP WITH TIME ZONE,
+  name_bigrams TEXT[] GENERATED ALWAYS AS (search_bigrams(name)) STORED -- 名前の部分一致検索用
 );
 
 -- 講師情報テーブル（ユーザー情報テーブルと1対1の関係）
@@ -44,6 +83,9 @@ CREATE TABLE lectures (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   is_deleted BOOLEAN DEFAULT FALSE,
   deleted_at TIMESTAMP WITH TIME ZONE,
+  -- 講座名・説明の部分一致検索用
+  title_bigrams TEXT[] GENERATED ALWAYS AS (search_bigrams(lecture_title)) STORED,
+  description_bigrams TEXT[] GENERATED ALWAYS AS (search_bigrams(lecture_description)) STORED,
 
   FOREIGN KEY (teacher_id) REFERENCES teacher_profiles(id) ON DELETE CASCADE
 );
@@ -56,34 +98,82 @@ CREATE TABLE lecture_schedules (
   booking_date DATE NOT NULL,
   start_time TIME NOT NULL,
   end_time TIME NOT NULL,
+  capacity INTEGER NOT NULL DEFAULT 1,
+  booked_count INTEGER NOT NULL DEFAULT 0,
+  time_range TSRANGE GENERATED ALWAYS AS (tsrange(booking_date + start_time, booking_date + end_time)) STORED,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   is_expired BOOLEAN DEFAULT FALSE,
+  template_id INTEGER, -- 生成元の繰り返しテンプレート（schedule_templates）
   
   CHECK (start_time < end_time),
-  UNIQUE (lecture_id, booking_date, start_time, end_time),
+  CONSTRAINT lecture_schedules_capacity_check CHECK (capacity > 0),
+  CONSTRAINT lecture_schedules_booked_count_check CHECK (booked_count >= 0 AND booked_count <= capacity),
+  -- 同一講座の有効なスケジュール同士の時間帯重複を禁止
+  CONSTRAINT lecture_schedules_no_overlap EXCLUDE USING gist (
+    lecture_id WITH =, time_range WITH &&
+  ) WHERE (NOT is_expired),
+
+  FOREIGN KEY (lecture_id) REFERENCES lectures(id) ON DELETE CASCADE,
+  FOREIGN KEY (teacher_id) REFERENCES teacher_profiles(id) ON DELETE CASCADE
+);
+
+-- 繰り返しスケジュールテンプレートテーブル
+-- 指定した曜日・隔週の規則で期間内の予約可能時間を生成する（materialized_until まで生成済み）
+CREATE TABLE schedule_templates (
+  id SERIAL PRIMARY KEY,
+  lecture_id INTEGER NOT NULL,
+  teacher_id INTEGER NOT NULL,
+  weekdays SMALLINT[] NOT NULL, -- ISO 曜日（1=月曜 〜 7=日曜）
+  interval_weeks SMALLINT NOT NULL DEFAULT 1, -- 1=毎週、2=隔週（start_date の週から数える）
+  start_date DATE NOT NULL,
+  end_date DATE NOT NULL,
+  start_time TIME NOT NULL,
+  end_time TIME NOT NULL,
+  capacity INTEGER NOT NULL DEFAULT 1,
+  excluded_dates DATE[] NOT NULL DEFAULT '{}', -- 生成しない日付（祝日など）
+  materialized_until DATE,
+  is_active BOOLEAN NOT NULL DEFAULT TRUE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+  CHECK (start_time < end_time),
+  CHECK (start_date <= end_date),
+  CONSTRAINT schedule_templates_interval_weeks_check CHECK (interval_weeks IN (1, 2)),
+  CONSTRAINT schedule_templates_capacity_check CHECK (capacity > 0),
 
   FOREIGN KEY (lecture_id) REFERENCES lectures(id) ON DELETE CASCADE,
   FOREIGN KEY (teacher_id) REFERENCES teacher_profiles(id) ON DELETE CASCADE
 );
 
+ALTER TABLE lecture_schedules
+  ADD FOREIGN KEY (template_id) REFERENCES schedule_templates(id) ON DELETE SET NULL;
+
 -- 講義予約テーブル
 CREATE TABLE lecture_bookings (
   id SERIAL PRIMARY KEY,
   user_id INTEGER NOT NULL,
   lecture_id INTEGER NOT NULL,
   teacher_id INTEGER NOT NULL,
+  schedule_id INTEGER,
   status VARCHAR(20) DEFAULT 'pending' CHECK (
     status IN ('pending', 'confirmed', 'cancelled')
   ),
   booking_date DATE NOT NULL,
   start_time TIME NOT NULL,
   end_time TIME NOT NULL,
+  time_range TSRANGE GENERATED ALWAYS AS (tsrange(booking_date + start_time, booking_date + end_time)) STORED,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   is_expired BOOLEAN DEFAULT FALSE,
   
+  -- 同一ユーザーの同一講座における有効な予約同士の時間帯重複を禁止
+  CONSTRAINT lecture_bookings_no_overlap EXCLUDE USING gist (
+    user_id WITH =, lecture_id WITH =, time_range WITH &&
+  ) WHERE (status IN ('pending', 'confirmed')),
+  
   FOREIGN KEY (user_id) REFERENCES user_infos(id) ON DELETE CASCADE,
   FOREIGN KEY (lecture_id) REFERENCES lectures(id) ON DELETE CASCADE,
-  FOREIGN KEY (teacher_id) REFERENCES teacher_profiles(id) ON DELETE CASCADE
+  FOREIGN KEY (teacher_id) REFERENCES teacher_profiles(id) ON DELETE CASCADE,
+  FOREIGN KEY (schedule_id) REFERENCES lecture_schedules(id) ON DELETE SET NULL
 );
 
 -- 講義-講師関連テーブル（多講師講義サポート）
@@ -106,25 +196,32 @@ CREATE TABLE carousel (
 );
 
 -- クエリ性能を最適化するためのインデックスを作成
-CREATE INDEX IF NOT EXISTS idx_user_infos_email ON user_infos(email);
-CREATE INDEX IF NOT EXISTS idx_user_infos_role ON user_infos(role);
-CREATE INDEX IF NOT EXISTS idx_user_infos_is_deleted ON user_infos(is_deleted);
+-- 一覧・検索の条件と並び順に合わせた複合インデックス（削除済み・期限切れ・取消済みの行は部分インデックスで除外）
+-- 外部キーの参照元（講座・ユーザーの削除時の CASCADE）は先頭列が外部キーの複合インデックスで兼ねる
+CREATE INDEX IF NOT EXISTS idx_user_infos_active_role ON user_infos(role, id) WHERE NOT is_deleted;
 CREATE INDEX IF NOT EXISTS idx_lectures_teacher_id ON lectures(teacher_id);
 CREATE INDEX IF NOT EXISTS idx_lectures_approval_status ON lectures(approval_status);
-CREATE INDEX IF NOT EXISTS idx_lectures_is_deleted ON lectures(is_deleted);
-CREATE INDEX IF NOT EXISTS idx_lecture_schedules_lecture_id ON lecture_schedules(lecture_id);
-CREATE INDEX IF NOT EXISTS idx_lecture_schedules_booking_date ON lecture_schedules(booking_date);
-CREATE INDEX IF NOT EXISTS idx_lecture_schedules_is_expired ON lecture_schedules(is_expired);
-CREATE INDEX IF NOT EXISTS idx_lecture_bookings_user_id ON lecture_bookings(user_id);
-CREATE INDEX IF NOT EXISTS idx_lecture_bookings_lecture_id ON lecture_bookings(lecture_id);
-CREATE INDEX IF NOT EXISTS idx_lecture_bookings_booking_date ON lecture_bookings(booking_date);
-CREATE INDEX IF NOT EXISTS idx_lecture_bookings_status ON lecture_bookings(status);
-CREATE INDEX IF NOT EXISTS idx_lecture_bookings_is_expired ON lecture_bookings(is_expired);
-CREATE INDEX IF NOT EXISTS idx_lecture_teachers_lecture_id ON lecture_teachers(lecture_id);
+CREATE INDEX IF NOT EXISTS idx_lectures_active_created ON lectures(created_at DESC, id DESC) WHERE NOT is_deleted;
+CREATE INDEX IF NOT EXISTS idx_lecture_schedules_lecture_slot ON lecture_schedules(lecture_id, booking_date, start_time);
+CREATE INDEX IF NOT EXISTS idx_lecture_schedules_active_slot ON lecture_schedules(booking_date, start_time, id) WHERE NOT is_expired;
+CREATE INDEX IF NOT EXISTS idx_lecture_schedules_template_id ON lecture_schedules(template_id) WHERE template_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_schedule_templates_lecture_id ON schedule_templates(lecture_id);
+CREATE INDEX IF NOT EXISTS idx_lecture_bookings_user_slot ON lecture_bookings(user_id, booking_date DESC, start_time);
+CREATE INDEX IF NOT EXISTS idx_lecture_bookings_lecture_slot ON lecture_bookings(lecture_id, booking_date, start_time);
+CREATE INDEX IF NOT EXISTS idx_lecture_bookings_date_slot ON lecture_bookings(booking_date DESC, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_lecture_bookings_schedule_id ON lecture_bookings(schedule_id);
 CREATE INDEX IF NOT EXISTS idx_lecture_teachers_teacher_id ON lecture_teachers(teacher_id);
 CREATE INDEX IF NOT EXISTS idx_carousel_lecture_id ON carousel(lecture_id);
-CREATE INDEX IF NOT EXISTS idx_carousel_display_order ON carousel(display_order);
-CREATE INDEX IF NOT EXISTS idx_carousel_is_active ON carousel(is_active);
+CREATE INDEX IF NOT EXISTS idx_carousel_active_order ON carousel(display_order) WHERE is_active;
+
+-- 講座名・説明・ユーザー名の部分一致検索用
+CREATE INDEX IF NOT EXISTS idx_lectures_title_bigrams ON lectures USING gin (title_bigrams) WHERE NOT is_deleted;
+CREATE INDEX IF NOT EXISTS idx_lectures_description_bigrams ON lectures USING gin (description_bigrams) WHERE NOT is_deleted;
+CREATE INDEX IF NOT EXISTS idx_user_infos_name_bigrams ON user_infos USING gin (name_bigrams);
+
+-- ユーザー名・メールアドレスの前方一致（自動補全）用（C 照合順序で範囲検索と並べ替えに使用）
+CREATE INDEX IF NOT EXISTS idx_user_infos_name_prefix ON user_infos ((search_normalize(name) COLLATE "C"), id) WHERE NOT is_deleted;
+CREATE INDEX IF NOT EXISTS idx_user_infos_email_prefix ON user_infos ((search_normalize(email) COLLATE "C"), id) WHERE NOT is_deleted;
 
 -- 更新時間トリガー関数を作成
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -150,6 +247,264 @@ CREATE TRIGGER update_lectures_updated_at
     BEFORE UPDATE ON lectures 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- 繰り返しスケジュールテンプレートテーブルに更新時間トリガーを追加
+CREATE TRIGGER update_schedule_templates_updated_at 
+    BEFORE UPDATE ON schedule_templates 
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- テーブル変更カウンター（API の ETag 生成用）
+-- 行を（テーブル名, バックエンドプロセスID）ごとに分け、同時に書き込むトランザクション同士が行ロックで競合しないようにする
+-- テーブルのバージョン番号は該当テーブルの version の合計値
+CREATE TABLE table_versions (
+    table_name TEXT NOT NULL,
+    backend_pid INTEGER NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, backend_pid)
+);
+
+-- 変更カウンターを加算するトリガー関数（文単位で 1 加算、トランザクションと一緒にコミットされる）
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, backend_pid, version)
+    VALUES (TG_TABLE_NAME, pg_backend_pid(), 1)
+    ON CONFLICT (table_name, backend_pid)
+    DO UPDATE SET version = table_versions.version + 1;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- 終了したバックエンドの行を backend_pid = 0 の行に集約（合計値は変わらない）
+CREATE OR REPLACE FUNCTION compact_table_versions()
+RETURNS VOID AS $$
+    WITH finished AS (
+        DELETE FROM table_versions v
+        WHERE v.backend_pid <> 0
+          AND NOT EXISTS (SELECT 1 FROM pg_stat_activity a WHERE a.pid = v.backend_pid)
+        RETURNING v.table_name, v.version
+    )
+    INSERT INTO table_versions (table_name, backend_pid, version)
+    SELECT table_name, 0, sum(version) FROM finished GROUP BY table_name
+    ON CONFLICT (table_name, backend_pid)
+    DO UPDATE SET version = table_versions.version + EXCLUDED.version;
+$$ language 'sql';
+
+-- 公開 API が参照するテーブルに変更カウンタートリガーを追加
+CREATE TRIGGER bump_user_infos_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON user_infos
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_teacher_profiles_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON teacher_profiles
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_lectures_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lectures
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_lecture_schedules_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lecture_schedules
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_lecture_bookings_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lecture_bookings
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_carousel_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON carousel
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- ログインセッションテーブル（リフレッシュトークン 1 件につき 1 行、トークン本体は保存せず SHA-256 ハッシュのみ）
+-- リフレッシュ時は行をローテーション済みにして同じ family_id の行を新規発行し、
+-- ローテーション済みトークンの再利用を検知した場合は family_id 単位で失効させる
+CREATE TABLE user_sessions (
+  id BIGSERIAL PRIMARY KEY,
+  user_id INTEGER NOT NULL,
+  family_id VARCHAR(32) NOT NULL,
+  token_hash VARCHAR(64) NOT NULL UNIQUE,
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  rotated_at TIMESTAMP WITH TIME ZONE,
+  revoked_at TIMESTAMP WITH TIME ZONE,
+
+  FOREIGN KEY (user_id) REFERENCES user_infos(id) ON DELETE CASCADE
+);
+
+-- ユーザー単位・系列単位の一括失効と、期限切れ行の定期削除用
+CREATE INDEX IF NOT EXISTS idx_user_sessions_user_id ON user_sessions(user_id) WHERE revoked_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_user_sessions_family_id ON user_sessions(family_id);
+CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at);
+
+-- 予約統計のマテリアライズドビュー（講座ごとの予約件数、lecture_id = 0 は削除されていない全講座の合計行）
+-- バックエンドが定期的に REFRESH MATERIALIZED VIEW CONCURRENTLY で更新し、集計日時は合計行の refreshed_at のみに記録する
+CREATE MATERIALIZED VIEW lecture_booking_stats AS
+SELECT
+  COALESCE(l.id, 0) AS lecture_id,
+  l.lecture_title,
+  COUNT(b.id) AS total_bookings,
+  COUNT(b.id) FILTER (WHERE b.status = 'confirmed') AS confirmed_bookings,
+  COUNT(b.id) FILTER (WHERE b.status = 'cancelled') AS cancelled_bookings,
+  COUNT(b.id) FILTER (WHERE b.status = 'pending') AS pending_bookings,
+  CASE WHEN GROUPING(l.id) = 1 THEN now() END AS refreshed_at
+FROM lectures l
+JOIN lecture_bookings b ON b.lecture_id = l.id
+WHERE NOT l.is_deleted
+GROUP BY GROUPING SETS ((l.id, l.lecture_title), ());
+
+-- CONCURRENTLY での更新に必要な一意インデックスと、人気講座（予約件数順）の取得用
+CREATE UNIQUE INDEX IF NOT EXISTS idx_lecture_booking_stats_lecture_id ON lecture_booking_stats(lecture_id);
+CREATE INDEX IF NOT EXISTS idx_lecture_booking_stats_total ON lecture_booking_stats(total_bookings DESC, lecture_id);
+
+-- 講座別日次集計テーブル（日付・講座・講師ごとの予約件数と予約可能時間の席数）
+-- lecture_bookings / lecture_schedules の行トリガーが追記した差分（lecture_daily_stat_deltas）を定期処理が加算する。
+-- 講座の物理削除後も履歴として残すため外部キーは持たない
+CREATE TABLE lecture_daily_stats (
+  stat_date DATE NOT NULL,
+  lecture_id INTEGER NOT NULL,
+  teacher_id INTEGER NOT NULL,
+  bookings INTEGER NOT NULL DEFAULT 0,
+  pending_bookings INTEGER NOT NULL DEFAULT 0,
+  confirmed_bookings INTEGER NOT NULL DEFAULT 0,
+  cancelled_bookings INTEGER NOT NULL DEFAULT 0,
+  slots INTEGER NOT NULL DEFAULT 0,
+  capacity INTEGER NOT NULL DEFAULT 0,
+  booked_seats INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (stat_date, lecture_id, teacher_id)
+);
+
+-- 講座・講師で絞り込んだ期間集計用
+CREATE INDEX IF NOT EXISTS idx_lecture_daily_stats_lecture_id ON lecture_daily_stats(lecture_id, stat_date);
+CREATE INDEX IF NOT EXISTS idx_lecture_daily_stats_teacher_id ON lecture_daily_stats(teacher_id, stat_date);
+
+-- 日次集計の差分（追記専用）
+-- トリガーは同じトランザクション内でここに行を追加するだけにし、日次集計の共有行を更新しない
+-- （一意制約がないため、同じ日付・講座の予約作成とキャンセルが行ロックで競合しない）
+CREATE TABLE lecture_daily_stat_deltas (
+  id BIGSERIAL PRIMARY KEY,
+  stat_date DATE NOT NULL,
+  lecture_id INTEGER NOT NULL,
+  teacher_id INTEGER NOT NULL,
+  bookings INTEGER NOT NULL DEFAULT 0,
+  pending_bookings INTEGER NOT NULL DEFAULT 0,
+  confirmed_bookings INTEGER NOT NULL DEFAULT 0,
+  cancelled_bookings INTEGER NOT NULL DEFAULT 0,
+  slots INTEGER NOT NULL DEFAULT 0,
+  capacity INTEGER NOT NULL DEFAULT 0,
+  booked_seats INTEGER NOT NULL DEFAULT 0
+);
+
+-- 日次集計の差分を追記する
+CREATE OR REPLACE FUNCTION add_lecture_daily_stats(
+    p_date DATE, p_lecture_id INTEGER, p_teacher_id INTEGER,
+    p_bookings INTEGER, p_pending INTEGER, p_confirmed INTEGER, p_cancelled INTEGER,
+    p_slots INTEGER, p_capacity INTEGER, p_booked INTEGER
+) RETURNS VOID AS $$
+    INSERT INTO lecture_daily_stat_deltas (
+        stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings,
+        slots, capacity, booked_seats
+    )
+    VALUES (p_date, p_lecture_id, p_teacher_id, p_bookings, p_pending, p_confirmed, p_cancelled, p_slots, p_capacity, p_booked);
+$$ LANGUAGE sql;
+
+-- 古い差分から最大 p_limit 行を日次集計に加算して削除する（集約した差分の行数を返す）
+CREATE OR REPLACE FUNCTION fold_lecture_daily_stat_deltas(p_limit INTEGER)
+RETURNS INTEGER AS $$
+    WITH batch AS (
+        DELETE FROM lecture_daily_stat_deltas
+        WHERE id IN (SELECT id FROM lecture_daily_stat_deltas ORDER BY id LIMIT p_limit)
+        RETURNING *
+    ), folded AS (
+        INSERT INTO lecture_daily_stats AS s (
+            stat_date, lecture_id, teacher_id, bookings, pending_bookings, confirmed_bookings, cancelled_bookings,
+            slots, capacity, booked_seats
+        )
+        SELECT stat_date, lecture_id, teacher_id, sum(bookings), sum(pending_bookings), sum(confirmed_bookings),
+               sum(cancelled_bookings), sum(slots), sum(capacity), sum(booked_seats)
+        FROM batch
+        GROUP BY stat_date, lecture_id, teacher_id
+        ON CONFLICT (stat_date, lecture_id, teacher_id) DO UPDATE SET
+            bookings = s.bookings + EXCLUDED.bookings,
+            pending_bookings = s.pending_bookings + EXCLUDED.pending_bookings,
+            confirmed_bookings = s.confirmed_bookings + EXCLUDED.confirmed_bookings,
+            cancelled_bookings = s.cancelled_bookings + EXCLUDED.cancelled_bookings,
+            slots = s.slots + EXCLUDED.slots,
+            capacity = s.capacity + EXCLUDED.capacity,
+            booked_seats = s.booked_seats + EXCLUDED.booked_seats
+    )
+    SELECT count(*)::int FROM batch;
+$$ LANGUAGE sql;
+
+-- 予約の追加・削除・状態変更を日次集計に反映（更新時は旧行を減算して新行を加算）
+CREATE OR REPLACE FUNCTION rollup_lecture_booking()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_lecture_daily_stats(
+            OLD.booking_date, OLD.lecture_id, OLD.teacher_id, -1,
+            -(OLD.status IS NOT DISTINCT FROM 'pending')::int,
+            -(OLD.status IS NOT DISTINCT FROM 'confirmed')::int,
+            -(OLD.status IS NOT DISTINCT FROM 'cancelled')::int,
+            0, 0, 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_lecture_daily_stats(
+            NEW.booking_date, NEW.lecture_id, NEW.teacher_id, 1,
+            (NEW.status IS NOT DISTINCT FROM 'pending')::int,
+            (NEW.status IS NOT DISTINCT FROM 'confirmed')::int,
+            (NEW.status IS NOT DISTINCT FROM 'cancelled')::int,
+            0, 0, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 有効な（is_expired でない）予約可能時間の数・定員・予約済み席数を日次集計に反映
+CREATE OR REPLACE FUNCTION rollup_lecture_schedule()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT COALESCE(OLD.is_expired, FALSE) THEN
+        PERFORM add_lecture_daily_stats(
+            OLD.booking_date, OLD.lecture_id, OLD.teacher_id, 0, 0, 0, 0,
+            -1, -OLD.capacity, -OLD.booked_count);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NOT COALESCE(NEW.is_expired, FALSE) THEN
+        PERFORM add_lecture_daily_stats(
+            NEW.booking_date, NEW.lecture_id, NEW.teacher_id, 0, 0, 0, 0,
+            1, NEW.capacity, NEW.booked_count);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER rollup_lecture_bookings
+    AFTER INSERT OR DELETE ON lecture_bookings
+    FOR EACH ROW EXECUTE FUNCTION rollup_lecture_booking();
+
+-- 集計対象の列が変わらない更新（is_expired など）ではトリガー関数を呼ばない
+CREATE TRIGGER rollup_lecture_bookings_update
+    AFTER UPDATE OF status, booking_date, lecture_id, teacher_id ON lecture_bookings
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status
+          OR OLD.booking_date <> NEW.booking_date
+          OR OLD.lecture_id <> NEW.lecture_id
+          OR OLD.teacher_id <> NEW.teacher_id)
+    EXECUTE FUNCTION rollup_lecture_booking();
+
+CREATE TRIGGER rollup_lecture_schedules
+    AFTER INSERT OR DELETE ON lecture_schedules
+    FOR EACH ROW EXECUTE FUNCTION rollup_lecture_schedule();
+
+CREATE TRIGGER rollup_lecture_schedules_update
+    AFTER UPDATE OF is_expired, capacity, booked_count, booking_date, lecture_id, teacher_id ON lecture_schedules
+    FOR EACH ROW
+    WHEN (OLD.is_expired IS DISTINCT FROM NEW.is_expired
+          OR OLD.capacity <> NEW.capacity
+          OR OLD.booked_count <> NEW.booked_count
+          OR OLD.booking_date <> NEW.booking_date
+          OR OLD.lecture_id <> NEW.lecture_id
+          OR OLD.teacher_id <> NEW.teacher_id)
+    EXECUTE FUNCTION rollup_lecture_schedule();
+
 -- デフォルト管理者アカウントを挿入
 -- パスワード: Admin1234
 INSERT INTO user_infos (name, email, hashed_password, role, is_deleted) VALUES